@@ -0,0 +1,110 @@
+"""inventory fit search columns
+
+Adds the orientation-independent dimensions used by /api/inventory/fit
+(dim_min, dim_mid, dim_max, bounding_volume) and their two indexes to
+inventory_items tables that already exist, then fills them for existing rows.
+New rows get them from the InventoryItem before_insert/before_update hook.
+
+Revision ID: 3f7a9c2e5d14
+Revises: 8c1d2f4a9b10
+Create Date: 2026-10-19 14:05:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a9c2e5d14'
+down_revision: Union[str, Sequence[str], None] = '8c1d2f4a9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ('dim_min', sa.Numeric(10, 3)),
+    ('dim_mid', sa.Numeric(10, 3)),
+    ('dim_max', sa.Numeric(10, 3)),
+    ('bounding_volume', sa.Numeric(20, 6)),
+)
+
+BATCH_SIZE = 1000
+
+inventory_items = sa.table(
+    'inventory_items',
+    sa.column('id', sa.Integer),
+    sa.column('width', sa.Numeric),
+    sa.column('height', sa.Numeric),
+    sa.column('depth', sa.Numeric),
+    *(sa.column(name, column_type) for name, column_type in COLUMNS),
+)
+
+
+def _backfill() -> None:
+    """Set the sorted dimensions of every measured row that has none yet."""
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(inventory_items.c.id, inventory_items.c.width, inventory_items.c.height, inventory_items.c.depth)
+            .where(
+                inventory_items.c.id > last_id,
+                inventory_items.c.dim_min.is_(None),
+                inventory_items.c.width.is_not(None),
+                inventory_items.c.height.is_not(None),
+                inventory_items.c.depth.is_not(None),
+            )
+            .order_by(inventory_items.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        values = []
+        for row in rows:
+            dims = sorted(float(value) for value in (row.width, row.height, row.depth))
+            values.append({
+                'row_id': row.id,
+                'dim_min': dims[0],
+                'dim_mid': dims[1],
+                'dim_max': dims[2],
+                'bounding_volume': dims[0] * dims[1] * dims[2],
+            })
+        connection.execute(
+            inventory_items.update()
+            .where(inventory_items.c.id == sa.bindparam('row_id'))
+            .values(**{name: sa.bindparam(name) for name, _ in COLUMNS}),
+            values,
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_tables() builds new databases with these columns already
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('inventory_items')}
+    for name, column_type in COLUMNS:
+        if name not in existing:
+            op.add_column('inventory_items', sa.Column(name, column_type, nullable=True))
+    op.create_index(
+        'ix_inventory_items_sorted_dims',
+        'inventory_items',
+        ['is_available', 'dim_min', 'dim_mid', 'dim_max'],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_inventory_items_bounding_volume',
+        'inventory_items',
+        ['is_available', 'bounding_volume'],
+        if_not_exists=True,
+    )
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inventory_items_bounding_volume', table_name='inventory_items', if_exists=True)
+    op.drop_index('ix_inventory_items_sorted_dims', table_name='inventory_items', if_exists=True)
+    with op.batch_alter_table('inventory_items') as batch_op:
+        for name, _ in reversed(COLUMNS):
+            batch_op.drop_column(name)
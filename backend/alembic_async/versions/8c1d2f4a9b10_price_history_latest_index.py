@@ -0,0 +1,36 @@
+"""price history latest-per-item index
+
+New tables are created by create_tables() on startup; this revision only
+adds the composite index to price_history tables that already exist.
+
+Revision ID: 8c1d2f4a9b10
+Revises:
+Create Date: 2026-10-19 09:12:41.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1d2f4a9b10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_price_history_item_type_effective',
+        'price_history',
+        ['inventory_item_id', 'price_type', 'effective_date'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_price_history_item_type_effective', table_name='price_history', if_exists=True)
@@ -1,15 +1,20 @@
-from flask import Flask
 import os
-from .extensions import db, ma, migrate
-# Temporarily disable routes that require ML libraries due to disk space constraints
-# from .routes.image_handler import image_handler_bp
-from .routes.measurements import measurements_bp
-from .routes.metal_pieces import metal_piece_bp
-# from .routes.esp32 import esp32_bp
-# from .routes.dual_esp32 import dual_esp32_bp
-from flask_cors import CORS
+
+# The Flask stack is imported in create_app() only: the FastAPI server
+# (app.fastapi_app) imports this package too and would otherwise load
+# Flask, Flask-SQLAlchemy, Marshmallow and Alembic on every cold start.
 
 def create_app(config_class="app.config.Config"):
+    from flask import Flask
+    from flask_cors import CORS
+    from .extensions import db, ma, migrate
+    # Temporarily disable routes that require ML libraries due to disk space constraints
+    # from .routes.image_handler import image_handler_bp
+    from .routes.measurements import measurements_bp
+    from .routes.metal_pieces import metal_piece_bp
+    # from .routes.esp32 import esp32_bp
+    # from .routes.dual_esp32 import dual_esp32_bp
+
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -0,0 +1,4 @@
+"""
+FastAPI routers for the metal piece measurement system.
+Each module exposes a ``router`` that is included by ``app.fastapi_app``.
+"""
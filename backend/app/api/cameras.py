@@ -0,0 +1,26 @@
+"""
+Camera health status for the UI.
+"""
+
+from fastapi import APIRouter, Depends
+
+from ..cameras.health import HealthMonitor, get_health_monitor
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/cameras", tags=["esp32"])
+
+
+@router.get("/health")
+async def camera_health(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """
+    Per-camera availability, circuit state, error rate and latency histograms,
+    plus how many capture requests were coalesced.
+
+    ``available`` is false while a camera's circuit is open; capture requests
+    would fail immediately, so the UI disables capturing until it recovers.
+    """
+    status = monitor.status()
+    status["available"] = all(camera["available"] for camera in status["cameras"].values())
+    status["single_flight"] = monitor.cameras.single_flight.to_dict()
+    return FastJSONResponse(status)
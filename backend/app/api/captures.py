@@ -0,0 +1,93 @@
+"""
+Read access to the capture archive.
+"""
+
+import asyncio
+import os
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, Response
+
+from ..capture_archive import CaptureArchive, get_capture_archive
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/captures", tags=["captures"])
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+# Archived image role -> measured view
+_ROLE_VIEWS = {"front": "bottom", "side": "side"}
+
+
+@router.get("")
+async def list_captures(
+    limit: int = Query(50, ge=1, le=1000),
+    inventory_item_id: Optional[int] = Query(None),
+    archive: CaptureArchive = Depends(get_capture_archive),
+):
+    """Most recent archived images, newest first, optionally for one inventory item."""
+    captures = await asyncio.to_thread(archive.recent, limit, inventory_item_id)
+    return FastJSONResponse({"captures": captures})
+
+
+@router.get("/stats")
+async def capture_stats(archive: CaptureArchive = Depends(get_capture_archive)):
+    """Number of captures and files, total bytes and pending writes."""
+    return FastJSONResponse(await asyncio.to_thread(archive.stats))
+
+
+@router.get("/files/{sha256}")
+async def capture_file(
+    sha256: str,
+    thumbnail: bool = Query(False, description="Return the downscaled copy"),
+    archive: CaptureArchive = Depends(get_capture_archive),
+):
+    """Archived image by content hash (immutable, so cacheable indefinitely)."""
+    if not _SHA256.match(sha256):
+        raise HTTPException(status_code=400, detail="Invalid image id")
+    path = archive.path_for(sha256, thumbnail)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        path,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+@router.get("/{capture_id}/annotated/{role}")
+async def annotated_capture(
+    capture_id: str,
+    role: str,
+    archive: CaptureArchive = Depends(get_capture_archive),
+):
+    """
+    The archived front or side image, unwarped, with the boxes, measured edges
+    and values of its measurement drawn on (rendered on request as JPEG).
+    """
+    if role not in _ROLE_VIEWS:
+        raise HTTPException(status_code=400, detail="Role must be front or side")
+    capture = await asyncio.to_thread(archive.capture, capture_id)
+    if capture is None or role not in capture["files"]:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    annotation = capture["annotations"].get(_ROLE_VIEWS[role])
+    if annotation is None:
+        raise HTTPException(status_code=404, detail="No measurement annotations for this image")
+    path = archive.path_for(capture["files"][role])
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    def render() -> bytes:
+        from ..image_handler.annotate import render_annotated
+
+        with open(path, "rb") as f:
+            return render_annotated(f.read(), annotation)
+
+    try:
+        content = await asyncio.to_thread(render)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(content, media_type="image/jpeg")
@@ -0,0 +1,101 @@
+"""
+Dual ESP32 capture routes (FastAPI port of ``routes/dual_esp32.py``).
+
+Both cameras are always contacted concurrently; images are measured in
+memory. Responses reference the images by id and URL (``/api/images/<id>``)
+instead of inlining them as base64.
+"""
+
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends
+
+from ..blob_store import BlobStore, get_blob_store, image_url
+from ..cameras.capture import capture_pair, trigger_pair
+from ..cameras.client import CameraError, CameraRegistry, get_cameras
+from ..cameras.stream import CameraStreams, get_camera_streams
+from ..capture_archive import CaptureArchive, get_capture_archive
+from ..serialization import FastJSONResponse
+from .esp32 import calibration_failed, measure_pair, trigger_error
+
+
+router = APIRouter(prefix="/api/dual_esp32", tags=["esp32"])
+
+
+def _image_refs(blobs: BlobStore, front_bytes: bytes, side_bytes: bytes) -> dict:
+    """Store both images and return their ids and URLs for the JSON response."""
+    refs = {}
+    for prefix, data in (("front", front_bytes), ("side", side_bytes)):
+        blob_id = blobs.put(data, "image/jpeg")
+        refs[f"{prefix}_image_id"] = blob_id
+        refs[f"{prefix}_image_url"] = image_url(blob_id)
+    return refs
+
+
+async def _capture_and_measure(
+    cameras: CameraRegistry,
+    streams: Optional[CameraStreams],
+    blobs: BlobStore,
+    archive: CaptureArchive,
+) -> Tuple[dict, int]:
+    try:
+        front_bytes, side_bytes = await capture_pair(cameras, streams)
+    except CameraError as e:
+        return {"error": "Failed to capture images", "details": str(e)}, e.status_code
+
+    images = _image_refs(blobs, front_bytes, side_bytes)
+    images["capture_id"] = archive.submit({"front": front_bytes, "side": side_bytes})
+    try:
+        data = await measure_pair(front_bytes, side_bytes)
+    except Exception as e:
+        return {"error": "Failed to process images", "details": str(e), **images}, 500
+    archive.attach_annotations(images["capture_id"], data.get("annotations", {}))
+
+    if calibration_failed(data):
+        return {"error": "Calibration failed", "details": "; ".join(data["errors"]), **images}, 400
+    return {"data": data, **images}, 200
+
+
+@router.post("/capture_coordinated")
+async def capture_coordinated(
+    cameras: CameraRegistry = Depends(get_cameras),
+    streams: Optional[CameraStreams] = Depends(get_camera_streams),
+    blobs: BlobStore = Depends(get_blob_store),
+    archive: CaptureArchive = Depends(get_capture_archive),
+):
+    """
+    Capture from both cameras at once and measure the piece.
+
+    In streaming mode the sharpest time-matched pair of recent stream frames is
+    used; otherwise (or when a stream has no fresh frames) both cameras are
+    asked for a new picture (``GET /capture``). Concurrent requests share one
+    capture and one measurement.
+
+    Returns:
+        {"data": measurements, "capture_id", "front_image_id", "front_image_url",
+        "side_image_id", "side_image_url"}; errors carry the image references
+        too so the operator can see what went wrong
+    """
+    content, status_code = await cameras.single_flight.do(
+        "capture_coordinated", lambda: _capture_and_measure(cameras, streams, blobs, archive)
+    )
+    return FastJSONResponse(content, status_code=status_code)
+
+
+async def _trigger_and_fetch(cameras: CameraRegistry, blobs: BlobStore) -> Tuple[dict, int]:
+    try:
+        front_bytes, side_bytes = await trigger_pair(cameras)
+    except CameraError as e:
+        return trigger_error(e)
+
+    return _image_refs(blobs, front_bytes, side_bytes), 200
+
+
+@router.post("/capture_images")
+async def capture_images(cameras: CameraRegistry = Depends(get_cameras), blobs: BlobStore = Depends(get_blob_store)):
+    """
+    Trigger both cameras (``POST /capture``) and return references to the two
+    images without measuring. Concurrent requests share one capture.
+    """
+    content, status_code = await cameras.single_flight.do("capture_images", lambda: _trigger_and_fetch(cameras, blobs))
+    return FastJSONResponse(content, status_code=status_code)
@@ -0,0 +1,74 @@
+"""
+ESP32 ground-level capture route (FastAPI port of ``routes/esp32.py``).
+
+The camera frames are fetched concurrently through the pooled camera clients
+and measured in memory by the measurement engine, so no temp files are written.
+"""
+
+from typing import Dict, Tuple
+
+from fastapi import APIRouter, Depends
+
+from ..cameras.capture import trigger_pair
+from ..cameras.client import CameraError, CameraRegistry, get_cameras
+from ..capture_archive import CaptureArchive, get_capture_archive
+from ..image_handler.scheduler import schedule_measurement
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/esp32", tags=["esp32"])
+
+CALIBRATION_ERROR_MARKER = "Unzureichende Linienabst"
+
+
+async def measure_pair(front_bytes: bytes, side_bytes: bytes) -> Dict:
+    """Run the in-memory measurement engine on the measurement scheduler."""
+    return await schedule_measurement(front_bytes, side_bytes)
+
+
+def calibration_failed(data: Dict) -> bool:
+    """True if the grid calibration of either image failed."""
+    return any(CALIBRATION_ERROR_MARKER in error for error in data.get("errors", []))
+
+
+def trigger_error(e: CameraError) -> Tuple[Dict, int]:
+    """Error response for a failed trigger_pair()."""
+    error = "Failed to trigger cameras" if e.operation == "trigger" else "Failed to fetch images"
+    return {"error": error, "details": str(e)}, e.status_code
+
+
+async def _capture_ground_level(cameras: CameraRegistry, archive: CaptureArchive) -> Tuple[Dict, int]:
+    try:
+        front_bytes, side_bytes = await trigger_pair(cameras, dual=True)
+    except CameraError as e:
+        return trigger_error(e)
+
+    capture_id = archive.submit({"front": front_bytes, "side": side_bytes})
+    try:
+        data = await measure_pair(front_bytes, side_bytes)
+    except Exception as e:
+        return {"error": "Failed to process images", "details": str(e)}, 500
+    archive.attach_annotations(capture_id, data.get("annotations", {}))
+
+    if calibration_failed(data):
+        return {"error": "Calibration failed", "details": "; ".join(data["errors"])}, 400
+    return {"data": data, "capture_id": capture_id}, 200
+
+
+@router.post("/capture_ground_level")
+async def capture_ground_level(
+    cameras: CameraRegistry = Depends(get_cameras),
+    archive: CaptureArchive = Depends(get_capture_archive),
+):
+    """
+    Trigger both cameras through cam1, fetch both images and measure the piece.
+    Concurrent requests share one capture and one measurement.
+
+    Returns:
+        {"data": measurements, "capture_id"}; 400 if the grid calibration failed, 500 on camera
+        errors, 503 while a camera is known to be down (fails fast)
+    """
+    content, status_code = await cameras.single_flight.do(
+        "capture_ground_level", lambda: _capture_ground_level(cameras, archive)
+    )
+    return FastJSONResponse(content, status_code=status_code)
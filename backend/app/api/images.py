@@ -0,0 +1,33 @@
+"""
+Binary delivery of captured images referenced by capture responses.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from ..blob_store import BlobStore, get_blob_store
+
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+
+@router.get("/{blob_id}")
+async def get_image(request: Request, blob_id: str, blobs: BlobStore = Depends(get_blob_store)):
+    """
+    Return a stored image with its content type.
+
+    Ids are content hashes, so the response never changes and is cacheable
+    as immutable for the lifetime of the blob; conditional requests get 304.
+    """
+    blob = blobs.get(blob_id)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Image not found or expired")
+
+    etag = f'"{blob_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(blobs.ttl)}, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=blob.data, media_type=blob.content_type, headers=headers)
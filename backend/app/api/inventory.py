@@ -0,0 +1,289 @@
+"""
+Inventory routes that go beyond the basic listing in ``fastapi_app``.
+
+The export endpoint streams the whole (optionally filtered) inventory table
+through a server-side cursor, so memory use stays constant regardless of the
+number of rows. The summary endpoints read the incrementally maintained
+inventory_summary table instead of scanning inventory_items, and the fit
+search uses the sorted-dimension index.
+"""
+
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.fit_search import fit_search_query, format_fit_rows
+from ..database.inventory import INVENTORY_EXPORT_COLUMNS, inventory_filters, inventory_rows_query
+from ..database.models import InventorySummary, Material
+from ..database.session import async_sessionmaker, get_db_session
+from ..database.summary import rebuild_inventory_summary
+from ..serialization import FastJSONResponse, dumps
+
+
+router = APIRouter(prefix="/api/inventory", tags=["inventory"])
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _plain_value(value):
+    """Convert database values to types every export format can represent."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _iter_row_batches(filters: dict, batch_size: int) -> AsyncIterator[Sequence[tuple]]:
+    """
+    Yield inventory rows in batches read through a server-side cursor.
+
+    The session is opened here rather than injected, because the response body
+    is produced after the endpoint function has already returned.
+    """
+    stmt = inventory_rows_query(filters).execution_options(yield_per=batch_size)
+    async with async_sessionmaker() as session:
+        result = await session.stream(stmt)
+        async for batch in result.partitions():
+            yield batch
+
+
+async def _export_csv(filters: dict, batch_size: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(INVENTORY_EXPORT_COLUMNS)
+    async for batch in _iter_row_batches(filters, batch_size):
+        writer.writerows([_plain_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header only when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _export_ndjson(filters: dict, batch_size: int) -> AsyncIterator[bytes]:
+    async for batch in _iter_row_batches(filters, batch_size):
+        yield b"".join(dumps(dict(zip(INVENTORY_EXPORT_COLUMNS, row))) + b"\n" for row in batch)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands out whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("material_id", pa.int64()),
+        ("material_name", pa.string()),
+        ("material_type", pa.string()),
+        ("supplier_id", pa.int64()),
+        ("width_mm", pa.float64()),
+        ("height_mm", pa.float64()),
+        ("depth_mm", pa.float64()),
+        ("volume_mm3", pa.float64()),
+        ("weight_g", pa.float64()),
+        ("quantity", pa.int64()),
+        ("unit_cost", pa.float64()),
+        ("location", pa.string()),
+        ("batch_number", pa.string()),
+        ("quality_grade", pa.string()),
+        ("notes", pa.string()),
+        ("is_available", pa.bool_()),
+        ("received_date", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+
+
+async def _export_parquet(filters: dict, batch_size: int) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in _iter_row_batches(filters, batch_size):
+            columns = list(zip(*batch))
+            arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+            # One row group per cursor batch
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+@router.get("/export")
+async def export_inventory(
+    format: str = Query("csv", description="Export format: csv, ndjson or parquet"),
+    batch_size: int = Query(1000, ge=10, le=50000, description="Rows fetched per cursor batch (and per Parquet row group)"),
+    filters: dict = Depends(inventory_filters),
+):
+    """
+    Stream the inventory as CSV, NDJSON or Parquet.
+
+    Accepts the same optional filters as ``GET /api/inventory``.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+        body = _export_parquet(filters, batch_size)
+    elif format == "ndjson":
+        body = _export_ndjson(filters, batch_size)
+    else:
+        body = _export_csv(filters, batch_size)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"inventory_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/summary")
+async def get_inventory_summary(
+    group_by: str = Query("material", description="Grouping: material, location or material_location"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Totals of available stock (item count, quantity, volume in mm³, weight in g)
+    per material, per location, or per material and location.
+    """
+    if group_by == "material":
+        group_columns = [InventorySummary.material_id, Material.name]
+    elif group_by == "location":
+        group_columns = [InventorySummary.location]
+    elif group_by == "material_location":
+        group_columns = [InventorySummary.material_id, Material.name, InventorySummary.location]
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported grouping: {group_by}")
+
+    stmt = (
+        select(
+            *group_columns,
+            func.sum(InventorySummary.item_count),
+            func.sum(InventorySummary.total_quantity),
+            func.sum(InventorySummary.total_volume),
+            func.sum(InventorySummary.total_weight),
+        )
+        .outerjoin(Material, InventorySummary.material_id == Material.id)
+        .where(InventorySummary.item_count > 0)
+        .group_by(*group_columns)
+        .order_by(*group_columns)
+    )
+
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve inventory summary: {str(e)}")
+
+    groups = []
+    for row in rows:
+        *keys, item_count, total_quantity, total_volume, total_weight = row
+        group = {}
+        if group_by in ("material", "material_location"):
+            group["material_id"] = keys[0]
+            group["material_name"] = keys[1] if keys[1] is not None else "Unknown"
+        if group_by in ("location", "material_location"):
+            group["location"] = keys[-1] or None
+        group.update({
+            "item_count": int(item_count or 0),
+            "total_quantity": int(total_quantity or 0),
+            "total_volume_mm3": float(total_volume or 0),
+            "total_weight_g": float(total_weight or 0),
+        })
+        groups.append(group)
+
+    return FastJSONResponse({
+        "group_by": group_by,
+        "groups": groups,
+        "totals": {
+            "item_count": sum(group["item_count"] for group in groups),
+            "total_quantity": sum(group["total_quantity"] for group in groups),
+            "total_volume_mm3": sum(group["total_volume_mm3"] for group in groups),
+            "total_weight_g": sum(group["total_weight_g"] for group in groups),
+        },
+        "status": "success",
+    })
+
+
+@router.post("/summary/rebuild")
+async def rebuild_summary(db: AsyncSession = Depends(get_db_session)):
+    """
+    Recompute the inventory summary from inventory_items (repair tool).
+    """
+    try:
+        rows = await rebuild_inventory_summary(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild inventory summary: {str(e)}")
+    return {"status": "success", "summary_rows": rows}
+
+
+@router.get("/fit")
+async def find_fitting_pieces(
+    width: float = Query(..., gt=0, description="Required width in mm"),
+    height: float = Query(..., gt=0, description="Required height in mm"),
+    depth: float = Query(..., gt=0, description="Required depth in mm"),
+    limit: int = Query(20, ge=1, le=500, description="Maximum number of candidates"),
+    material_id: Optional[int] = Query(None, description="Only pieces of this material"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Find available pieces that can hold width × height × depth mm in any orientation,
+    smallest waste volume first. Each candidate says which piece axis to use per
+    requested axis.
+    """
+    try:
+        rows = (await db.execute(fit_search_query(width, height, depth, limit, material_id))).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fit search failed: {str(e)}")
+
+    candidates = format_fit_rows(rows, width, height, depth)
+    return FastJSONResponse({
+        "request": {"width_mm": width, "height_mm": height, "depth_mm": depth},
+        "candidates": candidates,
+        "total_count": len(candidates),
+        "status": "success",
+    })
@@ -0,0 +1,87 @@
+"""
+Measurement jobs with server-sent progress events.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from ..database.session import async_sessionmaker
+from ..measurement_jobs import MeasurementJob, MeasurementJobs, get_measurement_jobs
+from ..serialization import FastJSONResponse, dumps
+
+
+router = APIRouter(prefix="/api/measurement_jobs", tags=["measurements"])
+
+_ALLOWED_TYPES = {"image/jpeg", "image/jpg", "image/png"}
+
+
+def _get_job(job_id: str, jobs: MeasurementJobs) -> MeasurementJob:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Measurement job not found or expired")
+    return job
+
+
+@router.post("", status_code=202)
+async def start_measurement_job(
+    image_bottom: UploadFile = File(..., description="Bottom view image for width and height measurement"),
+    image_side: UploadFile = File(..., description="Side view image for depth measurement"),
+    jobs: MeasurementJobs = Depends(get_measurement_jobs),
+):
+    """
+    Start measuring two uploaded images and return at once.
+
+    Returns:
+        {"job_id", "events_url", "status_url"}; progress is delivered on events_url
+    """
+    if image_bottom.content_type not in _ALLOWED_TYPES:
+        raise HTTPException(status_code=400, detail="Bottom image must be JPEG or PNG")
+    if image_side.content_type not in _ALLOWED_TYPES:
+        raise HTTPException(status_code=400, detail="Side image must be JPEG or PNG")
+
+    job = jobs.start(await image_bottom.read(), await image_side.read(), session_factory=async_sessionmaker)
+    return FastJSONResponse(
+        {
+            "job_id": job.id,
+            "events_url": f"/api/measurement_jobs/{job.id}/events",
+            "status_url": f"/api/measurement_jobs/{job.id}",
+        },
+        status_code=202,
+    )
+
+
+@router.get("/{job_id}")
+async def measurement_job_status(job_id: str, jobs: MeasurementJobs = Depends(get_measurement_jobs)):
+    """Current stage and all events so far (for clients that cannot use SSE)."""
+    return FastJSONResponse(_get_job(job_id, jobs).to_dict())
+
+
+@router.get("/{job_id}/events")
+async def measurement_job_events(
+    job_id: str,
+    last_event_id: Optional[str] = Header(None),
+    jobs: MeasurementJobs = Depends(get_measurement_jobs),
+):
+    """
+    Server-sent event stream of the job's stages, starting with the ones
+    already completed. The stream ends after the "done" or "error" event;
+    reconnecting clients resume after their Last-Event-ID.
+    """
+    job = _get_job(job_id, jobs)
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def stream():
+        yield b"retry: 2000\n\n"
+        async for index, event in job.follow(start):
+            if event is None:
+                yield b": keep-alive\n\n"
+            else:
+                yield b"id: %d\ndata: %s\n\n" % (index, dumps(event))
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
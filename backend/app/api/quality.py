@@ -0,0 +1,47 @@
+"""
+Image quality pre-check for the capture UI.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from ..config import Config
+from ..image_handler.quality import check_image_quality
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/quality", tags=["measurements"])
+
+
+@router.post("/check")
+async def check_quality(
+    image_bottom: Optional[UploadFile] = File(None, description="Bottom view image"),
+    image_side: Optional[UploadFile] = File(None, description="Side view image"),
+):
+    """
+    Judge uploaded images before submitting them for measurement.
+
+    Takes a few milliseconds per image. Every view gets
+    {"ok", "code", "message", "metrics", "elapsed_ms"}; code is one of
+    "undecodable", "blurry", "overexposed", "underexposed" or "no_grid" when
+    the image would fail calibration.
+
+    Returns:
+        {"ok": all views ok, "enforced": whether measurements reject failing
+        images (QUALITY_GATE_ENABLED), "views": {"bottom": ..., "side": ...}}
+    """
+    uploads = {view: upload for view, upload in (("bottom", image_bottom), ("side", image_side)) if upload is not None}
+    if not uploads:
+        raise HTTPException(status_code=400, detail="Upload image_bottom and/or image_side")
+
+    views = {}
+    for view, upload in uploads.items():
+        report = await asyncio.to_thread(check_image_quality, await upload.read())
+        views[view] = report.to_dict()
+    return FastJSONResponse({
+        "ok": all(report["ok"] for report in views.values()),
+        "enforced": Config.QUALITY_GATE_ENABLED,
+        "views": views,
+    })
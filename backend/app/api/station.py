@@ -0,0 +1,31 @@
+"""
+Control of the continuous conveyor measurement station.
+"""
+
+from fastapi import APIRouter, Depends
+
+from ..conveyor import ConveyorStation, get_conveyor_station
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/station", tags=["station"])
+
+
+@router.post("/start")
+async def start_station(station: ConveyorStation = Depends(get_conveyor_station)):
+    """Start watching for pieces; measured pieces are saved to the inventory."""
+    station.start()
+    return FastJSONResponse(station.status())
+
+
+@router.post("/stop")
+async def stop_station(station: ConveyorStation = Depends(get_conveyor_station)):
+    """Stop the station; pieces still queued for measurement are dropped."""
+    await station.stop()
+    return FastJSONResponse(station.status())
+
+
+@router.get("/status")
+async def station_status(station: ConveyorStation = Depends(get_conveyor_station)):
+    """Detector state, piece counts, per-stage timings and the most recent results."""
+    return FastJSONResponse(station.status())
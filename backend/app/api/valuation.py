@@ -0,0 +1,143 @@
+"""
+Inventory valuation routes backed by price_history.
+
+Every endpoint accepts ``price_type`` (comma-separated, in priority order,
+default ``valuation,purchase``) and an optional ``as_of`` timestamp for
+historical valuations.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.session import get_db_session
+from ..database.valuation import (
+    item_valuation_query,
+    latest_prices,
+    material_valuation_query,
+    parse_price_types,
+    total_valuation_query,
+)
+from ..serialization import FastJSONResponse
+
+
+router = APIRouter(prefix="/api/valuation", tags=["valuation"])
+
+
+def _latest(db: AsyncSession, price_type: Optional[str], as_of: Optional[datetime]):
+    price_types = parse_price_types(price_type)
+    return price_types, latest_prices(db.bind.dialect.name, price_types, as_of)
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+@router.get("/items")
+async def value_items(
+    price_type: Optional[str] = Query(None, description="Price types in priority order, e.g. valuation,purchase"),
+    as_of: Optional[datetime] = Query(None, description="Value the stock as of this time (default: now)"),
+    material_id: Optional[int] = Query(None, description="Only items of this material"),
+    include_unavailable: bool = Query(False, description="Also value items that are not available"),
+    limit: int = Query(1000, ge=1, le=100000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Current value (latest price × quantity) of each inventory item.
+    """
+    price_types, latest = _latest(db, price_type, as_of)
+    stmt = item_valuation_query(latest, material_id, include_unavailable).limit(limit).offset(offset)
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to value inventory items: {str(e)}")
+
+    return FastJSONResponse({
+        "price_types": price_types,
+        "as_of": as_of,
+        "items": [
+            {
+                "item_id": row.item_id,
+                "material_id": row.material_id,
+                "quantity": row.quantity,
+                "price_per_unit": _number(row.price_per_unit),
+                "currency": row.currency,
+                "price_type": row.price_type,
+                "effective_date": row.effective_date,
+                "value": _number(row.value),
+            }
+            for row in rows
+        ],
+        "status": "success",
+    })
+
+
+@router.get("/materials")
+async def value_materials(
+    price_type: Optional[str] = Query(None, description="Price types in priority order, e.g. valuation,purchase"),
+    as_of: Optional[datetime] = Query(None, description="Value the stock as of this time (default: now)"),
+    include_unavailable: bool = Query(False, description="Also value items that are not available"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Stock value per material and currency.
+    """
+    price_types, latest = _latest(db, price_type, as_of)
+    try:
+        rows = (await db.execute(material_valuation_query(latest, include_unavailable))).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to value materials: {str(e)}")
+
+    return FastJSONResponse({
+        "price_types": price_types,
+        "as_of": as_of,
+        "materials": [
+            {
+                "material_id": row.material_id,
+                "material_name": row.material_name,
+                "currency": row.currency,
+                "priced_items": row.priced_items,
+                "unpriced_items": int(row.unpriced_items or 0),
+                "total_value": _number(row.total_value),
+            }
+            for row in rows
+        ],
+        "status": "success",
+    })
+
+
+@router.get("/total")
+async def value_warehouse(
+    price_type: Optional[str] = Query(None, description="Price types in priority order, e.g. valuation,purchase"),
+    as_of: Optional[datetime] = Query(None, description="Value the stock as of this time (default: now)"),
+    include_unavailable: bool = Query(False, description="Also value items that are not available"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Total warehouse value per currency.
+    """
+    price_types, latest = _latest(db, price_type, as_of)
+    try:
+        rows = (await db.execute(total_valuation_query(latest, include_unavailable))).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to value warehouse: {str(e)}")
+
+    totals = [row for row in rows if row.currency is not None]
+    unpriced = sum(int(row.unpriced_items or 0) for row in rows)
+    return FastJSONResponse({
+        "price_types": price_types,
+        "as_of": as_of,
+        "totals": [
+            {
+                "currency": row.currency,
+                "priced_items": row.priced_items,
+                "total_value": _number(row.total_value),
+            }
+            for row in totals
+        ],
+        "unpriced_items": unpriced,
+        "status": "success",
+    })
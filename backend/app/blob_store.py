@@ -0,0 +1,95 @@
+"""
+Short-lived, content-addressed in-memory store for captured images.
+
+Capture responses hand out ``/api/images/<sha256>`` URLs instead of inlining
+the JPEGs as base64. Blobs are keyed by the SHA-256 of their content, so an
+id always names the same bytes and responses can be cached as immutable.
+Entries expire after a TTL and the least recently used ones are evicted
+when the store exceeds its byte budget.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+
+from .config import Config
+
+
+class Blob(NamedTuple):
+    data: bytes
+    content_type: str
+    expires_at: float  # time.monotonic()
+
+
+class BlobStore:
+    """
+    Thread-safe LRU of blobs with per-entry expiry.
+
+    Args:
+        max_bytes: Total size budget; least recently used blobs are evicted beyond it
+        ttl: Seconds a blob stays retrievable after its last put()
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._blobs: "OrderedDict[str, Blob]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config=Config) -> "BlobStore":
+        return cls(max_bytes=config.IMAGE_BLOB_MAX_MB * 1024 * 1024, ttl=config.IMAGE_BLOB_TTL)
+
+    def put(self, data: bytes, content_type: str = "image/jpeg") -> str:
+        """Store *data* and return its id (hex SHA-256); re-putting refreshes the TTL."""
+        blob_id = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            old = self._blobs.pop(blob_id, None)
+            if old is not None:
+                self._size -= len(old.data)
+            self._blobs[blob_id] = Blob(data, content_type, time.monotonic() + self.ttl)
+            self._size += len(data)
+            self._evict()
+        return blob_id
+
+    def get(self, blob_id: str) -> Optional[Blob]:
+        """Return the blob, or None if it is unknown or expired."""
+        with self._lock:
+            blob = self._blobs.get(blob_id)
+            if blob is None:
+                return None
+            if blob.expires_at < time.monotonic():
+                del self._blobs[blob_id]
+                self._size -= len(blob.data)
+                return None
+            self._blobs.move_to_end(blob_id)
+            return blob
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for blob_id in [key for key, blob in self._blobs.items() if blob.expires_at < now]:
+            self._size -= len(self._blobs.pop(blob_id).data)
+        while self._size > self.max_bytes and len(self._blobs) > 1:
+            _, blob = self._blobs.popitem(last=False)
+            self._size -= len(blob.data)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+def image_url(blob_id: str) -> str:
+    return f"/api/images/{blob_id}"
+
+
+def get_blob_store(request: Request) -> BlobStore:
+    """FastAPI dependency returning the store created in the app lifespan."""
+    return request.app.state.blobs
@@ -0,0 +1,3 @@
+"""
+ESP32 camera access: pooled async client and a fake camera server for local runs.
+"""
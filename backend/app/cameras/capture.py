@@ -0,0 +1,68 @@
+"""
+Fresh front/side image pairs from the two cameras.
+
+Every way of taking the pair shares one single-flight key: while any capture
+of the pair is in flight (or within the coalescing window), further callers
+receive its images instead of triggering the cameras again. The cameras'
+sessions are held for the whole capture, so no other picture request can
+land between a trigger and its fetch.
+"""
+
+import asyncio
+from typing import Optional, Tuple
+
+from .client import CameraRegistry
+from .stream import CameraStreams
+
+PAIR_KEY = "cam1+cam2"
+
+
+async def capture_pair(cameras: CameraRegistry, streams: Optional[CameraStreams] = None) -> Tuple[bytes, bytes]:
+    """
+    Front (cam1) and side (cam2) JPEGs of the current scene.
+
+    Uses the sharpest time-matched pair of recent stream frames when streaming
+    is enabled; otherwise (or when a stream has no fresh frames) both cameras
+    are asked for a new picture (``GET /capture``) concurrently. Concurrent
+    callers share one capture of the pair (``cameras.single_flight``).
+
+    Raises:
+        CameraError: if a camera cannot be reached
+    """
+
+    async def capture() -> Tuple[bytes, bytes]:
+        pair = await streams.capture_pair() if streams is not None else None
+        if pair is not None:
+            return pair
+        async with cameras.session("cam1", "cam2"):
+            front_bytes, side_bytes = await asyncio.gather(cameras["cam1"].capture(), cameras["cam2"].capture())
+        return front_bytes, side_bytes
+
+    return await cameras.single_flight.do(PAIR_KEY, capture)
+
+
+async def trigger_pair(cameras: CameraRegistry, dual: bool = False) -> Tuple[bytes, bytes]:
+    """
+    Trigger both cameras and download the front (cam1) and side (cam2) pictures.
+
+    Args:
+        dual: Trigger both through cam1 (``POST /trigger_dual``) instead of one
+            ``POST /capture`` per camera
+
+    Raises:
+        CameraError: if a camera cannot be triggered (operation "trigger") or
+            its picture cannot be fetched (operation "fetch")
+    """
+
+    async def capture() -> Tuple[bytes, bytes]:
+        async with cameras.session("cam1", "cam2"):
+            if dual:
+                await cameras["cam1"].trigger("/trigger_dual")
+            else:
+                await asyncio.gather(cameras["cam1"].trigger(), cameras["cam2"].trigger())
+            front_bytes, side_bytes = await asyncio.gather(
+                cameras["cam1"].fetch_captured(), cameras["cam2"].fetch_captured()
+            )
+        return front_bytes, side_bytes
+
+    return await cameras.single_flight.do(PAIR_KEY, capture)
@@ -0,0 +1,297 @@
+"""
+Async HTTP client for the ESP32 cameras.
+
+One ``CameraClient`` per camera keeps a persistent keep-alive connection pool
+(httpx.AsyncClient), applies per-operation timeouts and retries transient
+failures a bounded number of times with jittered exponential backoff. Triggers
+(which fire the shutter) are only retried when the camera was never reached.
+``CameraRegistry`` owns the clients for the whole application lifetime; it is
+created in the FastAPI lifespan and reached through ``get_cameras``.
+
+Each client records latency and failures in its ``CameraHealth``; while the
+camera's circuit breaker is open, requests fail fast with ``CameraUnavailable``.
+Requests to one camera are serialized by a per-camera lock (the firmware
+handles one at a time). Picture-taking sequences additionally hold the
+camera's ``session()`` from start to end, so a capture cannot land between
+another caller's trigger and fetch. The registry's ``SingleFlight`` lets
+concurrent callers share one physical capture of the pair
+(app/cameras/capture.py).
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import random
+from typing import AsyncIterator, Dict, FrozenSet, Optional
+
+import httpx
+from fastapi import Request
+
+from ..config import Config
+from .health import CameraHealth
+from .singleflight import SingleFlight
+
+
+# Errors worth another attempt: the camera was busy, slow or briefly unreachable
+_RETRYABLE_EXCEPTIONS = (httpx.TransportError,)
+_RETRYABLE_STATUS = {500, 502, 503, 504}
+# The request cannot have reached the camera: safe to repeat even a trigger
+_CONNECT_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# Cameras whose session the current task holds (inherited by the tasks it gathers)
+_held_sessions: contextvars.ContextVar[FrozenSet["CameraClient"]] = contextvars.ContextVar(
+    "camera_sessions", default=frozenset()
+)
+
+
+class CameraError(RuntimeError):
+    """Raised when a camera request fails after all retries."""
+
+    status_code = 500
+
+    def __init__(self, camera: str, message: str, operation: Optional[str] = None):
+        super().__init__(f"{camera}: {message}")
+        self.camera = camera
+        self.operation = operation
+
+
+class CameraUnavailable(CameraError):
+    """Raised without contacting the camera while its circuit breaker is open."""
+
+    status_code = 503
+
+
+def fix_jpeg_bytes(data: bytes) -> bytes:
+    """Return *data* truncated at the JPEG end marker if present."""
+    end_marker = b"\xff\xd9"
+    idx = data.rfind(end_marker)
+    if idx != -1:
+        return data[: idx + 2]
+    return data
+
+
+class CameraClient:
+    """
+    Pooled client for a single ESP32 camera.
+
+    Args:
+        name: Camera name used in errors and logs (e.g. "cam1")
+        base_url: Camera base URL, e.g. "http://192.168.1.184"
+        timeouts: Seconds per operation ("connect", "capture", "trigger", "fetch", "ping")
+        retries: Additional attempts after the first failure
+        backoff: Base delay in seconds for the jittered exponential backoff
+        max_connections: Size of the keep-alive pool (the ESP32 serves one request at a time)
+        transport: Optional httpx transport (tests / fake cameras)
+        health: Health record and circuit breaker (default: CameraHealth(name))
+    """
+
+    DEFAULT_TIMEOUTS = {
+        "connect": 2.0,
+        "capture": 10.0,
+        "trigger": 5.0,
+        "fetch": 10.0,
+        "ping": 2.0,
+    }
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        timeouts: Optional[Dict[str, float]] = None,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_connections: int = 2,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        health: Optional[CameraHealth] = None,
+    ):
+        self.name = name
+        self.health = health or CameraHealth(name)
+        self._lock = asyncio.Lock()
+        self._session = asyncio.Lock()
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(self.timeouts["capture"], connect=self.timeouts["connect"]),
+            transport=transport,
+        )
+
+    def _timeout(self, operation: str) -> httpx.Timeout:
+        return httpx.Timeout(self.timeouts.get(operation, self.timeouts["capture"]), connect=self.timeouts["connect"])
+
+    async def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: uniform in [0, backoff * 2^attempt], capped at 2 s
+        await asyncio.sleep(random.uniform(0, min(2.0, self.backoff * (2 ** attempt))))
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        operation: str,
+        retries: Optional[int] = None,
+        probe: bool = False,
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """
+        Send a request with the operation's timeout and bounded retries.
+
+        A failed request counts as one failure towards the circuit breaker,
+        however many attempts it took.
+
+        Args:
+            probe: Send even while the circuit is open (health pings)
+            idempotent: False for requests with a side effect on the camera
+                (triggers): only connection failures are retried, as a read
+                timeout or 5xx may come after the shutter already fired
+
+        Raises:
+            CameraUnavailable: If the circuit is open; the camera is not contacted
+            CameraError: If every attempt failed or the camera answered with a 4xx status
+        """
+        retries = self.retries if retries is None else retries
+        last_error: Optional[Exception] = None
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            if not self.health.breaker.allow(probe):
+                raise CameraUnavailable(
+                    self.name,
+                    f"camera is unavailable (retry in {self.health.breaker.retry_in():.0f} s): {self.health.last_error}",
+                    operation,
+                )
+            try:
+                async with self._lock:
+                    start = loop.time()
+                    response = await self._client.request(method, path, timeout=self._timeout(operation))
+                if response.status_code in _RETRYABLE_STATUS:
+                    last_error = CameraError(self.name, f"{method} {path} returned {response.status_code}", operation)
+                    if not idempotent:
+                        break
+                else:
+                    # A 4xx still proves the camera is reachable
+                    self.health.record_success(operation, loop.time() - start)
+                    response.raise_for_status()
+                    return response
+            except _RETRYABLE_EXCEPTIONS as e:
+                last_error = e
+                if not idempotent and not isinstance(e, _CONNECT_EXCEPTIONS):
+                    break
+            except httpx.HTTPStatusError as e:
+                raise CameraError(self.name, f"{method} {path} returned {e.response.status_code}", operation) from e
+            if attempt < retries:
+                await self._sleep_before_retry(attempt)
+        self.health.record_failure(f"{method} {path}: {last_error!r}")
+        if isinstance(last_error, CameraError):
+            raise last_error
+        raise CameraError(self.name, f"{method} {path} failed: {last_error!r}", operation) from last_error
+
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncIterator[None]:
+        """
+        Exclusive use of the camera's picture-taking across several requests.
+
+        Re-entrant: nested sessions of the holding task, and of the tasks it
+        starts, pass straight through.
+        """
+        held = _held_sessions.get()
+        if self in held:
+            yield
+            return
+        async with self._session:
+            token = _held_sessions.set(held | {self})
+            try:
+                yield
+            finally:
+                _held_sessions.reset(token)
+
+    async def capture(self) -> bytes:
+        """Take a picture and return it directly (``GET /capture``)."""
+        async with self.session():
+            response = await self.request("GET", "/capture", "capture")
+        return fix_jpeg_bytes(response.content)
+
+    async def trigger(self, path: str = "/capture") -> None:
+        """
+        Ask the camera to take a picture it keeps for a later fetch (``POST``).
+        Hold ``session()`` until the fetch.
+        """
+        await self.request("POST", path, "trigger", idempotent=False)
+
+    async def fetch_captured(self) -> bytes:
+        """Download the last triggered picture (``GET /get_captured_image``)."""
+        response = await self.request("GET", "/get_captured_image", "fetch")
+        return fix_jpeg_bytes(response.content)
+
+    async def ping(self, probe: bool = False) -> float:
+        """Return the round-trip time of a status request in seconds (no retries)."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.request("GET", "/", "ping", retries=0, probe=probe)
+        return loop.time() - start
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class CameraRegistry:
+    """
+    The application's camera clients, keyed by name ("cam1", "cam2").
+
+    ``single_flight`` coalesces concurrent captures of the camera pair; see
+    app/cameras/capture.py and app/cameras/singleflight.py.
+    """
+
+    def __init__(self, clients: Dict[str, CameraClient], coalesce_window: float = 0.0):
+        self.clients = clients
+        self.single_flight = SingleFlight(coalesce_window)
+
+    @classmethod
+    def from_config(cls, config=Config, transport: Optional[httpx.AsyncBaseTransport] = None) -> "CameraRegistry":
+        timeouts = {
+            "connect": config.ESP32_CONNECT_TIMEOUT,
+            "capture": config.ESP32_CAPTURE_TIMEOUT,
+            "trigger": config.ESP32_TRIGGER_TIMEOUT,
+            "fetch": config.ESP32_CAPTURE_TIMEOUT,
+        }
+        urls = {"cam1": config.ESP32_CAM1_URL, "cam2": config.ESP32_CAM2_URL}
+        return cls({
+            name: CameraClient(
+                name,
+                url,
+                timeouts=timeouts,
+                retries=config.ESP32_RETRIES,
+                backoff=config.ESP32_RETRY_BACKOFF,
+                transport=transport,
+                health=CameraHealth(
+                    name,
+                    failure_threshold=config.ESP32_BREAKER_FAILURES,
+                    reset_timeout=config.ESP32_BREAKER_RESET,
+                ),
+            )
+            for name, url in urls.items()
+        }, coalesce_window=config.ESP32_COALESCE_WINDOW)
+
+    def __getitem__(self, name: str) -> CameraClient:
+        return self.clients[name]
+
+    @contextlib.asynccontextmanager
+    async def session(self, *names: str) -> AsyncIterator[None]:
+        """Hold the sessions of the named cameras (default: all), taken in name order so callers cannot deadlock."""
+        async with contextlib.AsyncExitStack() as stack:
+            for name in sorted(names or self.clients):
+                await stack.enter_async_context(self.clients[name].session())
+            yield
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(client.aclose() for client in self.clients.values()))
+
+
+def get_cameras(request: Request) -> CameraRegistry:
+    """FastAPI dependency returning the registry created in the app lifespan."""
+    return request.app.state.cameras
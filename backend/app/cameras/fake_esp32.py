@@ -0,0 +1,321 @@
+"""
+Fake ESP32 camera server for local development and tests.
+
+Speaks just enough HTTP/1.1 (with keep-alive) to stand in for the camera
+firmware:
+- ``GET /``                    status JSON
+- ``GET /capture``             returns a JPEG immediately
+- ``POST /capture``            "takes" a picture kept for ``/get_captured_image``
+- ``POST /trigger_dual``       same as ``POST /capture``
+- ``GET /get_captured_image``  returns the last triggered JPEG
+- ``GET /stream``              MJPEG stream (multipart/x-mixed-replace)
+
+FakeConveyorCamera replays a conveyor scene instead of a still image: pieces
+slide in, rest under the camera and slide out again.
+
+Every response is delayed by a configurable latency. The stream can mix in
+blurred frames to exercise sharpest-frame selection. Run standalone with
+
+    python -m app.cameras.fake_esp32 --port 8081 --latency 0.3 --fps 15 --blur-ratio 0.5
+
+or in-process::
+
+    async with FakeEsp32(latency=0.1) as camera:
+        client = CameraClient("cam1", camera.url)
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+
+def synthetic_frame(
+    width: int = 800, height: int = 600, cell_px: int = 40, piece: bool = True, piece_offset: int = 0
+) -> bytes:
+    """
+    Render a JPEG of a 1 cm calibration grid, optionally with a dark "metal piece".
+
+    *piece_offset* shifts the piece horizontally by that many pixels (it may
+    leave the frame). Uses OpenCV when available and Pillow otherwise.
+    """
+    left = width // 3 + piece_offset
+    box = (left, height // 3, left + 5 * cell_px, height // 3 + 4 * cell_px)
+    try:
+        import cv2
+        import numpy as np
+
+        image = np.full((height, width, 3), 235, np.uint8)
+        for x in range(0, width, cell_px):
+            cv2.line(image, (x, 0), (x, height - 1), (40, 40, 40), 2)
+        for y in range(0, height, cell_px):
+            cv2.line(image, (0, y), (width - 1, y), (40, 40, 40), 2)
+        if piece:
+            cv2.rectangle(image, box[:2], box[2:], (90, 90, 100), -1)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return encoded.tobytes()
+    except ImportError:
+        import io
+        from PIL import Image, ImageDraw
+
+        image = Image.new("RGB", (width, height), (235, 235, 235))
+        draw = ImageDraw.Draw(image)
+        for x in range(0, width, cell_px):
+            draw.line([(x, 0), (x, height - 1)], fill=(40, 40, 40), width=2)
+        for y in range(0, height, cell_px):
+            draw.line([(0, y), (width - 1, y)], fill=(40, 40, 40), width=2)
+        if piece:
+            draw.rectangle(box, fill=(100, 90, 90))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        return buffer.getvalue()
+
+
+def blurred_frame(data: bytes, radius: int = 6) -> bytes:
+    """Return a motion-blurred copy of a JPEG (horizontal box blur)."""
+    import io
+    from PIL import Image, ImageFilter
+
+    image = Image.open(io.BytesIO(data))
+    blurred = image.filter(ImageFilter.BoxBlur(radius))
+    buffer = io.BytesIO()
+    blurred.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class FakeEsp32:
+    """
+    Minimal asyncio HTTP server imitating one ESP32 camera.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        latency: Seconds to wait before answering each request
+        image: JPEG bytes to serve (default: synthetic_frame())
+        fps: Frame rate of ``/stream``
+        blur_ratio: Fraction of streamed frames that are blurred
+        seed: Seed for choosing the blurred frames
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        image: Optional[bytes] = None,
+        fps: float = 10.0,
+        blur_ratio: float = 0.0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.image = image if image is not None else synthetic_frame()
+        self.fps = fps
+        self.blur_ratio = blur_ratio
+        self._blurred: Optional[bytes] = None
+        self._random = random.Random(seed)
+        self.frames_streamed = 0
+        self._handlers = set()
+        self.captured: Optional[bytes] = None
+        self.connections = 0
+        self.requests = 0
+        self.fail_next = 0  # answer the next N requests with 503
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "FakeEsp32":
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Drop open keep-alive and stream connections as a powered-off camera would
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeEsp32":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def frame(self) -> bytes:
+        """The JPEG returned for the next capture (override for changing scenes)."""
+        return self.image
+
+    def stream_frame(self) -> bytes:
+        """The next ``/stream`` frame: frame(), blurred with probability blur_ratio."""
+        if self.blur_ratio and self._random.random() < self.blur_ratio:
+            if self._blurred is None:
+                self._blurred = blurred_frame(self.frame())
+            return self._blurred
+        return self.frame()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        boundary = "123456789000000000000987654321"
+        writer.write(
+            (
+                "HTTP/1.1 200 OK\r\n"
+                f"Content-Type: multipart/x-mixed-replace;boundary={boundary}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+        )
+        while True:
+            data = self.stream_frame()
+            writer.write(
+                f"--{boundary}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+                + data
+                + b"\r\n"
+            )
+            await writer.drain()
+            self.frames_streamed += 1
+            await asyncio.sleep(1 / self.fps)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if not await self._respond(method, path.split("?", 1)[0], writer, keep_alive):
+                    break
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _respond(self, method: str, path: str, writer: asyncio.StreamWriter, keep_alive: bool) -> bool:
+        """Write one response; return False when the connection should be closed."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            self._write(writer, 503, "text/plain", b"busy", keep_alive)
+        elif path == "/stream" and method == "GET":
+            await self._stream(writer)
+            return False
+        elif path == "/" and method == "GET":
+            body = json.dumps({"status": "ok", "camera": "fake-esp32"}).encode()
+            self._write(writer, 200, "application/json", body, keep_alive)
+        elif path == "/capture" and method == "GET":
+            self._write(writer, 200, "image/jpeg", self.frame(), keep_alive)
+        elif path in ("/capture", "/trigger_dual") and method == "POST":
+            self.captured = self.frame()
+            self._write(writer, 200, "text/plain", b"OK", keep_alive)
+        elif path == "/get_captured_image" and method == "GET":
+            if self.captured is None:
+                self._write(writer, 404, "text/plain", b"no image captured", keep_alive)
+            else:
+                self._write(writer, 200, "image/jpeg", self.captured, keep_alive)
+        else:
+            self._write(writer, 404, "text/plain", b"not found", keep_alive)
+        await writer.drain()
+        return True
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes, keep_alive: bool) -> None:
+        reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}.get(status, "OK")
+        headers = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(headers.encode("latin-1") + body)
+
+
+class FakeConveyorCamera(FakeEsp32):
+    """
+    Fake camera watching a conveyor that brings one piece per *cycle* seconds.
+
+    Each cycle the belt is empty for the first 20 %, the piece slides in
+    during the next 20 %, rests under the camera for 40 % and slides out
+    during the last 20 %. Cameras sharing *epoch* (time.monotonic()) see the
+    same piece at the same time.
+    """
+
+    def __init__(self, *args, cycle: float = 4.0, epoch: Optional[float] = None, width: int = 800, **kwargs):
+        super().__init__(*args, image=b"", **kwargs)
+        self.cycle = cycle
+        self.epoch = time.monotonic() if epoch is None else epoch
+        self.width = width
+        self._frames = {}
+
+    def piece_offset(self) -> Optional[int]:
+        """Horizontal offset of the piece from its resting position, None while the belt is empty."""
+        phase = ((time.monotonic() - self.epoch) % self.cycle) / self.cycle
+        if phase < 0.2:
+            return None
+        if phase < 0.4:
+            return int(-self.width * (0.4 - phase) / 0.2)
+        if phase < 0.8:
+            return 0
+        return int(self.width * (phase - 0.8) / 0.2)
+
+    def frame(self) -> bytes:
+        offset = self.piece_offset()
+        # Quantize so a handful of encoded frames cover the whole cycle
+        key = None if offset is None else offset // 20 * 20
+        if key not in self._frames:
+            self._frames[key] = synthetic_frame(self.width, piece=key is not None, piece_offset=key or 0)
+        return self._frames[key]
+
+
+async def _serve(host: str, port: int, latency: float, image_path: Optional[str], fps: float, blur_ratio: float) -> None:
+    image = None
+    if image_path:
+        with open(image_path, "rb") as f:
+            image = f.read()
+    camera = await FakeEsp32(host, port, latency, image, fps=fps, blur_ratio=blur_ratio).start()
+    print(f"Fake ESP32 camera listening on {camera.url} (latency {latency:.3f} s)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await camera.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake ESP32 camera server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay every response")
+    parser.add_argument("--image", help="JPEG file to serve instead of the synthetic grid frame")
+    parser.add_argument("--fps", type=float, default=10.0, help="Frame rate of /stream")
+    parser.add_argument("--blur-ratio", type=float, default=0.0, help="Fraction of blurred /stream frames")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.host, args.port, args.latency, args.image, args.fps, args.blur_ratio))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,240 @@
+"""
+Camera health tracking: latency histograms, error rates and a circuit breaker.
+
+Every request a ``CameraClient`` sends is recorded in its ``CameraHealth``.
+After a number of consecutive failures the camera's circuit opens and further
+requests fail immediately with ``CameraUnavailable`` instead of waiting for
+their timeouts. ``HealthMonitor`` pings all cameras in the background; while
+a circuit is open these pings are the probes that close it again once the
+camera answers, so recovery does not depend on an operator retrying.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence
+
+from fastapi import Request
+
+from ..config import Config
+
+# Upper bounds in seconds; the last bucket collects everything slower
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the *q*-th percentile (None if empty or beyond the last bound)."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_seconds": round(self.total / self.count, 4) if self.count else None,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before one trial request is let through
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a trial request through."""
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self, probe: bool = False) -> bool:
+        """
+        Whether a request may be sent now.
+
+        Probes (health pings) always pass, so an open circuit is tested in the
+        background. Otherwise only one trial request is admitted once the
+        reset timeout has passed (another one if the trial never reported back).
+        """
+        if probe or self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN and self.retry_in() == 0.0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and (
+            self._trial_started_at is None or now - self._trial_started_at > self.reset_timeout
+        ):
+            self._trial_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_started_at = None
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class CameraHealth:
+    """
+    Health record of one camera.
+
+    Args:
+        name: Camera name
+        failure_threshold: See CircuitBreaker
+        reset_timeout: See CircuitBreaker
+        window: Number of recent outcomes the error rate is computed over
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 15.0, window: int = 50):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.requests = 0
+        self.errors = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None  # time.time()
+        self.last_failure_at: Optional[float] = None
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit is open, i.e. the camera is known to be down."""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def record_success(self, operation: str, seconds: float) -> None:
+        self.requests += 1
+        self._outcomes.append(True)
+        self.latency.setdefault(operation, LatencyHistogram()).observe(seconds)
+        self.last_success_at = time.time()
+        self.breaker.record_success()
+
+    def record_failure(self, error: str) -> None:
+        self.requests += 1
+        self.errors += 1
+        self._outcomes.append(False)
+        self.last_error = error
+        self.last_failure_at = time.time()
+        previous = self.breaker.state
+        self.breaker.record_failure()
+        if previous != CircuitBreaker.OPEN and self.breaker.state == CircuitBreaker.OPEN:
+            print(f"Warning: {self.name} marked unavailable: {error}")
+
+    def error_rate(self) -> Optional[float]:
+        """Share of failed requests among the recent ones (None before the first request)."""
+        if not self._outcomes:
+            return None
+        return round(self._outcomes.count(False) / len(self._outcomes), 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "available": self.available,
+            "circuit": self.breaker.state,
+            "retry_in_seconds": round(self.breaker.retry_in(), 1) if self.breaker.state == CircuitBreaker.OPEN else None,
+            "consecutive_failures": self.breaker.failures,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate(),
+            "last_error": self.last_error,
+            "last_success_at": self.last_success_at,
+            "last_failure_at": self.last_failure_at,
+            "latency": {operation: histogram.to_dict() for operation, histogram in self.latency.items()},
+        }
+
+
+class HealthMonitor:
+    """
+    Background task pinging every camera of a registry.
+
+    Args:
+        cameras: CameraRegistry whose clients are pinged
+        interval: Seconds between ping rounds
+    """
+
+    def __init__(self, cameras, interval: float = 5.0):
+        self.cameras = cameras
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, cameras, config=Config) -> "HealthMonitor":
+        return cls(cameras, interval=config.ESP32_HEALTH_INTERVAL)
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="camera-health")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def ping_all(self) -> None:
+        # Outcomes are recorded by the clients themselves; errors only matter there
+        await asyncio.gather(
+            *(client.ping(probe=True) for client in self.cameras.clients.values()),
+            return_exceptions=True,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await self.ping_all()
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "cameras": {name: client.health.to_dict() for name, client in self.cameras.clients.items()},
+        }
+
+
+def get_health_monitor(request: Request) -> HealthMonitor:
+    """FastAPI dependency returning the monitor created in the app lifespan."""
+    return request.app.state.camera_health
@@ -0,0 +1,58 @@
+"""
+Single-flight coalescing of concurrent camera operations.
+
+The ESP32s serve one request at a time, so two callers capturing at the same
+moment (two browser tabs, a tab and the conveyor station) would each trigger
+both cameras and get slow or torn frames. ``SingleFlight.do(key, fn)`` runs
+*fn* once for all callers that ask for the same key while it is in flight, or
+within *window* seconds after it completed; they all receive the same result.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Per-key coalescing of async calls.
+
+    Args:
+        window: Seconds a successful result is still handed to new callers
+    """
+
+    def __init__(self, window: float = 0.0):
+        self.window = window
+        self.calls = 0
+        self.shared = 0  # callers served by a call another caller started
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._done_at: Dict[str, float] = {}
+
+    def _reusable(self, key: str) -> bool:
+        task = self._tasks.get(key)
+        if task is None:
+            return False
+        if not task.done():
+            return True
+        # Failures are shared only with callers that were already waiting
+        if task.cancelled() or task.exception() is not None:
+            return False
+        return time.monotonic() - self._done_at[key] <= self.window
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``fn()``, sharing one call among concurrent callers of *key*."""
+        if self._reusable(key):
+            self.shared += 1
+            task = self._tasks[key]
+        else:
+            self.calls += 1
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._done_at.__setitem__(key, time.monotonic()))
+        # A caller giving up must not cancel the call the others are waiting for
+        return await asyncio.shield(task)
+
+    def to_dict(self) -> dict:
+        return {"window_seconds": self.window, "calls": self.calls, "shared": self.shared}
@@ -0,0 +1,272 @@
+"""
+Continuous MJPEG stream ingestion for the ESP32 cameras.
+
+With streaming enabled (``ESP32_STREAM_ENABLED=1``) one background task per
+camera reads the camera's MJPEG stream into a fixed-size ring buffer of
+recent frames. A capture then picks frames from the buffers instead of doing
+a cold ``/capture`` round trip: the two cameras' frames are paired by arrival
+time and the sharpest pair (variance of the Laplacian) wins, which skips
+motion-blurred frames that would otherwise fail calibration.
+
+Timestamps are local arrival times (time.monotonic); the cameras have no
+shared clock, so arrival time is the best available proxy for exposure time.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import Request
+
+from ..config import Config
+from .client import fix_jpeg_bytes
+
+_CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+_SOI = b"\xff\xd8"
+_EOI = b"\xff\xd9"
+
+
+@dataclass
+class Frame:
+    """One JPEG frame from a camera stream."""
+
+    data: bytes
+    timestamp: float  # time.monotonic() at arrival
+    seq: int
+    _sharpness: Optional[float] = None
+
+    @property
+    def sharpness(self) -> float:
+        """Variance of the Laplacian of the frame (computed once, on first use)."""
+        if self._sharpness is None:
+            self._sharpness = frame_sharpness(self.data)
+        return self._sharpness
+
+
+def frame_sharpness(data: bytes) -> float:
+    """
+    Focus measure of a JPEG: variance of the Laplacian of its grayscale image.
+
+    Decodes at 1/4 resolution, which keeps the ranking of blurred vs. sharp
+    frames while costing about a millisecond per frame. Uses Pillow when
+    OpenCV is not installed; returns 0.0 for undecodable data.
+    """
+    try:
+        import cv2
+        import numpy as np
+
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if gray is None:
+            return 0.0
+        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    except ImportError:
+        import io
+        from PIL import Image, ImageFilter, ImageStat
+
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.draft("L", (image.width // 4, image.height // 4))
+            edges = image.convert("L").filter(ImageFilter.Kernel((3, 3), (0, 1, 0, 1, -4, 1, 0, 1, 0), 1, 128))
+        except OSError:
+            return 0.0
+        return float(ImageStat.Stat(edges).var[0])
+
+
+async def iter_mjpeg_frames(chunks: AsyncIterator[bytes], max_frame_size: int = 2 * 1024 * 1024) -> AsyncIterator[bytes]:
+    """
+    Split a multipart/x-mixed-replace byte stream into JPEG frames.
+
+    Uses each part's Content-Length header when present (ESP32 firmware sends
+    one) and falls back to scanning for the JPEG start/end markers.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        while True:
+            start = buffer.find(_SOI)
+            if start == -1:
+                # Keep a possible partial marker and the part headers
+                del buffer[: max(0, len(buffer) - 4096)]
+                break
+            match = None
+            for match in _CONTENT_LENGTH.finditer(buffer, 0, start):
+                pass
+            if match is not None:
+                end = start + int(match.group(1))
+                if len(buffer) < end:
+                    break
+                frame = bytes(buffer[start:end])
+            else:
+                eoi = buffer.find(_EOI, start + 2)
+                if eoi == -1:
+                    if len(buffer) - start > max_frame_size:
+                        del buffer[: start + 2]
+                        continue
+                    break
+                end = eoi + 2
+                frame = bytes(buffer[start:end])
+            del buffer[:end]
+            yield fix_jpeg_bytes(frame)
+
+
+class CameraStream:
+    """
+    Background reader of one camera's MJPEG stream into a ring buffer.
+
+    Args:
+        name: Camera name ("cam1")
+        url: Absolute stream URL, e.g. "http://192.168.1.184:81/stream"
+        buffer_size: Number of recent frames kept
+        connect_timeout: Seconds to establish the stream connection
+        stall_timeout: Seconds without data before reconnecting
+        transport: Optional httpx transport (tests)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        buffer_size: int = 8,
+        connect_timeout: float = 2.0,
+        stall_timeout: float = 5.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.frames: Deque[Frame] = deque(maxlen=buffer_size)
+        self.connected = False
+        self.last_error: Optional[str] = None
+        self._seq = 0
+        self._task: Optional[asyncio.Task] = None
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(stall_timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"camera-stream-{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                async with self._client.stream("GET", self.url) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    attempt = 0
+                    async for data in iter_mjpeg_frames(response.aiter_bytes()):
+                        self._seq += 1
+                        self.frames.append(Frame(data, time.monotonic(), self._seq))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = repr(e)
+            self.connected = False
+            # Reconnect with capped exponential backoff
+            await asyncio.sleep(min(5.0, 0.25 * (2 ** attempt)))
+            attempt += 1
+
+    def recent(self, max_age: float) -> List[Frame]:
+        """Frames that arrived within the last *max_age* seconds, oldest first."""
+        cutoff = time.monotonic() - max_age
+        return [frame for frame in list(self.frames) if frame.timestamp >= cutoff]
+
+    def sharpest(self, max_age: float) -> Optional[Frame]:
+        """The sharpest frame of the last *max_age* seconds, or None."""
+        frames = self.recent(max_age)
+        return max(frames, key=lambda frame: frame.sharpness) if frames else None
+
+
+def sharpest_pair(front: List[Frame], side: List[Frame], max_skew: float) -> Optional[Tuple[Frame, Frame]]:
+    """
+    Pair each front frame with the side frame closest in time and return the
+    sharpest pair whose arrival times differ by at most *max_skew* seconds.
+
+    Pairs are ranked by the product of both sharpness values, so neither
+    camera's absolute sharpness scale dominates the choice.
+    """
+    best = None
+    best_score = -1.0
+    for front_frame in front:
+        if not side:
+            break
+        side_frame = min(side, key=lambda frame: abs(frame.timestamp - front_frame.timestamp))
+        if abs(side_frame.timestamp - front_frame.timestamp) > max_skew:
+            continue
+        score = front_frame.sharpness * side_frame.sharpness
+        if score > best_score:
+            best, best_score = (front_frame, side_frame), score
+    return best
+
+
+class CameraStreams:
+    """Stream readers for both cameras, created in the app lifespan when streaming is enabled."""
+
+    def __init__(self, streams: Dict[str, CameraStream], max_age: float = 1.0, max_skew: float = 0.1):
+        self.streams = streams
+        self.max_age = max_age
+        self.max_skew = max_skew
+
+    @classmethod
+    def from_config(cls, config=Config, transport: Optional[httpx.AsyncBaseTransport] = None) -> "CameraStreams":
+        urls = {"cam1": config.ESP32_CAM1_STREAM_URL, "cam2": config.ESP32_CAM2_STREAM_URL}
+        return cls(
+            {
+                name: CameraStream(
+                    name,
+                    url,
+                    buffer_size=config.ESP32_STREAM_BUFFER,
+                    connect_timeout=config.ESP32_CONNECT_TIMEOUT,
+                    transport=transport,
+                )
+                for name, url in urls.items()
+            },
+            max_age=config.ESP32_STREAM_MAX_AGE,
+            max_skew=config.ESP32_STREAM_MAX_SKEW,
+        )
+
+    def __getitem__(self, name: str) -> CameraStream:
+        return self.streams[name]
+
+    def start(self) -> None:
+        for stream in self.streams.values():
+            stream.start()
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(stream.stop() for stream in self.streams.values()))
+
+    async def capture_pair(self) -> Optional[Tuple[bytes, bytes]]:
+        """
+        Front and side JPEGs of the sharpest time-matched recent frame pair.
+
+        Returns:
+            (front bytes, side bytes), or None when a stream has no fresh frames
+            and the caller should fall back to a regular capture
+        """
+        front = self["cam1"].recent(self.max_age)
+        side = self["cam2"].recent(self.max_age)
+        # Sharpness is computed lazily; decode in a worker thread to keep the loop responsive
+        pair = await asyncio.to_thread(sharpest_pair, front, side, self.max_skew)
+        if pair is None:
+            return None
+        return pair[0].data, pair[1].data
+
+
+def get_camera_streams(request: Request) -> Optional[CameraStreams]:
+    """FastAPI dependency returning the stream readers, or None when streaming is disabled."""
+    return getattr(request.app.state, "camera_streams", None)
@@ -0,0 +1,342 @@
+"""
+Content-addressed, retention-managed archive of captured camera images.
+
+Replaces the unbounded ``captured_images/front_<timestamp>.jpg`` dumps:
+- images are stored once per content hash in a sharded layout,
+  ``<root>/ab/cd/<sha256>.jpg`` (plus ``<sha256>.thumb.jpg`` when thumbnails
+  are enabled)
+- a SQLite index (``<root>/index.sqlite3``) records every capture: group,
+  camera, role, timestamp and the linked inventory item, plus the
+  measurement annotations of the group (drawn on request, see
+  image_handler/annotate.py)
+- captures older than the age limit are dropped, then the oldest ones until
+  the archive fits the size budget; files are deleted once no capture
+  references them
+- all disk and index work happens on one background writer thread, so
+  ``submit()`` returns immediately on the request path
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from fastapi import Request
+
+from .config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    has_thumbnail INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    capture_group TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    role TEXT NOT NULL,
+    sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+    captured_at REAL NOT NULL,
+    inventory_item_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_captures_captured_at ON captures (captured_at);
+CREATE INDEX IF NOT EXISTS ix_captures_group ON captures (capture_group);
+CREATE INDEX IF NOT EXISTS ix_captures_sha256 ON captures (sha256);
+CREATE INDEX IF NOT EXISTS ix_captures_inventory_item ON captures (inventory_item_id);
+CREATE TABLE IF NOT EXISTS annotations (
+    capture_group TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+_STOP = object()
+
+
+def make_thumbnail(data: bytes, max_size: int = 320) -> Optional[bytes]:
+    """Downscale a JPEG so its longer side is at most *max_size* px (None if undecodable)."""
+    import io
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (max_size, max_size))
+        image = image.convert("RGB")
+        image.thumbnail((max_size, max_size))
+    except OSError:
+        return None
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+class CaptureArchive:
+    """
+    Archive rooted at *root*.
+
+    Args:
+        root: Directory holding the sharded files and index.sqlite3
+        max_age_days: Captures older than this are pruned (0 disables)
+        max_bytes: Size budget for image files incl. thumbnails (0 disables)
+        thumbnails: Also store a downscaled copy of every image
+        thumbnail_size: Longer side of thumbnails in px
+        prune_interval: Seconds between retention passes on the writer thread
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_age_days: float = 30,
+        max_bytes: int = 2 * 1024 ** 3,
+        thumbnails: bool = True,
+        thumbnail_size: int = 320,
+        prune_interval: float = 60.0,
+    ):
+        self.root = root
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.thumbnails = thumbnails
+        self.thumbnail_size = thumbnail_size
+        self.prune_interval = prune_interval
+        self.index_path = os.path.join(root, "index.sqlite3")
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+        os.makedirs(root, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config=Config) -> "CaptureArchive":
+        return cls(
+            config.CAPTURE_ARCHIVE_DIR,
+            max_age_days=config.CAPTURE_ARCHIVE_MAX_AGE_DAYS,
+            max_bytes=config.CAPTURE_ARCHIVE_MAX_MB * 1024 * 1024,
+            thumbnails=config.CAPTURE_ARCHIVE_THUMBNAILS,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # -- request path -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="capture-archive", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush queued writes and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, images: Dict[str, bytes], cameras: Optional[Dict[str, str]] = None,
+               inventory_item_id: Optional[int] = None, captured_at: Optional[float] = None) -> str:
+        """
+        Queue a capture for archiving and return its capture group id.
+
+        Args:
+            images: Image bytes by role, e.g. {"front": ..., "side": ...}
+            cameras: Camera name by role (default: front=cam1, side=cam2)
+            inventory_item_id: Inventory item the capture belongs to, if already known
+            captured_at: Unix timestamp (default: now)
+        """
+        group = uuid.uuid4().hex
+        cameras = cameras or {"front": "cam1", "side": "cam2"}
+        self._queue.put(("capture", group, images, cameras, inventory_item_id, captured_at or time.time()))
+        return group
+
+    def link_inventory_item(self, capture_group: str, inventory_item_id: int) -> None:
+        """Queue linking an archived capture to the inventory item measured from it."""
+        self._queue.put(("link", capture_group, inventory_item_id))
+
+    def attach_annotations(self, capture_group: str, annotations: Dict) -> None:
+        """Queue storing the measurement annotations (by view) of an archived capture."""
+        self._queue.put(("annotations", capture_group, json.dumps(annotations)))
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Block until everything queued so far has been written (tests, shutdown)."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait(timeout)
+
+    # -- reads --------------------------------------------------------------
+
+    def path_for(self, sha256: str, thumbnail: bool = False) -> str:
+        suffix = ".thumb.jpg" if thumbnail else ".jpg"
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256 + suffix)
+
+    def recent(self, limit: int = 50, inventory_item_id: Optional[int] = None) -> List[dict]:
+        """Most recent captures, newest first."""
+        sql = (
+            "SELECT c.id, c.capture_group, c.camera, c.role, c.sha256, c.captured_at, c.inventory_item_id,"
+            " b.size, b.has_thumbnail FROM captures c JOIN blobs b ON b.sha256 = c.sha256"
+        )
+        params: list = []
+        if inventory_item_id is not None:
+            sql += " WHERE c.inventory_item_id = ?"
+            params.append(inventory_item_id)
+        sql += " ORDER BY c.captured_at DESC, c.id DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def capture(self, capture_group: str) -> Optional[dict]:
+        """{"files": {role: sha256}, "annotations": {view: ...}} of one capture group, None if unknown."""
+        with closing(self._connect()) as conn:
+            files = dict(conn.execute("SELECT role, sha256 FROM captures WHERE capture_group = ?", (capture_group,)))
+            row = conn.execute("SELECT data FROM annotations WHERE capture_group = ?", (capture_group,)).fetchone()
+        if not files:
+            return None
+        return {"files": files, "annotations": json.loads(row[0]) if row else {}}
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            captures = conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {"captures": captures, "files": blobs, "bytes": size, "queued": self._queue.qsize()}
+
+    # -- writer thread ------------------------------------------------------
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.prune_interval)
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                try:
+                    if item is not None:
+                        self._handle(conn, item)
+                    if time.monotonic() - self._last_prune >= self.prune_interval:
+                        self.prune(conn)
+                except Exception as e:
+                    print(f"Warning: Capture archive write failed: {e}")
+        finally:
+            conn.close()
+
+    def _handle(self, conn: sqlite3.Connection, item: tuple) -> None:
+        kind = item[0]
+        if kind == "capture":
+            _, group, images, cameras, inventory_item_id, captured_at = item
+            for role, data in images.items():
+                sha256 = self._store_file(conn, data)
+                conn.execute(
+                    "INSERT INTO captures (capture_group, camera, role, sha256, captured_at, inventory_item_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (group, cameras.get(role, role), role, sha256, captured_at, inventory_item_id),
+                )
+            conn.commit()
+        elif kind == "link":
+            _, group, inventory_item_id = item
+            conn.execute("UPDATE captures SET inventory_item_id = ? WHERE capture_group = ?", (inventory_item_id, group))
+            conn.commit()
+        elif kind == "annotations":
+            _, group, data = item
+            conn.execute("INSERT OR REPLACE INTO annotations (capture_group, data) VALUES (?, ?)", (group, data))
+            conn.commit()
+        elif kind == "flush":
+            item[1].set()
+
+    def _store_file(self, conn: sqlite3.Connection, data: bytes) -> str:
+        sha256 = hashlib.sha256(data).hexdigest()
+        if conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha256,)).fetchone():
+            return sha256
+
+        path = self.path_for(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, data)
+        size = len(data)
+        has_thumbnail = 0
+        if self.thumbnails:
+            thumbnail = make_thumbnail(data, self.thumbnail_size)
+            if thumbnail is not None:
+                _write_atomic(self.path_for(sha256, thumbnail=True), thumbnail)
+                size += len(thumbnail)
+                has_thumbnail = 1
+        conn.execute(
+            "INSERT INTO blobs (sha256, size, has_thumbnail, created_at) VALUES (?, ?, ?, ?)",
+            (sha256, size, has_thumbnail, time.time()),
+        )
+        return sha256
+
+    def prune(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Apply the age and size limits.
+
+        Returns:
+            Number of image files deleted
+        """
+        own = conn is None
+        conn = conn or self._connect()
+        try:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                conn.execute("DELETE FROM captures WHERE captured_at < ?", (cutoff,))
+            deleted = self._delete_orphans(conn)
+
+            if self.max_bytes:
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+                while total > self.max_bytes:
+                    # Drop the oldest capture group as a whole (front and side belong together)
+                    oldest = conn.execute(
+                        "SELECT capture_group FROM captures ORDER BY captured_at, id LIMIT 1"
+                    ).fetchone()
+                    if oldest is None:
+                        break
+                    conn.execute("DELETE FROM captures WHERE capture_group = ?", oldest)
+                    deleted += self._delete_orphans(conn)
+                    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            conn.commit()
+            self._last_prune = time.monotonic()
+            return deleted
+        finally:
+            if own:
+                conn.close()
+
+    def _delete_orphans(self, conn: sqlite3.Connection) -> int:
+        conn.execute(
+            "DELETE FROM annotations WHERE NOT EXISTS"
+            " (SELECT 1 FROM captures c WHERE c.capture_group = annotations.capture_group)"
+        )
+        orphans = [
+            row[0]
+            for row in conn.execute(
+                "SELECT sha256 FROM blobs WHERE NOT EXISTS (SELECT 1 FROM captures c WHERE c.sha256 = blobs.sha256)"
+            )
+        ]
+        for sha256 in orphans:
+            for thumbnail in (False, True):
+                try:
+                    os.remove(self.path_for(sha256, thumbnail))
+                except FileNotFoundError:
+                    pass
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        return len(orphans)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def get_capture_archive(request: Request) -> CaptureArchive:
+    """FastAPI dependency returning the archive created in the app lifespan."""
+    return request.app.state.capture_archive
@@ -6,8 +6,74 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     ESP32_CAM1_URL = os.getenv("ESP32_CAM1_URL", "http://192.168.1.184")
     ESP32_CAM2_URL = os.getenv("ESP32_CAM2_URL", "http://192.168.1.225")
+    # Async camera client (app/cameras/client.py)
+    ESP32_CONNECT_TIMEOUT = float(os.getenv("ESP32_CONNECT_TIMEOUT", "2.0"))
+    ESP32_CAPTURE_TIMEOUT = float(os.getenv("ESP32_CAPTURE_TIMEOUT", "10.0"))
+    ESP32_TRIGGER_TIMEOUT = float(os.getenv("ESP32_TRIGGER_TIMEOUT", "5.0"))
+    ESP32_RETRIES = int(os.getenv("ESP32_RETRIES", "2"))
+    ESP32_RETRY_BACKOFF = float(os.getenv("ESP32_RETRY_BACKOFF", "0.2"))
+    # Concurrent captures within this many seconds share one physical capture
+    ESP32_COALESCE_WINDOW = float(os.getenv("ESP32_COALESCE_WINDOW", "0.25"))
+    # Optional MJPEG streaming mode (app/cameras/stream.py)
+    ESP32_STREAM_ENABLED = os.getenv("ESP32_STREAM_ENABLED", "0").lower() in ("1", "true", "yes")
+    ESP32_CAM1_STREAM_URL = os.getenv("ESP32_CAM1_STREAM_URL", f"{ESP32_CAM1_URL}:81/stream")
+    ESP32_CAM2_STREAM_URL = os.getenv("ESP32_CAM2_STREAM_URL", f"{ESP32_CAM2_URL}:81/stream")
+    ESP32_STREAM_BUFFER = int(os.getenv("ESP32_STREAM_BUFFER", "8"))
+    ESP32_STREAM_MAX_AGE = float(os.getenv("ESP32_STREAM_MAX_AGE", "1.0"))
+    ESP32_STREAM_MAX_SKEW = float(os.getenv("ESP32_STREAM_MAX_SKEW", "0.1"))
+    # Captured images served by /api/images (app/blob_store.py)
+    IMAGE_BLOB_TTL = float(os.getenv("IMAGE_BLOB_TTL", "300"))
+    IMAGE_BLOB_MAX_MB = int(os.getenv("IMAGE_BLOB_MAX_MB", "64"))
     DEBUG_DIR = os.getenv(
         "DEBUG_DIR",
         os.path.abspath(os.path.join(os.path.dirname(__file__), "captured_images")),
     )
     os.makedirs(DEBUG_DIR, exist_ok=True)
+    # Capture archive (app/capture_archive.py)
+    CAPTURE_ARCHIVE_DIR = os.getenv("CAPTURE_ARCHIVE_DIR", os.path.join(DEBUG_DIR, "archive"))
+    CAPTURE_ARCHIVE_MAX_AGE_DAYS = float(os.getenv("CAPTURE_ARCHIVE_MAX_AGE_DAYS", "30"))
+    CAPTURE_ARCHIVE_MAX_MB = int(os.getenv("CAPTURE_ARCHIVE_MAX_MB", "2048"))
+    CAPTURE_ARCHIVE_THUMBNAILS = os.getenv("CAPTURE_ARCHIVE_THUMBNAILS", "1").lower() in ("1", "true", "yes")
+    # Continuous conveyor measurement (app/conveyor.py)
+    CONVEYOR_POLL_INTERVAL = float(os.getenv("CONVEYOR_POLL_INTERVAL", "0.1"))
+    CONVEYOR_ENTER_THRESHOLD = float(os.getenv("CONVEYOR_ENTER_THRESHOLD", "6.0"))
+    CONVEYOR_SETTLE_THRESHOLD = float(os.getenv("CONVEYOR_SETTLE_THRESHOLD", "1.5"))
+    CONVEYOR_SETTLE_FRAMES = int(os.getenv("CONVEYOR_SETTLE_FRAMES", "3"))
+    CONVEYOR_QUEUE_SIZE = int(os.getenv("CONVEYOR_QUEUE_SIZE", "2"))
+    # Camera health monitor and circuit breaker (app/cameras/health.py)
+    ESP32_HEALTH_INTERVAL = float(os.getenv("ESP32_HEALTH_INTERVAL", "5.0"))
+    ESP32_BREAKER_FAILURES = int(os.getenv("ESP32_BREAKER_FAILURES", "3"))
+    ESP32_BREAKER_RESET = float(os.getenv("ESP32_BREAKER_RESET", "15.0"))
+    # Measurement jobs with progress events (app/measurement_jobs.py)
+    MEASUREMENT_JOB_TTL = float(os.getenv("MEASUREMENT_JOB_TTL", "600"))
+    # Detection gating for the in-memory engine (app/image_handler/detection.py)
+    DETECTION_CLASSES = [int(c) for c in os.getenv("DETECTION_CLASSES", "").split(",") if c.strip()]
+    DETECTION_MIN_AREA_CM2 = float(os.getenv("DETECTION_MIN_AREA_CM2", "1.0"))
+    DETECTION_TOP_K = int(os.getenv("DETECTION_TOP_K", "10"))
+    DETECTION_RANK_BY = os.getenv("DETECTION_RANK_BY", "area")
+    # Tiled inference: run the detector on overlapping tiles of this size (px, 0 = whole image)
+    DETECTION_TILE_SIZE = int(os.getenv("DETECTION_TILE_SIZE", "0"))
+    DETECTION_TILE_OVERLAP = float(os.getenv("DETECTION_TILE_OVERLAP", "0.2"))
+    DETECTION_TILE_BATCH = int(os.getenv("DETECTION_TILE_BATCH", "8"))
+    DETECTION_TILE_MERGE_THRESHOLD = float(os.getenv("DETECTION_TILE_MERGE_THRESHOLD", "0.5"))
+    # Refine measured edge positions to fractions of a pixel (app/image_handler/measure.py)
+    MEASURE_SUBPIXEL_EDGES = os.getenv("MEASURE_SUBPIXEL_EDGES", "0").lower() in ("1", "true", "yes")
+    # With a reused grid calibration: detect on the original frame and unwarp only the measured boxes
+    MEASURE_WARP_REGIONS = os.getenv("MEASURE_WARP_REGIONS", "0").lower() in ("1", "true", "yes")
+    # CPU scheduler for measurements (app/image_handler/scheduler.py): "latency", "throughput" or "" (in a thread)
+    MEASURE_SCHEDULER_MODE = os.getenv("MEASURE_SCHEDULER_MODE", "")
+    MEASURE_WORKERS = int(os.getenv("MEASURE_WORKERS", "0"))  # 0 = by mode
+    MEASURE_THREADS_PER_WORKER = int(os.getenv("MEASURE_THREADS_PER_WORKER", "0"))  # 0 = by mode
+    MEASURE_CPU_AFFINITY = os.getenv("MEASURE_CPU_AFFINITY", "0").lower() in ("1", "true", "yes")
+    # Reuse a view's grid calibration for later frames while it verifies (app/image_handler/calibration.py)
+    CALIBRATION_REUSE = os.getenv("CALIBRATION_REUSE", "0").lower() in ("1", "true", "yes")
+    CALIBRATION_REUSE_MIN_FRACTION = float(os.getenv("CALIBRATION_REUSE_MIN_FRACTION", "0.6"))
+    CALIBRATION_REUSE_MAX_AGE = float(os.getenv("CALIBRATION_REUSE_MAX_AGE", "600"))  # seconds
+    # Image quality gate before calibration (app/image_handler/quality.py). Off until the thresholds
+    # below are set from real camera frames (/api/quality/check reports the scores of a frame)
+    QUALITY_GATE_ENABLED = os.getenv("QUALITY_GATE_ENABLED", "0").lower() in ("1", "true", "yes")
+    QUALITY_MIN_SHARPNESS = float(os.getenv("QUALITY_MIN_SHARPNESS", "200"))
+    QUALITY_MAX_CLIPPED = float(os.getenv("QUALITY_MAX_CLIPPED", "0.25"))
+    QUALITY_MIN_GRID_SCORE = float(os.getenv("QUALITY_MIN_GRID_SCORE", "0.35"))
+    # Bottom and side view objects further apart than this on the grid are not paired
+    MULTI_OBJECT_MATCH_TOLERANCE_CM = float(os.getenv("MULTI_OBJECT_MATCH_TOLERANCE_CM", "3.0"))
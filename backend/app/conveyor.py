@@ -0,0 +1,458 @@
+"""
+Continuous measurement station for conveyor operation.
+
+Instead of an operator pressing "capture" for every piece, the station watches
+the front camera and measures each piece that comes to rest under it. Three
+stages run concurrently, connected by small bounded queues:
+
+- watch:   poll a downscaled frame, detect that a piece entered and settled
+           (frame differencing), then capture the full-resolution pair
+- measure: run the measurement engine on the pair (app/image_handler/scheduler.py)
+- save:    write the result to the inventory and link the archived images
+
+While piece N is measured, piece N+1 is already being watched for and
+captured, so throughput is bounded by the slowest stage rather than the sum
+of all stages. A full queue blocks the stage in front of it (backpressure).
+
+Run against two in-process fake cameras with
+
+    python -m app.conveyor --fake --pieces 5
+"""
+
+import argparse
+import asyncio
+import io
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+from fastapi import Request
+
+from .cameras.capture import capture_pair
+from .cameras.client import CameraError, CameraRegistry, CameraUnavailable
+from .cameras.stream import CameraStreams
+from .capture_archive import CaptureArchive
+from .config import Config
+from .database.measurements import save_measurements
+from .image_handler.scheduler import schedule_measurement
+
+_DOWNSCALE = 8
+
+
+def downscaled_gray(data: bytes, factor: int = _DOWNSCALE):
+    """
+    Decode a JPEG as a grayscale PIL image at 1/*factor* resolution.
+
+    The JPEG decoder scales during the DCT (draft mode), so this costs a
+    fraction of a full decode. Returns None for undecodable data.
+    """
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (image.width // factor, image.height // factor))
+        return image.convert("L")
+    except OSError:
+        return None
+
+
+def mean_difference(a, b) -> float:
+    """Mean absolute pixel difference (0-255) of two equally sized grayscale images."""
+    from PIL import ImageChops, ImageStat
+
+    return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+
+class PieceDetector:
+    """
+    Frame-differencing state machine that reports each piece once, when it has settled.
+
+    Two differences are computed per frame:
+    - presence: against a running average of the empty belt
+    - motion:   against the previous frame
+
+    ``empty`` -> ``entering`` when presence exceeds *enter_threshold*;
+    ``entering`` -> ``present`` (reported) after *settle_frames* consecutive
+    frames with motion below *settle_threshold*; back to ``empty`` once
+    presence drops below half the enter threshold. Large motion while
+    ``present`` means the piece was moved or replaced and starts a new
+    ``entering`` phase.
+    """
+
+    EMPTY = "empty"
+    ENTERING = "entering"
+    PRESENT = "present"
+
+    def __init__(
+        self,
+        enter_threshold: float = 6.0,
+        settle_threshold: float = 1.5,
+        settle_frames: int = 3,
+        background_rate: float = 0.1,
+    ):
+        self.enter_threshold = enter_threshold
+        self.settle_threshold = settle_threshold
+        self.settle_frames = settle_frames
+        self.background_rate = background_rate
+        self.state = self.EMPTY
+        self.presence = 0.0
+        self.motion = 0.0
+        self._background = None
+        self._previous = None
+        self._still = 0
+
+    def reset(self) -> None:
+        self.state = self.EMPTY
+        self._background = None
+        self._previous = None
+        self._still = 0
+
+    def update(self, gray) -> bool:
+        """
+        Feed the next downscaled grayscale frame.
+
+        Returns:
+            True exactly once per piece, on the frame where it counts as settled
+        """
+        from PIL import Image
+
+        if self._background is None or self._background.size != gray.size:
+            # The first frame is taken as the empty belt
+            self._background = gray
+            self._previous = gray
+            return False
+
+        self.presence = mean_difference(gray, self._background)
+        self.motion = mean_difference(gray, self._previous)
+        self._previous = gray
+
+        if self.state == self.EMPTY:
+            if self.presence > self.enter_threshold:
+                self.state = self.ENTERING
+                self._still = 0
+            else:
+                # Follow slow lighting changes of the empty belt
+                self._background = Image.blend(self._background, gray, self.background_rate)
+            return False
+
+        if self.presence < self.enter_threshold / 2:
+            self.state = self.EMPTY
+            return False
+
+        if self.state == self.PRESENT:
+            if self.motion > self.enter_threshold:
+                self.state = self.ENTERING
+                self._still = 0
+            return False
+
+        self._still = self._still + 1 if self.motion < self.settle_threshold else 0
+        if self._still >= self.settle_frames:
+            self.state = self.PRESENT
+            return True
+        return False
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_seconds": round(self.total_seconds / self.count, 4) if self.count else None,
+            "last_seconds": round(self.last_seconds, 4) if self.count else None,
+        }
+
+
+@dataclass
+class Piece:
+    """One detected piece travelling through the pipeline."""
+
+    number: int
+    front: bytes
+    side: bytes
+    detected_at: float  # time.time()
+    capture_id: Optional[str] = None
+    measurements: Dict = field(default_factory=dict)
+
+
+class ConveyorStation:
+    """
+    Pipelined capture -> measure -> save loop.
+
+    Args:
+        cameras: Camera clients; cam1 is watched for pieces
+        streams: Stream readers, used for watching and capturing when available
+        archive: Capture archive the images are stored in (optional)
+        session_factory: Async session factory for saving (None disables saving)
+        detector: Piece detector (default: PieceDetector())
+        poll_interval: Seconds between watched frames
+        queue_size: Pieces that may wait in front of the measure and save stages
+    """
+
+    def __init__(
+        self,
+        cameras: CameraRegistry,
+        streams: Optional[CameraStreams] = None,
+        archive: Optional[CaptureArchive] = None,
+        session_factory=None,
+        detector: Optional[PieceDetector] = None,
+        poll_interval: float = 0.1,
+        queue_size: int = 2,
+    ):
+        self.cameras = cameras
+        self.streams = streams
+        self.archive = archive
+        self.session_factory = session_factory
+        self.detector = detector or PieceDetector()
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.results: Deque[dict] = deque(maxlen=20)
+        self.last_error: Optional[str] = None
+        self._tasks = []
+        self._reset_stats()
+
+    @classmethod
+    def from_config(cls, cameras, streams=None, archive=None, session_factory=None, config=Config) -> "ConveyorStation":
+        return cls(
+            cameras,
+            streams,
+            archive,
+            session_factory,
+            detector=PieceDetector(
+                enter_threshold=config.CONVEYOR_ENTER_THRESHOLD,
+                settle_threshold=config.CONVEYOR_SETTLE_THRESHOLD,
+                settle_frames=config.CONVEYOR_SETTLE_FRAMES,
+            ),
+            poll_interval=config.CONVEYOR_POLL_INTERVAL,
+            queue_size=config.CONVEYOR_QUEUE_SIZE,
+        )
+
+    def _reset_stats(self) -> None:
+        self.stages = {name: StageStats() for name in ("watch", "capture", "measure", "save")}
+        self.pieces = 0
+        self.saved = 0
+        self.started_at: Optional[float] = None
+        self._last_seq = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._reset_stats()
+        self.results.clear()
+        self.last_error = None
+        self.detector.reset()
+        self.started_at = time.time()
+        measure_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._queues = {"measure": measure_queue, "save": save_queue}
+        self._tasks = [
+            asyncio.create_task(self._watch(measure_queue), name="conveyor-watch"),
+            asyncio.create_task(self._measure(measure_queue, save_queue), name="conveyor-measure"),
+            asyncio.create_task(self._save(save_queue), name="conveyor-save"),
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _fail(self, stage: str, message: str, log: bool = True) -> None:
+        self.stages[stage].errors += 1
+        self.last_error = message
+        if log:
+            print(f"Warning: Conveyor {stage} failed: {message}")
+
+    # -- stages -------------------------------------------------------------
+
+    async def _next_frame(self) -> Optional[bytes]:
+        """Newest front frame: from the stream if it has a new one, else a regular capture."""
+        if self.streams is not None:
+            frames = self.streams["cam1"].frames
+            if frames:
+                frame = frames[-1]
+                if frame.seq == self._last_seq:
+                    return None
+                self._last_seq = frame.seq
+                return frame.data
+        return await self.cameras["cam1"].capture()
+
+    async def _watch(self, measure_queue: asyncio.Queue) -> None:
+        while True:
+            tick = time.monotonic()
+            try:
+                data = await self._next_frame()
+            except CameraError as e:
+                # A camera known to be down fails every poll; the health monitor already logged it
+                self._fail("watch", str(e), log=not isinstance(e, CameraUnavailable))
+                data = None
+            if data is not None:
+                gray = await asyncio.to_thread(downscaled_gray, data)
+                self.stages["watch"].record(time.monotonic() - tick)
+                if gray is not None and self.detector.update(gray):
+                    piece = await self._capture()
+                    if piece is not None:
+                        await measure_queue.put(piece)
+            await asyncio.sleep(max(0.0, self.poll_interval - (time.monotonic() - tick)))
+
+    async def _capture(self) -> Optional[Piece]:
+        start = time.monotonic()
+        try:
+            front, side = await capture_pair(self.cameras, self.streams)
+        except CameraError as e:
+            self._fail("capture", str(e))
+            return None
+        self.stages["capture"].record(time.monotonic() - start)
+        self.pieces += 1
+        piece = Piece(self.pieces, front, side, time.time())
+        if self.archive is not None:
+            piece.capture_id = self.archive.submit({"front": front, "side": side}, captured_at=piece.detected_at)
+        return piece
+
+    async def _measure(self, measure_queue: asyncio.Queue, save_queue: asyncio.Queue) -> None:
+        while True:
+            piece = await measure_queue.get()
+            start = time.monotonic()
+            try:
+                piece.measurements = await schedule_measurement(piece.front, piece.side)
+            except Exception as e:
+                self._fail("measure", str(e))
+                continue
+            self.stages["measure"].record(time.monotonic() - start)
+            if self.archive is not None and piece.capture_id is not None:
+                self.archive.attach_annotations(piece.capture_id, piece.measurements.get("annotations", {}))
+            await save_queue.put(piece)
+
+    async def _save(self, save_queue: asyncio.Queue) -> None:
+        while True:
+            piece = await save_queue.get()
+            start = time.monotonic()
+            item_ids = []
+            if not piece.measurements.get("processing_successful"):
+                self._fail("save", "; ".join(piece.measurements.get("errors", [])) or "measurement failed")
+            elif self.session_factory is not None:
+                async with self.session_factory() as db:
+                    item_ids = await save_measurements(
+                        db, piece.measurements, notes="Automatically measured on the conveyor station"
+                    )
+                if not item_ids:
+                    self._fail("save", f"piece {piece.number} was not saved")
+                else:
+                    self.saved += len(item_ids)
+                    if self.archive is not None and piece.capture_id is not None:
+                        # The archive links a capture to one item; several pieces share the images
+                        self.archive.link_inventory_item(piece.capture_id, item_ids[0])
+            self.stages["save"].record(time.monotonic() - start)
+            self.results.append({
+                "piece": piece.number,
+                "detected_at": piece.detected_at,
+                "capture_id": piece.capture_id,
+                "inventory_item_ids": item_ids,
+                "measurements": piece.measurements,
+            })
+
+    # -- status -------------------------------------------------------------
+
+    def status(self) -> dict:
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "running": self.running,
+            "state": self.detector.state,
+            "presence": round(self.detector.presence, 2),
+            "motion": round(self.detector.motion, 2),
+            "pieces": self.pieces,
+            "saved": self.saved,
+            "pieces_per_minute": round(self.pieces * 60 / elapsed, 2) if elapsed else None,
+            "queued": {name: queue.qsize() for name, queue in getattr(self, "_queues", {}).items()},
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "last_error": self.last_error,
+            "results": list(self.results),
+        }
+
+
+def get_conveyor_station(request: Request) -> ConveyorStation:
+    """FastAPI dependency returning the station created in the app lifespan."""
+    return request.app.state.conveyor_station
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from .database.measurements import ensure_default_material
+    from .database.session import async_sessionmaker, close_db_engine, create_tables
+
+    cameras_fake = []
+    config = Config
+    if args.fake:
+        from .cameras.fake_esp32 import FakeConveyorCamera
+
+        epoch = time.monotonic()
+        cameras_fake = [
+            await FakeConveyorCamera(latency=args.latency, cycle=args.cycle, epoch=epoch).start() for _ in range(2)
+        ]
+
+        class config(Config):
+            ESP32_CAM1_URL = cameras_fake[0].url
+            ESP32_CAM2_URL = cameras_fake[1].url
+
+    await create_tables()
+    async with async_sessionmaker() as db:
+        await ensure_default_material(db)
+    archive = CaptureArchive.from_config()
+    archive.start()
+    cameras = CameraRegistry.from_config(config)
+    station = ConveyorStation.from_config(cameras, archive=archive, session_factory=async_sessionmaker, config=config)
+    station.start()
+    print(f"Conveyor station running (poll every {station.poll_interval:.2f} s)")
+    try:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        reported = 0
+        while (not args.pieces or len(station.results) < args.pieces) and (
+            deadline is None or time.monotonic() < deadline
+        ):
+            await asyncio.sleep(0.2)
+            for result in list(station.results)[reported:]:
+                m = result["measurements"]
+                print(
+                    f"Piece {result['piece']}: {m.get('width_mm')} x {m.get('height_mm')} x {m.get('depth_mm')} mm"
+                    f" -> inventory items {result['inventory_item_ids']}"
+                )
+            reported = len(station.results)
+    finally:
+        await station.stop()
+        status = station.status()
+        print(f"Pieces: {status['pieces']}, saved: {status['saved']}, per minute: {status['pieces_per_minute']}")
+        for name, stats in status["stages"].items():
+            print(f"  {name:8s} {stats}")
+        await cameras.aclose()
+        archive.stop()
+        for camera in cameras_fake:
+            await camera.stop()
+        await close_db_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the conveyor measurement station")
+    parser.add_argument("--fake", action="store_true", help="Use two in-process fake conveyor cameras")
+    parser.add_argument("--cycle", type=float, default=4.0, help="Seconds per piece of the fake conveyor")
+    parser.add_argument("--latency", type=float, default=0.05, help="Response latency of the fake cameras")
+    parser.add_argument("--pieces", type=int, default=0, help="Stop after this many pieces (0: run until Ctrl+C)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0: no limit)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,114 @@
+"""
+"Find a piece that fits" search.
+
+A piece fits a requested W × H × D box in some orientation exactly when its
+sorted dimensions dominate the sorted request: dim_min >= a, dim_mid >= b and
+dim_max >= c with a <= b <= c. Candidates are ranked by waste volume, i.e.
+bounding_volume - a·b·c, so ordering by bounding_volume is equivalent and can
+be served by ix_inventory_items_bounding_volume; selective requests use
+ix_inventory_items_sorted_dims instead.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, Select, cast, func, select
+
+from .models import InventoryItem, Material
+
+
+FIT_SEARCH_COLUMNS = [
+    "id",
+    "material_id",
+    "material_name",
+    "width_mm",
+    "height_mm",
+    "depth_mm",
+    "quantity",
+    "location",
+    "notes",
+    "bounding_volume_mm3",
+]
+
+_AXES = ("width", "height", "depth")
+
+
+def fit_search_query(
+    width: float,
+    height: float,
+    depth: float,
+    limit: int = 20,
+    material_id: Optional[int] = None,
+) -> Select:
+    """
+    Build the select for available pieces that can hold width × height × depth mm.
+
+    Args:
+        width, height, depth: Required dimensions in mm (orientation does not matter)
+        limit: Maximum number of candidates
+        material_id: Only pieces of this material
+
+    Returns:
+        Select whose rows follow FIT_SEARCH_COLUMNS, smallest waste first
+    """
+    a, b, c = sorted((width, height, depth))
+    stmt = (
+        select(
+            InventoryItem.id,
+            InventoryItem.material_id,
+            func.coalesce(Material.name, "Unknown"),
+            cast(InventoryItem.width, Float),
+            cast(InventoryItem.height, Float),
+            cast(InventoryItem.depth, Float),
+            InventoryItem.quantity,
+            InventoryItem.location,
+            InventoryItem.notes,
+            cast(InventoryItem.bounding_volume, Float),
+        )
+        .outerjoin(Material, InventoryItem.material_id == Material.id)
+        .where(
+            InventoryItem.is_available.is_(True),
+            InventoryItem.dim_min >= a,
+            InventoryItem.dim_mid >= b,
+            InventoryItem.dim_max >= c,
+            # Implied by the three conditions above; lets the volume index bound its range scan
+            InventoryItem.bounding_volume >= a * b * c,
+        )
+        .order_by(InventoryItem.bounding_volume, InventoryItem.id)
+        .limit(limit)
+    )
+    if material_id is not None:
+        stmt = stmt.where(InventoryItem.material_id == material_id)
+    return stmt
+
+
+def fit_orientation(piece: Sequence[float], request: Sequence[float]) -> Dict[str, str]:
+    """
+    Map each requested axis to the piece axis it should be cut from.
+
+    Pairing the i-th smallest request with the i-th smallest piece dimension
+    always works for a piece returned by fit_search_query().
+
+    Args:
+        piece: (width, height, depth) of the piece in mm
+        request: (width, height, depth) requested in mm
+
+    Returns:
+        e.g. {"width": "depth", "height": "width", "depth": "height"}
+    """
+    piece_order = sorted(range(3), key=lambda index: piece[index])
+    request_order = sorted(range(3), key=lambda index: request[index])
+    return {_AXES[r]: _AXES[p] for r, p in zip(request_order, piece_order)}
+
+
+def format_fit_rows(rows, width: float, height: float, depth: float) -> List[dict]:
+    """Turn fit search tuples into response dicts with waste and orientation."""
+    requested_volume = width * height * depth
+    candidates = []
+    for row in rows:
+        candidate = dict(zip(FIT_SEARCH_COLUMNS, row))
+        piece = (candidate["width_mm"], candidate["height_mm"], candidate["depth_mm"])
+        candidate["waste_volume_mm3"] = candidate["bounding_volume_mm3"] - requested_volume
+        candidate["orientation"] = fit_orientation(piece, (width, height, depth))
+        candidates.append(candidate)
+    return candidates
+
@@ -0,0 +1,193 @@
+"""
+Shared inventory query helpers.
+Keeps the filter parameters and the flat row selection used by the inventory
+list endpoint and the streaming export in one place, so both always agree.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import Float, Select, cast, func, select
+
+from .models import InventoryItem, Material
+
+
+# Keys of the rows returned by GET /api/inventory (and of inventory_list_query tuples)
+INVENTORY_LIST_COLUMNS = [
+    "id",
+    "material_id",
+    "material_name",
+    "material_type",
+    "width_mm",
+    "height_mm",
+    "depth_mm",
+    "volume_mm3",
+    "weight_g",
+    "quantity",
+    "location",
+    "quality_grade",
+    "notes",
+    "is_available",
+    "created_at",
+]
+
+# Column order of exported rows (and of the tuples returned by inventory_rows_query)
+INVENTORY_EXPORT_COLUMNS = [
+    "id",
+    "material_id",
+    "material_name",
+    "material_type",
+    "supplier_id",
+    "width_mm",
+    "height_mm",
+    "depth_mm",
+    "volume_mm3",
+    "weight_g",
+    "quantity",
+    "unit_cost",
+    "location",
+    "batch_number",
+    "quality_grade",
+    "notes",
+    "is_available",
+    "received_date",
+    "created_at",
+    "updated_at",
+]
+
+
+def inventory_filters(
+    material_id: Optional[int] = Query(None, description="Only items of this material"),
+    supplier_id: Optional[int] = Query(None, description="Only items from this supplier"),
+    location: Optional[str] = Query(None, description="Only items stored at this location"),
+    quality_grade: Optional[str] = Query(None, description="Only items with this quality grade"),
+    is_available: Optional[bool] = Query(None, description="Filter by availability"),
+    created_after: Optional[datetime] = Query(None, description="Only items created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only items created before this time"),
+) -> dict:
+    """
+    FastAPI dependency collecting the optional inventory filters.
+
+    Returns:
+        Dictionary of the filters that were actually supplied
+    """
+    filters = {
+        "material_id": material_id,
+        "supplier_id": supplier_id,
+        "location": location,
+        "quality_grade": quality_grade,
+        "is_available": is_available,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def apply_inventory_filters(stmt: Select, filters: dict) -> Select:
+    """
+    Apply the filters produced by inventory_filters() to a select statement.
+
+    Args:
+        stmt: Select statement that includes the inventory_items table
+        filters: Dictionary as returned by inventory_filters()
+
+    Returns:
+        The filtered select statement
+    """
+    if "material_id" in filters:
+        stmt = stmt.where(InventoryItem.material_id == filters["material_id"])
+    if "supplier_id" in filters:
+        stmt = stmt.where(InventoryItem.supplier_id == filters["supplier_id"])
+    if "location" in filters:
+        stmt = stmt.where(InventoryItem.location == filters["location"])
+    if "quality_grade" in filters:
+        stmt = stmt.where(InventoryItem.quality_grade == filters["quality_grade"])
+    if "is_available" in filters:
+        stmt = stmt.where(InventoryItem.is_available == filters["is_available"])
+    if "created_after" in filters:
+        stmt = stmt.where(InventoryItem.created_at >= filters["created_after"])
+    if "created_before" in filters:
+        stmt = stmt.where(InventoryItem.created_at < filters["created_before"])
+    return stmt
+
+
+def _as_float(column):
+    """Let the database return Numeric columns as floats instead of Decimal objects."""
+    return cast(column, Float)
+
+
+def inventory_list_query(filters: dict) -> Select:
+    """
+    Build the tuple select behind GET /api/inventory, newest items first.
+
+    Args:
+        filters: Dictionary as returned by inventory_filters()
+
+    Returns:
+        Select statement whose rows follow INVENTORY_LIST_COLUMNS
+    """
+    stmt = (
+        select(
+            InventoryItem.id,
+            InventoryItem.material_id,
+            func.coalesce(Material.name, "Unknown"),
+            func.coalesce(Material.material_type, "unknown"),
+            _as_float(InventoryItem.width),
+            _as_float(InventoryItem.height),
+            _as_float(InventoryItem.depth),
+            _as_float(InventoryItem.volume),
+            _as_float(InventoryItem.weight),
+            InventoryItem.quantity,
+            InventoryItem.location,
+            InventoryItem.quality_grade,
+            InventoryItem.notes,
+            InventoryItem.is_available,
+            InventoryItem.created_at,
+        )
+        .outerjoin(Material, InventoryItem.material_id == Material.id)
+        .order_by(InventoryItem.created_at.desc())
+    )
+    return apply_inventory_filters(stmt, filters)
+
+
+def inventory_rows_query(filters: dict) -> Select:
+    """
+    Build a column-only select over inventory items joined with their material.
+
+    Rows come back as plain tuples in INVENTORY_EXPORT_COLUMNS order, which
+    avoids ORM object hydration for large result sets.
+
+    Args:
+        filters: Dictionary as returned by inventory_filters()
+
+    Returns:
+        Select statement ordered by item id
+    """
+    stmt = (
+        select(
+            InventoryItem.id,
+            InventoryItem.material_id,
+            Material.name,
+            Material.material_type,
+            InventoryItem.supplier_id,
+            _as_float(InventoryItem.width),
+            _as_float(InventoryItem.height),
+            _as_float(InventoryItem.depth),
+            _as_float(InventoryItem.volume),
+            _as_float(InventoryItem.weight),
+            InventoryItem.quantity,
+            _as_float(InventoryItem.unit_cost),
+            InventoryItem.location,
+            InventoryItem.batch_number,
+            InventoryItem.quality_grade,
+            InventoryItem.notes,
+            InventoryItem.is_available,
+            InventoryItem.received_date,
+            InventoryItem.created_at,
+            InventoryItem.updated_at,
+        )
+        .outerjoin(Material, InventoryItem.material_id == Material.id)
+        .order_by(InventoryItem.id)
+    )
+    return apply_inventory_filters(stmt, filters)
@@ -0,0 +1,108 @@
+"""
+Persisting measurement results as inventory items.
+"""
+
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import InventoryItem, Material
+
+DEFAULT_MATERIAL = "Unknown Material"
+
+
+async def ensure_default_material(db: AsyncSession) -> bool:
+    """
+    Create the material automatically measured items are filed under, if missing.
+
+    Returns:
+        True if the material was created
+    """
+    result = await db.execute(select(Material.id).where(Material.name == DEFAULT_MATERIAL))
+    if result.scalar_one_or_none() is not None:
+        return False
+    db.add(
+        Material(
+            name=DEFAULT_MATERIAL,
+            description="Auto-created default material",
+            material_type="unknown",
+            density=None,
+        )
+    )
+    await db.commit()
+    return True
+
+
+def is_complete(piece: dict) -> bool:
+    """True if width, height and depth of a measured piece are known."""
+    return all(piece.get(key) is not None for key in ["width_mm", "height_mm", "depth_mm"])
+
+
+async def save_measurements(
+    db: AsyncSession,
+    measurements: dict,
+    notes: str = "Automatically measured using computer vision",
+) -> List[int]:
+    """
+    Save every completely measured piece to the inventory_items table.
+    
+    All pieces are written in one transaction: either every complete piece
+    is saved or none is.
+    
+    Args:
+        db: Database session
+        measurements: Dictionary containing measurement data; its "objects"
+            list holds one entry per piece (the top-level values are used
+            when it is missing)
+        notes: Notes stored with the items
+        
+    Returns:
+        The IDs of the created inventory items (empty if nothing was saved)
+    """
+    pieces = measurements.get("objects") or [measurements]
+    # Only save pieces with valid measurements
+    complete = [piece for piece in pieces if is_complete(piece)]
+    if len(complete) < len(pieces):
+        print(f"Warning: {len(pieces) - len(complete)} incompletely measured piece(s), not saving them to database")
+    if not complete:
+        return []
+
+    try:
+        # Get the Unknown Material ID
+        result = await db.execute(
+            select(Material.id).where(Material.name == DEFAULT_MATERIAL)
+        )
+        material_id = result.scalar_one_or_none()
+        
+        if material_id is None:
+            print("Warning: Unknown Material not found in database")
+            return []
+        
+        inventory_items = [
+            InventoryItem(
+                material_id=material_id,
+                width=piece.get("width_mm"),
+                height=piece.get("height_mm"),
+                depth=piece.get("depth_mm"),
+                volume=piece.get("volume_mm3"),
+                weight=piece.get("calculated_weight_kg", 0) * 1000 if piece.get("calculated_weight_kg") else None,  # Convert kg to grams
+                quantity=1,
+                quality_grade="AUTO",  # Mark as auto-measured
+                notes=notes,
+                is_available=True
+            )
+            for piece in complete
+        ]
+        
+        db.add_all(inventory_items)
+        await db.commit()
+        
+        ids = [item.id for item in inventory_items]
+        print(f"✓ Saved inventory item(s) with ID: {', '.join(map(str, ids))}")
+        return ids
+        
+    except Exception as e:
+        print(f"Warning: Failed to save measurements to database: {e}")
+        await db.rollback()
+        return []
@@ -1,12 +1,13 @@
 """
 SQLAlchemy models for the metal piece measurement system.
-Defines the four main tables: materials, suppliers, inventory_items, and price_history.
+Defines the four main tables: materials, suppliers, inventory_items, and price_history,
+plus the derived inventory_summary table.
 """
 
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, ForeignKey, Boolean, UniqueConstraint, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -70,6 +71,12 @@ class InventoryItem(Base):
     volume = Column(Numeric(15, 6), nullable=True)  # mm³
     weight = Column(Numeric(10, 3), nullable=True)  # grams
     
+    # Orientation-independent dimensions for fit search (set on insert/update)
+    dim_min = Column(Numeric(10, 3), nullable=True)  # smallest of width/height/depth
+    dim_mid = Column(Numeric(10, 3), nullable=True)
+    dim_max = Column(Numeric(10, 3), nullable=True)  # largest of width/height/depth
+    bounding_volume = Column(Numeric(20, 6), nullable=True)  # mm³, width * height * depth
+    
     # Inventory management
     quantity = Column(Integer, default=1)
     unit_cost = Column(Numeric(10, 2), nullable=True)  # cost per unit
@@ -93,6 +100,35 @@ class InventoryItem(Base):
     material = relationship("Material", back_populates="inventory_items")
     supplier = relationship("Supplier", back_populates="inventory_items")
     price_history = relationship("PriceHistory", back_populates="inventory_item")
+    
+    __table_args__ = (
+        # Fit search: "at least a × b × c mm in any orientation" (fit_search.py)
+        Index("ix_inventory_items_sorted_dims", "is_available", "dim_min", "dim_mid", "dim_max"),
+        # Fit search ranking: smallest bounding volume first
+        Index("ix_inventory_items_bounding_volume", "is_available", "bounding_volume"),
+    )
+
+
+def sorted_dimensions(width, height, depth) -> Optional[tuple]:
+    """
+    Return (dim_min, dim_mid, dim_max, bounding_volume) for the given measurements,
+    or None if any of them is missing.
+    """
+    if width is None or height is None or depth is None:
+        return None
+    dims = sorted(float(value) for value in (width, height, depth))
+    return dims[0], dims[1], dims[2], dims[0] * dims[1] * dims[2]
+
+
+@event.listens_for(InventoryItem, "before_insert")
+@event.listens_for(InventoryItem, "before_update")
+def _set_sorted_dimensions(mapper, connection, item: InventoryItem) -> None:
+    """Keep the fit search columns in sync with width/height/depth."""
+    dims = sorted_dimensions(item.width, item.height, item.depth)
+    if dims is None:
+        item.dim_min = item.dim_mid = item.dim_max = item.bounding_volume = None
+    else:
+        item.dim_min, item.dim_mid, item.dim_max, item.bounding_volume = dims
 
 
 class PriceHistory(Base):
@@ -100,6 +136,10 @@ class PriceHistory(Base):
     Price history table - tracks price changes for inventory items over time.
     """
     __tablename__ = "price_history"
+    __table_args__ = (
+        # Serves "latest price per item and type" lookups (valuation.py)
+        Index("ix_price_history_item_type_effective", "inventory_item_id", "price_type", "effective_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
@@ -123,4 +163,30 @@ class PriceHistory(Base):
     created_by = Column(String(100), nullable=True)  # user who entered the price
     
     # Relationships
-    inventory_item = relationship("InventoryItem", back_populates="price_history")
\ No newline at end of file
+    inventory_item = relationship("InventoryItem", back_populates="price_history")
+
+
+class InventorySummary(Base):
+    """
+    Inventory summary table - running totals of available stock per material and location.
+    Maintained in the same transaction as inventory item changes (see summary.py).
+    """
+    __tablename__ = "inventory_summary"
+    __table_args__ = (
+        UniqueConstraint("material_id", "location", name="uq_inventory_summary_material_location"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    material_id = Column(Integer, ForeignKey("materials.id"), nullable=False)
+    location = Column(String(100), nullable=False, default="")  # '' = no location assigned
+    
+    # Aggregates over available items
+    item_count = Column(Integer, nullable=False, default=0)  # inventory rows
+    total_quantity = Column(Integer, nullable=False, default=0)  # sum of quantity
+    total_volume = Column(Numeric(20, 6), nullable=False, default=0)  # mm³, volume * quantity
+    total_weight = Column(Numeric(16, 3), nullable=False, default=0)  # grams, weight * quantity
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    material = relationship("Material")
@@ -7,6 +7,7 @@ import os
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from .models import Base
+from . import summary  # noqa: F401  (registers inventory summary maintenance on flush)
 
 # Database configuration - support both SQLite and PostgreSQL
 DATABASE_URL = os.getenv(
@@ -0,0 +1,238 @@
+"""
+Incrementally maintained inventory aggregates.
+
+Every flush that inserts, updates or deletes InventoryItem rows through the ORM
+applies the matching deltas to the inventory_summary table on the same
+connection, so the totals commit or roll back together with the item changes.
+Bulk statements issued with Core (``update(InventoryItem)`` etc.) bypass the
+ORM and therefore require a rebuild afterwards.
+
+Run ``python -m app.database.summary`` from the backend directory to rebuild
+the table from scratch.
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models import InventoryItem, InventorySummary
+
+
+SummaryKey = Tuple[int, str]
+
+_TRACKED_ATTRIBUTES = ("material_id", "location", "is_available", "quantity", "volume", "weight")
+
+
+def _contribution(values: dict) -> Optional[Tuple[SummaryKey, list]]:
+    """
+    Return the summary key and [count, quantity, volume, weight] an item adds.
+    Unavailable items do not count towards the summary.
+    """
+    if not values["is_available"] or values["material_id"] is None:
+        return None
+    quantity = values["quantity"] if values["quantity"] is not None else 1
+    volume = float(values["volume"] or 0) * quantity
+    weight = float(values["weight"] or 0) * quantity
+    key = (values["material_id"], values["location"] or "")
+    return key, [1, quantity, volume, weight]
+
+
+def _current_values(item: InventoryItem) -> dict:
+    values = {name: getattr(item, name) for name in _TRACKED_ATTRIBUTES}
+    # Column defaults are only applied during the INSERT itself
+    if values["is_available"] is None:
+        values["is_available"] = True
+    if values["quantity"] is None:
+        values["quantity"] = 1
+    return values
+
+
+def _committed_values(item: InventoryItem) -> dict:
+    """Values of the tracked attributes as they were before this flush."""
+    state = inspect(item)
+    values = {}
+    for name in _TRACKED_ATTRIBUTES:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(item, name)
+    return values
+
+
+def _add(deltas: Dict[SummaryKey, list], contribution, sign: int) -> None:
+    if contribution is None:
+        return
+    key, amounts = contribution
+    totals = deltas[key]
+    for index, amount in enumerate(amounts):
+        totals[index] += sign * amount
+
+
+def _apply_deltas(connection, deltas: Dict[SummaryKey, list]) -> None:
+    """Add the collected deltas to the summary rows, creating rows as needed."""
+    now = datetime.utcnow()
+    table = InventorySummary.__table__
+    dialect = connection.dialect.name
+
+    for (material_id, location), (count, quantity, volume, weight) in deltas.items():
+        if not any((count, quantity, volume, weight)):
+            continue
+        values = {
+            "material_id": material_id,
+            "location": location,
+            "item_count": count,
+            "total_quantity": quantity,
+            "total_volume": volume,
+            "total_weight": weight,
+            "updated_at": now,
+        }
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.material_id, table.c.location],
+                set_={
+                    "item_count": table.c.item_count + stmt.excluded.item_count,
+                    "total_quantity": table.c.total_quantity + stmt.excluded.total_quantity,
+                    "total_volume": table.c.total_volume + stmt.excluded.total_volume,
+                    "total_weight": table.c.total_weight + stmt.excluded.total_weight,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            connection.execute(stmt)
+            continue
+
+        result = connection.execute(
+            update(table)
+            .where(table.c.material_id == material_id, table.c.location == location)
+            .values(
+                item_count=table.c.item_count + count,
+                total_quantity=table.c.total_quantity + quantity,
+                total_volume=table.c.total_volume + volume,
+                total_weight=table.c.total_weight + weight,
+                updated_at=now,
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**values))
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_inventory_summary(session: Session, flush_context) -> None:
+    """
+    Translate pending InventoryItem changes into summary deltas.
+    Runs after the item rows were written but before the transaction commits;
+    the session's new/dirty/deleted collections still describe this flush.
+    """
+    deltas: Dict[SummaryKey, list] = defaultdict(lambda: [0, 0, 0.0, 0.0])
+
+    for obj in session.new:
+        if isinstance(obj, InventoryItem):
+            _add(deltas, _contribution(_current_values(obj)), +1)
+
+    for obj in session.dirty:
+        if isinstance(obj, InventoryItem) and session.is_modified(obj, include_collections=False):
+            _add(deltas, _contribution(_committed_values(obj)), -1)
+            _add(deltas, _contribution(_current_values(obj)), +1)
+
+    for obj in session.deleted:
+        if isinstance(obj, InventoryItem):
+            _add(deltas, _contribution(_committed_values(obj)), -1)
+
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+async def rebuild_inventory_summary(db: AsyncSession) -> int:
+    """
+    Recompute the whole inventory_summary table from inventory_items.
+    Use after bulk imports, Core-level updates or to repair drift.
+
+    Args:
+        db: Database session; the rebuild is committed by this function
+
+    Returns:
+        Number of summary rows written
+    """
+    quantity = func.coalesce(InventoryItem.quantity, 1)
+    location = func.coalesce(InventoryItem.location, "")
+    aggregate = (
+        select(
+            InventoryItem.material_id,
+            location.label("location"),
+            func.count(InventoryItem.id).label("item_count"),
+            func.sum(quantity).label("total_quantity"),
+            func.sum(func.coalesce(InventoryItem.volume, 0) * quantity).label("total_volume"),
+            func.sum(func.coalesce(InventoryItem.weight, 0) * quantity).label("total_weight"),
+        )
+        .where(InventoryItem.is_available.is_(True))
+        .group_by(InventoryItem.material_id, location)
+    )
+
+    now = datetime.utcnow()
+    rows = (await db.execute(aggregate)).all()
+    await db.execute(delete(InventorySummary))
+    if rows:
+        await db.execute(
+            insert(InventorySummary),
+            [
+                {
+                    "material_id": row.material_id,
+                    "location": row.location,
+                    "item_count": row.item_count,
+                    "total_quantity": row.total_quantity,
+                    "total_volume": row.total_volume,
+                    "total_weight": row.total_weight,
+                    "updated_at": now,
+                }
+                for row in rows
+            ],
+        )
+    await db.commit()
+    return len(rows)
+
+
+async def ensure_inventory_summary(db: AsyncSession) -> bool:
+    """
+    Build the summary once if it is empty while available stock exists,
+    e.g. right after the table was added to an existing database.
+
+    Returns:
+        True if a rebuild was performed
+    """
+    has_summary = (await db.execute(select(InventorySummary.id).limit(1))).first() is not None
+    if has_summary:
+        return False
+    has_items = (
+        await db.execute(select(InventoryItem.id).where(InventoryItem.is_available.is_(True)).limit(1))
+    ).first() is not None
+    if not has_items:
+        return False
+    await rebuild_inventory_summary(db)
+    return True
+
+
+async def _rebuild_from_command_line() -> None:
+    from .session import async_sessionmaker, close_db_engine, create_tables
+
+    await create_tables()
+    async with async_sessionmaker() as db:
+        count = await rebuild_inventory_summary(db)
+    await close_db_engine()
+    print(f"✓ Rebuilt inventory summary ({count} material/location rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_rebuild_from_command_line())
@@ -0,0 +1,239 @@
+"""
+Inventory valuation queries over price_history.
+
+The current price of an item is its most recent price_history row (by
+effective_date, ties broken by id) among the requested price types, optionally
+as of a given date. The latest row per item is selected in one pass:
+- PostgreSQL: ``DISTINCT ON (inventory_item_id)``
+- other databases: ``row_number() OVER (PARTITION BY inventory_item_id ...)``
+- SQLite older than 3.25 (no window functions): join on the max effective date
+
+All three walk ix_price_history_item_type_effective instead of running a
+correlated subquery per inventory row.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Select, and_, case, func, select
+from sqlalchemy.sql import Subquery
+
+from .models import InventoryItem, Material, PriceHistory
+
+
+DEFAULT_PRICE_TYPES = ("valuation", "purchase")
+
+
+def _type_priority(price_types: Sequence[str]):
+    """Rank the requested price types; earlier entries win over newer rows of later types."""
+    if len(price_types) == 1:
+        return None
+    return case(
+        {price_type: index for index, price_type in enumerate(price_types)},
+        value=PriceHistory.price_type,
+    )
+
+
+def latest_prices(dialect_name: str, price_types: Sequence[str], as_of: Optional[datetime] = None) -> Subquery:
+    """
+    Build a subquery with one row per inventory item: its current price.
+
+    Args:
+        dialect_name: Name of the database dialect (``session.bind.dialect.name``)
+        price_types: Accepted price types in priority order, e.g. ("valuation", "purchase")
+        as_of: Only consider prices effective at or before this time (default:
+            now); aware times are converted to naive UTC like effective_date
+
+    Returns:
+        Subquery with columns inventory_item_id, price_per_unit, currency,
+        price_type and effective_date
+    """
+    if as_of is None:
+        as_of = datetime.utcnow()
+    elif as_of.tzinfo is not None:
+        # effective_date is a naive UTC column; asyncpg rejects aware parameters for it
+        as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+    conditions = and_(PriceHistory.price_type.in_(price_types), PriceHistory.effective_date <= as_of)
+    priority = _type_priority(price_types)
+    ordering = ([priority] if priority is not None else []) + [
+        PriceHistory.effective_date.desc(),
+        PriceHistory.id.desc(),
+    ]
+    columns = (
+        PriceHistory.inventory_item_id,
+        PriceHistory.price_per_unit,
+        PriceHistory.currency,
+        PriceHistory.price_type,
+        PriceHistory.effective_date,
+    )
+
+    if dialect_name == "postgresql":
+        return (
+            select(*columns)
+            .where(conditions)
+            .distinct(PriceHistory.inventory_item_id)
+            .order_by(PriceHistory.inventory_item_id, *ordering)
+            .subquery("latest_price")
+        )
+
+    if dialect_name != "sqlite" or sqlite3.sqlite_version_info >= (3, 25, 0):
+        row_number = func.row_number().over(partition_by=PriceHistory.inventory_item_id, order_by=ordering)
+        ranked = select(*columns, row_number.label("rn")).where(conditions).subquery("ranked_price")
+        return (
+            select(
+                ranked.c.inventory_item_id,
+                ranked.c.price_per_unit,
+                ranked.c.currency,
+                ranked.c.price_type,
+                ranked.c.effective_date,
+            )
+            .where(ranked.c.rn == 1)
+            .subquery("latest_price")
+        )
+
+    return _latest_prices_without_window(price_types, conditions)
+
+
+def _latest_prices_without_window(price_types: Sequence[str], conditions) -> Subquery:
+    """Groupwise-max fallback for SQLite builds without window functions."""
+    priority = _type_priority(price_types)
+    if priority is not None:
+        # Restrict to the best available type per item first
+        best_type = (
+            select(PriceHistory.inventory_item_id, func.min(priority).label("best"))
+            .where(conditions)
+            .group_by(PriceHistory.inventory_item_id)
+            .subquery("best_type")
+        )
+        conditions = and_(
+            conditions,
+            PriceHistory.inventory_item_id == best_type.c.inventory_item_id,
+            priority == best_type.c.best,
+        )
+    newest = (
+        select(
+            PriceHistory.inventory_item_id,
+            func.max(PriceHistory.effective_date).label("effective_date"),
+        )
+        .where(conditions)
+        .group_by(PriceHistory.inventory_item_id)
+        .subquery("newest_date")
+    )
+    newest_id = (
+        select(func.max(PriceHistory.id).label("id"))
+        .join(
+            newest,
+            and_(
+                PriceHistory.inventory_item_id == newest.c.inventory_item_id,
+                PriceHistory.effective_date == newest.c.effective_date,
+            ),
+        )
+        .where(conditions)
+        .group_by(PriceHistory.inventory_item_id)
+        .subquery("newest_id")
+    )
+    return (
+        select(
+            PriceHistory.inventory_item_id,
+            PriceHistory.price_per_unit,
+            PriceHistory.currency,
+            PriceHistory.price_type,
+            PriceHistory.effective_date,
+        )
+        .join(newest_id, PriceHistory.id == newest_id.c.id)
+        .subquery("latest_price")
+    )
+
+
+def _item_scope(stmt: Select, material_id: Optional[int], include_unavailable: bool) -> Select:
+    if material_id is not None:
+        stmt = stmt.where(InventoryItem.material_id == material_id)
+    if not include_unavailable:
+        stmt = stmt.where(InventoryItem.is_available.is_(True))
+    return stmt
+
+
+def _item_value(latest: Subquery):
+    return latest.c.price_per_unit * func.coalesce(InventoryItem.quantity, 1)
+
+
+def item_valuation_query(
+    latest: Subquery,
+    material_id: Optional[int] = None,
+    include_unavailable: bool = False,
+) -> Select:
+    """
+    Current value of every inventory item (items without a price have value NULL).
+
+    Returns:
+        Select with item_id, material_id, quantity, price_per_unit, currency,
+        price_type, effective_date and value columns
+    """
+    stmt = (
+        select(
+            InventoryItem.id.label("item_id"),
+            InventoryItem.material_id,
+            InventoryItem.quantity,
+            latest.c.price_per_unit,
+            latest.c.currency,
+            latest.c.price_type,
+            latest.c.effective_date,
+            _item_value(latest).label("value"),
+        )
+        .outerjoin(latest, latest.c.inventory_item_id == InventoryItem.id)
+        .order_by(InventoryItem.id)
+    )
+    return _item_scope(stmt, material_id, include_unavailable)
+
+
+def material_valuation_query(latest: Subquery, include_unavailable: bool = False) -> Select:
+    """
+    Stock value per material and currency, plus how many items had no price.
+
+    Returns:
+        Select with material_id, material_name, currency, priced_items,
+        unpriced_items and total_value columns
+    """
+    stmt = (
+        select(
+            InventoryItem.material_id,
+            func.coalesce(Material.name, "Unknown").label("material_name"),
+            latest.c.currency,
+            func.count(latest.c.inventory_item_id).label("priced_items"),
+            func.sum(case((latest.c.inventory_item_id.is_(None), 1), else_=0)).label("unpriced_items"),
+            func.sum(_item_value(latest)).label("total_value"),
+        )
+        .outerjoin(latest, latest.c.inventory_item_id == InventoryItem.id)
+        .outerjoin(Material, InventoryItem.material_id == Material.id)
+        .group_by(InventoryItem.material_id, Material.name, latest.c.currency)
+        .order_by(InventoryItem.material_id, latest.c.currency)
+    )
+    return _item_scope(stmt, None, include_unavailable)
+
+
+def total_valuation_query(latest: Subquery, include_unavailable: bool = False) -> Select:
+    """
+    Warehouse total per currency (currency NULL collects the unpriced items).
+
+    Returns:
+        Select with currency, priced_items, unpriced_items and total_value columns
+    """
+    stmt = (
+        select(
+            latest.c.currency,
+            func.count(latest.c.inventory_item_id).label("priced_items"),
+            func.sum(case((latest.c.inventory_item_id.is_(None), 1), else_=0)).label("unpriced_items"),
+            func.sum(_item_value(latest)).label("total_value"),
+        )
+        .outerjoin(latest, latest.c.inventory_item_id == InventoryItem.id)
+        .group_by(latest.c.currency)
+        .order_by(latest.c.currency)
+    )
+    return _item_scope(stmt, None, include_unavailable)
+
+
+def parse_price_types(value: Optional[str]) -> List[str]:
+    """Split a comma-separated price type list, falling back to DEFAULT_PRICE_TYPES."""
+    price_types = [part.strip() for part in (value or "").split(",") if part.strip()]
+    return price_types or list(DEFAULT_PRICE_TYPES)
@@ -4,16 +4,38 @@ This file creates the FastAPI app instance and configures it with
 dependency injection for database sessions.
 """
 
-import os
-import tempfile
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from .database.session import get_db_session, create_tables, close_db_engine
-from .image_handler.main import process_images, save_uploaded_file
+from .database.session import async_sessionmaker, get_db_session, create_tables, close_db_engine
+from .database.inventory import INVENTORY_LIST_COLUMNS, inventory_filters, inventory_list_query
+from .database.summary import ensure_inventory_summary
+from .database.measurements import ensure_default_material, is_complete, save_measurements
+from .image_handler.capabilities import probe as probe_capabilities
+from .image_handler.scheduler import get_scheduler, schedule_measurement, stop_scheduler
+from .serialization import FastJSONResponse
+from .api import inventory as inventory_api
+from .api import valuation as valuation_api
+from .api import esp32 as esp32_api
+from .api import dual_esp32 as dual_esp32_api
+from .api import images as images_api
+from .api import captures as captures_api
+from .api import station as station_api
+from .api import cameras as cameras_api
+from .api import measurement_jobs as measurement_jobs_api
+from .api import quality as quality_api
+from .blob_store import BlobStore
+from .capture_archive import CaptureArchive
+from .cameras.client import CameraRegistry
+from .cameras.health import HealthMonitor
+from .cameras.stream import CameraStreams
+from .config import Config
+from .conveyor import ConveyorStation
+from .measurement_jobs import MeasurementJobs
 
 
 @asynccontextmanager
@@ -26,23 +48,9 @@ async def lifespan(app: FastAPI):
     await create_tables()
 
     # Seed default 'Unknown Material' if missing
-    from sqlalchemy import select
-    from .database.models import Material
     try:
         async for db in get_db_session():
-            result = await db.execute(
-                select(Material.id).where(Material.name == "Unknown Material")
-            )
-            if result.scalar_one_or_none() is None:
-                db.add(
-                    Material(
-                        name="Unknown Material",
-                        description="Auto-created default material",
-                        material_type="unknown",
-                        density=None,
-                    )
-                )
-                await db.commit()
+            if await ensure_default_material(db):
                 print("✓ Created default 'Unknown Material' entry")
             else:
                 print("✓ Default 'Unknown Material' already exists")
@@ -51,8 +59,51 @@ async def lifespan(app: FastAPI):
         # Do not block startup if seeding fails; log for visibility
         print(f"Startup seed warning: {e}")
 
+    # Build the inventory summary for databases that predate it
+    try:
+        async for db in get_db_session():
+            if await ensure_inventory_summary(db):
+                print("✓ Built inventory summary from existing items")
+            break
+    except Exception as e:
+        print(f"Startup summary warning: {e}")
+
+    # Long-lived camera clients (keep-alive pools shared by all requests)
+    app.state.cameras = CameraRegistry.from_config()
+    app.state.camera_health = HealthMonitor.from_config(app.state.cameras)
+    app.state.camera_health.start()
+    app.state.blobs = BlobStore.from_config()
+    app.state.capture_archive = CaptureArchive.from_config()
+    app.state.capture_archive.start()
+    app.state.camera_streams = None
+    if Config.ESP32_STREAM_ENABLED:
+        app.state.camera_streams = CameraStreams.from_config()
+        app.state.camera_streams.start()
+        print("✓ Started ESP32 stream readers")
+    capabilities = probe_capabilities()
+    available = [name for name, backend in capabilities["backends"].items() if backend["available"]]
+    print(f"✓ ML backends: {', '.join(available) or 'none'}"
+          f"{'' if capabilities['ml_available'] else ' (mock measurements)'}")
+    app.state.measurement_jobs = MeasurementJobs.from_config()
+    # Measurement worker processes (MEASURE_SCHEDULER_MODE) start with their models loaded
+    await asyncio.to_thread(get_scheduler().start)
+    app.state.conveyor_station = ConveyorStation.from_config(
+        app.state.cameras,
+        app.state.camera_streams,
+        app.state.capture_archive,
+        session_factory=async_sessionmaker,
+    )
+
     yield
     # Shutdown
+    await app.state.conveyor_station.stop()
+    await app.state.camera_health.stop()
+    await app.state.measurement_jobs.stop()
+    await asyncio.to_thread(stop_scheduler)
+    if app.state.camera_streams is not None:
+        await app.state.camera_streams.stop()
+    await app.state.cameras.aclose()
+    app.state.capture_archive.stop()
     await close_db_engine()
 
 
@@ -73,6 +124,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(inventory_api.router)
+app.include_router(valuation_api.router)
+app.include_router(esp32_api.router)
+app.include_router(dual_esp32_api.router)
+app.include_router(images_api.router)
+app.include_router(captures_api.router)
+app.include_router(station_api.router)
+app.include_router(cameras_api.router)
+app.include_router(measurement_jobs_api.router)
+app.include_router(quality_api.router)
+
 
 @app.get("/")
 async def root():
@@ -89,7 +151,8 @@ async def root():
 @app.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db_session)):
     """
-    Health check endpoint that verifies database connectivity.
+    Health check endpoint that verifies database connectivity and lists the
+    installed ML backends (probed once at startup).
     """
     try:
         # Simple database query to verify connection
@@ -98,13 +161,15 @@ async def health_check(db: AsyncSession = Depends(get_db_session)):
         return {
             "status": "healthy",
             "database": "connected",
-            "message": "FastAPI application is running correctly"
+            "message": "FastAPI application is running correctly",
+            "ml": probe_capabilities(),
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "database": "disconnected",
-            "error": str(e)
+            "error": str(e),
+            "ml": probe_capabilities(),
         }
 
 
@@ -147,11 +212,12 @@ async def process_images_endpoint(
     """
     Process two uploaded images to extract metal piece measurements.
     
-    Critical Script Assignment:
+    Critical Script Assignment (ported in-memory by app/image_handler/engine.py):
     - image_bottom → Main2Bottom.py (width) + Main4High.py (height)  
     - image_side → Main7BottomWidthBETTER.py (depth)
     
-    Returns JSON with measurements array containing precise measurements.
+    Returns JSON with a measurements array holding one entry per measured
+    piece; every completely measured piece is saved as an inventory item.
     """
     
     # Validate file types
@@ -161,114 +227,46 @@ async def process_images_endpoint(
     if image_side.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Side image must be JPEG or PNG")
     
-    # Save uploaded files temporarily
-    temp_files = []
     try:
-        bottom_path = save_uploaded_file(image_bottom, "bottom")
-        side_path = save_uploaded_file(image_side, "side")
-        temp_files.extend([bottom_path, side_path])
-        
-        print(f"Processing images: bottom={bottom_path}, side={side_path}")
+        bottom_bytes = await image_bottom.read()
+        side_bytes = await image_side.read()
+        print(f"Processing images: bottom={image_bottom.filename}, side={image_side.filename}")
         
         # Process images with correct script assignment
-        measurements = process_images(bottom_path, side_path)
+        measurements = await schedule_measurement(bottom_bytes, side_bytes)
         
-        # Save measurements to database
-        inventory_item_id = await _save_measurements_to_db(db, measurements)
+        # Save measurements to database (one item per complete piece)
+        inventory_item_ids = iter(await save_measurements(db, measurements))
         
         # Create response in the required format
         response = {
             "measurements": [
                 {
-                    "item_id": inventory_item_id if inventory_item_id else None,
+                    "item_id": next(inventory_item_ids, None) if is_complete(piece) else None,
                     "material_id": 1,  # Default to Unknown Material
-                    "width_mm": measurements.get("width_mm"),
-                    "height_mm": measurements.get("height_mm"),
-                    "depth_mm": measurements.get("depth_mm"),
+                    "width_mm": piece.get("width_mm"),
+                    "height_mm": piece.get("height_mm"),
+                    "depth_mm": piece.get("depth_mm"),
+                    "position_cm": piece.get("position_cm"),
                     "confidence": 0.85,  # Placeholder as requested
-                    "calculated_weight_kg": measurements.get("calculated_weight_kg"),
-                    "volume_mm3": measurements.get("volume_mm3"),
+                    "calculated_weight_kg": piece.get("calculated_weight_kg"),
+                    "volume_mm3": piece.get("volume_mm3"),
                     "processing_errors": measurements.get("errors", []),
                     "processing_successful": measurements.get("processing_successful", False)
                 }
+                for piece in measurements["objects"]
             ],
             "status": "success" if measurements.get("processing_successful", False) else "partial_success",
             "message": "Image processing completed" if measurements.get("processing_successful", False) else "Image processing completed with some errors"
         }
         
-        return response
+        return FastJSONResponse(response)
         
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Image processing failed: {str(e)}"
         )
-    
-    finally:
-        # Clean up temporary files
-        for temp_file in temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
-            except Exception as e:
-                print(f"Warning: Failed to clean up temporary file {temp_file}: {e}")
-
-
-async def _save_measurements_to_db(db: AsyncSession, measurements: dict) -> Optional[int]:
-    """
-    Save measurement data to the inventory_items table.
-    
-    Args:
-        db: Database session
-        measurements: Dictionary containing measurement data
-        
-    Returns:
-        The ID of the created inventory item, or None if saving failed
-    """
-    from sqlalchemy import select
-    from .database.models import Material, InventoryItem
-    
-    try:
-        # Get the Unknown Material ID
-        result = await db.execute(
-            select(Material.id).where(Material.name == "Unknown Material")
-        )
-        material_id = result.scalar_one_or_none()
-        
-        if material_id is None:
-            print("Warning: Unknown Material not found in database")
-            return None
-        
-        # Only save if we have valid measurements
-        if not all(measurements.get(key) is not None for key in ["width_mm", "height_mm", "depth_mm"]):
-            print("Warning: Incomplete measurements, not saving to database")
-            return None
-        
-        # Create new inventory item
-        inventory_item = InventoryItem(
-            material_id=material_id,
-            width=measurements.get("width_mm"),
-            height=measurements.get("height_mm"),
-            depth=measurements.get("depth_mm"),
-            volume=measurements.get("volume_mm3"),
-            weight=measurements.get("calculated_weight_kg", 0) * 1000 if measurements.get("calculated_weight_kg") else None,  # Convert kg to grams
-            quantity=1,
-            quality_grade="AUTO",  # Mark as auto-measured
-            notes="Automatically measured using computer vision",
-            is_available=True
-        )
-        
-        db.add(inventory_item)
-        await db.commit()
-        await db.refresh(inventory_item)
-        
-        print(f"✓ Saved inventory item with ID: {inventory_item.id}")
-        return inventory_item.id
-        
-    except Exception as e:
-        print(f"Warning: Failed to save measurements to database: {e}")
-        await db.rollback()
-        return None
 
 
 @app.get("/api/process-images/test")
@@ -298,50 +296,26 @@ async def test_process_images():
 
 
 @app.get("/api/inventory")
-async def get_inventory(db: AsyncSession = Depends(get_db_session)):
+async def get_inventory(
+    filters: dict = Depends(inventory_filters),
+    db: AsyncSession = Depends(get_db_session)
+):
     """
     Get all inventory items with their associated material information.
-    Returns a list of all inventory items in the database.
+    Returns a list of all inventory items in the database, optionally filtered
+    by material, supplier, location, quality grade, availability or creation time.
+
+    Rows are fetched as tuples (no ORM objects) and serialized by FastJSONResponse.
     """
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    from .database.models import InventoryItem
-    
     try:
-        # Query inventory items with their associated material
-        result = await db.execute(
-            select(InventoryItem)
-            .options(selectinload(InventoryItem.material))
-            .order_by(InventoryItem.created_at.desc())
-        )
-        inventory_items = result.scalars().all()
-        
-        # Format response
-        items = []
-        for item in inventory_items:
-            items.append({
-                "id": item.id,
-                "material_id": item.material_id,
-                "material_name": item.material.name if item.material else "Unknown",
-                "material_type": item.material.material_type if item.material else "unknown",
-                "width_mm": float(item.width) if item.width is not None else None,
-                "height_mm": float(item.height) if item.height is not None else None,
-                "depth_mm": float(item.depth) if item.depth is not None else None,
-                "volume_mm3": float(item.volume) if item.volume is not None else None,
-                "weight_g": float(item.weight) if item.weight is not None else None,
-                "quantity": item.quantity,
-                "location": item.location,
-                "quality_grade": item.quality_grade,
-                "notes": item.notes,
-                "is_available": item.is_available,
-                "created_at": item.created_at.isoformat() if item.created_at is not None else None
-            })
+        result = await db.execute(inventory_list_query(filters))
+        items = [dict(zip(INVENTORY_LIST_COLUMNS, row)) for row in result.all()]
         
-        return {
+        return FastJSONResponse({
             "inventory": items,
             "total_count": len(items),
             "status": "success"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve inventory: {str(e)}")
@@ -0,0 +1,79 @@
+"""
+Measurement annotations as vector primitives, rendered only on request.
+
+The scripts draw boxes, ROIs, edge points and labels onto a full-frame copy
+of every unwarped image (and blend contour overlays) whether or not anybody
+looks at them. The engine instead records each drawing as a primitive in
+unwarped (grid) coordinates,
+
+    {"shape": "rect" | "line" | "circle" | "text", "kind": "box" | "roi" | "edge" | "label",
+     "points": [[x, y], ...], "text": "..."}
+
+and returns them per view together with the homography and unwarped size
+(measure_images()["annotations"]). render_annotated() unwarps an archived
+source image and draws them when an annotated image is requested
+(``GET /api/captures/<capture_id>/annotated/<role>``).
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+# BGR colours of the scripts' annotated_result.jpg
+STYLES = {
+    "box": (255, 255, 0),
+    "roi": (0, 0, 255),
+    "edge": (255, 255, 0),
+    "label": (255, 255, 0),
+}
+
+
+def primitive(shape: str, kind: str, *points: Sequence[float], text: Optional[str] = None) -> Dict:
+    item = {"shape": shape, "kind": kind, "points": [[int(round(x)), int(round(y))] for x, y in points]}
+    if text is not None:
+        item["text"] = text
+    return item
+
+
+def shift(primitives: List[Dict], dx: float, dy: float) -> List[Dict]:
+    """*primitives* moved by (dx, dy), e.g. from region to unwarped image coordinates."""
+    if not dx and not dy:
+        return primitives
+    return [{**item, "points": [[x + int(dx), y + int(dy)] for x, y in item["points"]]} for item in primitives]
+
+
+def render_annotated(image_bytes: bytes, annotation: Dict, quality: int = 90) -> bytes:
+    """
+    Unwarp *image_bytes* with the annotation's homography and draw its primitives.
+
+    Args:
+        image_bytes: Encoded source frame the annotation was measured on
+        annotation: {"homography", "size", "primitives"} of one view
+
+    Returns:
+        JPEG bytes
+
+    Raises:
+        ValueError: If the image cannot be decoded
+    """
+    from .calibration import decode_image
+
+    image = decode_image(image_bytes)
+    width, height = annotation["size"]
+    canvas = cv2.warpPerspective(image, np.array(annotation["homography"], dtype=np.float64), (int(width), int(height)))
+    for item in annotation["primitives"]:
+        color = STYLES.get(item["kind"], (255, 255, 255))
+        points = [tuple(point) for point in item["points"]]
+        if item["shape"] == "rect":
+            cv2.rectangle(canvas, points[0], points[1], color, 2)
+        elif item["shape"] == "line":
+            cv2.line(canvas, points[0], points[1], color, 2)
+        elif item["shape"] == "circle":
+            cv2.circle(canvas, points[0], 5, color, -1)
+        elif item["shape"] == "text":
+            cv2.putText(canvas, item.get("text", ""), points[0], cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    ok, encoded = cv2.imencode(".jpg", canvas, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Annotiertes Bild konnte nicht kodiert werden.")
+    return encoded.tobytes()
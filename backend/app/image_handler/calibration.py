@@ -0,0 +1,314 @@
+"""
+Grid calibration for in-memory images.
+
+Port of ``scripts /metal_utils.py`` that works on decoded arrays instead of
+file paths, so camera frames never have to touch the disk. The algorithms and
+thresholds are unchanged; the measurement scripts keep using metal_utils.
+
+Besides unwarping whole frames (compute_homography), the homography can be
+kept as a transform (find_homography): detections on the original frame are
+mapped into the unwarped grid with map_boxes and only the regions being
+measured are unwarped with warp_region.
+
+For a fixed station, GridCalibration keeps a view's homography and grid
+lines and checks later frames against them in well under a millisecond, so
+the contour, Canny and Hough searches only run when the grid has moved.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def decode_image(data: bytes, scale_percent: int = 100) -> np.ndarray:
+    """
+    Decode JPEG/PNG bytes into a BGR image, optionally scaled.
+
+    Raises:
+        ValueError: If the bytes are not a decodable image
+    """
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Bild konnte nicht dekodiert werden.")
+    if scale_percent != 100:
+        width = int(image.shape[1] * scale_percent / 100)
+        height = int(image.shape[0] * scale_percent / 100)
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def enhance_grid_detection(img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return edges and grayscale image with enhanced contrast."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    gray = clahe.apply(gray)
+    edges = cv2.Canny(gray, 30, 150, apertureSize=3)
+    kernel = np.ones((3, 3), np.uint8)
+    edges = cv2.dilate(edges, kernel, iterations=1)
+    edges = cv2.erode(edges, kernel, iterations=1)
+    return edges, gray
+
+
+def _order_points(pts: np.ndarray) -> np.ndarray:
+    rect = np.zeros((4, 2), np.float32)
+    s = pts.sum(axis=1)
+    rect[0] = pts[np.argmin(s)]
+    rect[2] = pts[np.argmax(s)]
+    diff = np.diff(pts, axis=1)
+    rect[1] = pts[np.argmin(diff)]
+    rect[3] = pts[np.argmax(diff)]
+    return rect
+
+
+def find_homography(resized: np.ndarray) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+    """
+    Find the perspective transform that unwarps the grid sheet in *resized*.
+
+    Returns:
+        (3x3 perspective matrix, (width, height) of the unwarped image); the
+        matrix is None and the size that of the input when no four-corner
+        outline is found
+
+    Raises:
+        ValueError: If the image has no contours at all
+    """
+    edges, _ = enhance_grid_detection(resized)
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("Keine Konturen für Homographie gefunden.")
+
+    cnt = max(contours, key=cv2.contourArea)
+    epsilon = 0.02 * cv2.arcLength(cnt, True)
+    approx = cv2.approxPolyDP(cnt, epsilon, True)
+
+    if len(approx) == 4:
+        rect = _order_points(approx.reshape(4, 2).astype(np.float32))
+        tl, tr, br, bl = rect
+        max_w = int(max(np.linalg.norm(br - bl), np.linalg.norm(tr - tl)))
+        max_h = int(max(np.linalg.norm(tr - br), np.linalg.norm(tl - bl)))
+        aspect_ratio = max_w / max_h
+        if not (0.8 <= aspect_ratio <= 1.2):
+            print(f"Warnung: Ungewöhnliches Seitenverhältnis {aspect_ratio:.2f}, überprüfe Homographie")
+        dst = np.array([[0, 0], [max_w - 1, 0], [max_w - 1, max_h - 1], [0, max_h - 1]], np.float32)
+        return cv2.getPerspectiveTransform(rect, dst), (max_w, max_h)
+    print("Warnung: Kein 4-Ecken-Rechteck gefunden, benutze Originalbild für Kalibrierung.")
+    return None, (resized.shape[1], resized.shape[0])
+
+
+def compute_homography(resized: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unwarp the grid sheet in *resized*.
+
+    Returns:
+        (warped image, 3x3 perspective matrix); the identity and a copy of the
+        input when no four-corner outline is found
+    """
+    matrix, size = find_homography(resized)
+    if matrix is None:
+        return resized.copy(), np.eye(3)
+    return cv2.warpPerspective(resized, matrix, size), matrix
+
+
+def warp_region(image: np.ndarray, matrix: np.ndarray, box) -> np.ndarray:
+    """
+    The pixels ``warpPerspective(image, matrix, ...)[y1:y2, x1:x2]`` without
+    unwarping the rest of the image.
+    """
+    x1, y1, x2, y2 = (int(v) for v in box[:4])
+    shift = np.array([[1, 0, -x1], [0, 1, -y1], [0, 0, 1]], dtype=np.float64)
+    return cv2.warpPerspective(image, shift @ matrix, (max(x2 - x1, 0), max(y2 - y1, 0)))
+
+
+def map_boxes(xyxy: np.ndarray, matrix: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Map (N, 4) boxes through *matrix*: the enclosing box of the four mapped
+    corners, clipped to an image of *size* (width, height). Looser than the
+    object's box in the unwarped image; see detection.refit_mapped_boxes.
+    """
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+    corners = xyxy[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 1, 2)
+    mapped = cv2.perspectiveTransform(corners, np.asarray(matrix, dtype=np.float64)).reshape(-1, 4, 2)
+    width, height = size
+    return np.stack(
+        [
+            mapped[:, :, 0].min(axis=1).clip(0, width),
+            mapped[:, :, 1].min(axis=1).clip(0, height),
+            mapped[:, :, 0].max(axis=1).clip(0, width),
+            mapped[:, :, 1].max(axis=1).clip(0, height),
+        ],
+        axis=1,
+    )
+
+
+def detect_grid_cells(img: np.ndarray):
+    """Return (vertical lines, horizontal lines, combined edge map) of the grid (BGR or grayscale *img*)."""
+    g = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    combined_edges = np.zeros_like(g)
+    for low_thresh in [30, 50, 70]:
+        for high_thresh in [100, 150, 200]:
+            combined_edges = cv2.bitwise_or(combined_edges, cv2.Canny(g, low_thresh, high_thresh, apertureSize=3))
+    all_lines = []
+    for min_line_length in [80, 100, 120]:
+        for max_line_gap in [5, 10, 15]:
+            lines = cv2.HoughLinesP(combined_edges, 1, np.pi / 180,
+                                    threshold=100, minLineLength=min_line_length,
+                                    maxLineGap=max_line_gap)
+            if lines is not None:
+                all_lines.extend(lines)
+    if not all_lines:
+        raise ValueError("Keine Rasterlinien gefunden.")
+    horizontal_lines = []
+    vertical_lines = []
+    for line in all_lines:
+        x1, y1, x2, y2 = line[0]
+        if abs(x1 - x2) < 15:
+            vertical_lines.append(line[0])
+        elif abs(y1 - y2) < 15:
+            horizontal_lines.append(line[0])
+    return vertical_lines, horizontal_lines, combined_edges
+
+
+def cluster_coords(coords: List[int], tol: int = 10) -> List[int]:
+    """Cluster sorted coordinate list using an adaptive tolerance."""
+    if not coords:
+        return []
+    sorted_coords = sorted(coords)
+    if len(sorted_coords) > 1:
+        avg_diff = np.mean(np.diff(sorted_coords))
+        tol = min(max(tol, avg_diff * 0.4), 20)
+    clusters = []
+    for c in sorted_coords:
+        if not clusters or c - clusters[-1][-1] > tol:
+            clusters.append([c])
+        else:
+            clusters[-1].append(c)
+    return [int(np.mean(cl)) for cl in clusters]
+
+
+def calibrate_grid(warped: np.ndarray, tol: int = 10):
+    """
+    Measure the 1 cm grid spacing.
+
+    Returns:
+        (px_per_cm, px_per_cm_x, px_per_cm_y, xs, ys) where xs/ys are the
+        clustered grid line positions
+
+    Raises:
+        ValueError: If too few grid lines are found ("Unzureichende Linienabstände ...")
+    """
+    vertical_lines, horizontal_lines, _ = detect_grid_cells(warped)
+    vert_x = [x for x1, y1, x2, y2 in vertical_lines for x in (x1, x2)]
+    horiz_y = [y for x1, y1, x2, y2 in horizontal_lines for y in (y1, y2)]
+    xs = cluster_coords(vert_x, tol)
+    ys = cluster_coords(horiz_y, tol)
+    x_deltas = np.diff(xs)
+    x_deltas = x_deltas[x_deltas > 20]
+    y_deltas = np.diff(ys)
+    y_deltas = y_deltas[y_deltas > 20]
+    if len(x_deltas) == 0 or len(y_deltas) == 0:
+        raise ValueError("Unzureichende Linienabstände für Kalibrierung.")
+    px_per_cm_x = float(np.median(x_deltas))
+    px_per_cm_y = float(np.median(y_deltas))
+    grid_ratio = px_per_cm_x / px_per_cm_y
+    if not (0.9 <= grid_ratio <= 1.1):
+        print(f"Warnung: Gitter könnte verzerrt sein! X/Y-Verhältnis: {grid_ratio:.2f}")
+    px_per_cm = (px_per_cm_x + px_per_cm_y) / 2
+    return px_per_cm, px_per_cm_x, px_per_cm_y, xs, ys
+
+
+def _grid_sample_points(xs: List[int], ys: List[int], spacing: float, per_line: int, window: int):
+    """
+    Sample points of the lines at *xs* (vertical) in unwarped coordinates.
+
+    Every line is sampled at up to *per_line* cell midpoints along it (away
+    from the crossing lines); a sample is the 2*window+1 points across the
+    line plus the two cell centres half a *spacing* to either side.
+
+    Returns:
+        (line points (S, 2*window+1, 2), cell points (S, 2, 2)) as (x, y)
+    """
+    rows = [(a + b) / 2 for a, b in zip(ys, ys[1:])]
+    rows = [rows[int(i)] for i in np.linspace(0, len(rows) - 1, min(per_line, len(rows)))] if rows else []
+    offsets = np.arange(-window, window + 1)
+    line_points, cell_points = [], []
+    for x in xs:
+        for y in rows:
+            line_points.append([(x + dx, y) for dx in offsets])
+            cell_points.append([(x - spacing / 2, y), (x + spacing / 2, y)])
+    return np.array(line_points, np.float64).reshape(-1, len(offsets), 2), np.array(cell_points, np.float64).reshape(-1, 2, 2)
+
+
+class GridCalibration:
+    """
+    Homography and grid calibration of one camera view, reusable for later
+    frames of the same fixed station.
+
+    verify() checks a new frame against it without unwarping or searching
+    lines: sample points on the known grid lines (and the cell centres next
+    to them) are mapped back into the original frame once, so a check only
+    gathers a few thousand pixels. A sample passes when the contrast between
+    line and cells is at least *min_ratio* of its contrast in the frame the
+    grid was calibrated on; samples that were covered then are not used. The
+    grid is confirmed when *min_fraction* of the samples of either axis pass,
+    so lines covered by a piece are tolerated. A grid moved by exactly one
+    cell cannot be told apart (and measures the same).
+    """
+
+    def __init__(self, frame: np.ndarray, homography: np.ndarray, size: Tuple[int, int],
+                 px_per_cm: float, px_per_cm_x: float, px_per_cm_y: float, xs: List[int], ys: List[int],
+                 per_line: int = 16, window: int = 2, min_contrast: float = 10.0):
+        self.homography = homography
+        self.size = size
+        self.px_per_cm, self.px_per_cm_x, self.px_per_cm_y = px_per_cm, px_per_cm_x, px_per_cm_y
+        self.xs, self.ys = xs, ys
+        self.frame_shape = frame.shape
+        inverse = np.linalg.inv(homography)
+        height, width = frame.shape[:2]
+        self._samples = []
+        for along, across, spacing, swap in ((xs, ys, px_per_cm_x, False), (ys, xs, px_per_cm_y, True)):
+            line, cell = _grid_sample_points(along, across, spacing, per_line, window)
+            if swap:  # horizontal lines: sampled like vertical ones with x and y exchanged
+                line, cell = line[..., ::-1], cell[..., ::-1]
+            points = np.concatenate([line, cell], axis=1)
+            if not len(points):
+                self._samples.append((np.zeros((0, points.shape[1]), np.int64), np.zeros(0, np.float32)))
+                continue
+            mapped = cv2.perspectiveTransform(points.reshape(-1, 1, 2), inverse).reshape(points.shape)
+            mapped = np.rint(mapped).astype(np.int64)
+            inside = ((mapped[..., 0] >= 0) & (mapped[..., 0] < width)
+                      & (mapped[..., 1] >= 0) & (mapped[..., 1] < height)).all(axis=1)
+            indices = mapped[inside, :, 1] * width + mapped[inside, :, 0]
+            reference = self._contrast(frame, indices, 2 * window + 1)
+            keep = reference >= min_contrast
+            self._samples.append((indices[keep], reference[keep]))
+        self._window = 2 * window + 1
+
+    @staticmethod
+    def _contrast(frame: np.ndarray, indices: np.ndarray, line_width: int) -> np.ndarray:
+        pixels = frame.reshape(-1, frame.shape[2] if frame.ndim == 3 else 1)
+        values = pixels[indices].sum(axis=-1, dtype=np.float32) / pixels.shape[1]
+        line, cells = values[:, :line_width], values[:, line_width:].mean(axis=1, keepdims=True)
+        return np.abs(line - cells).max(axis=1)
+
+    @property
+    def samples(self) -> int:
+        return sum(len(indices) for indices, _ in self._samples)
+
+    def verify(self, frame: np.ndarray, min_fraction: float = 0.6, min_ratio: float = 0.5) -> Tuple[bool, float]:
+        """
+        Whether the grid still lies where it was calibrated in *frame* (BGR or gray).
+
+        Returns:
+            (confirmed, fraction of passing samples on the weaker axis)
+        """
+        if frame.shape != self.frame_shape:
+            return False, 0.0
+        fractions = []
+        for indices, reference in self._samples:
+            if not len(indices):
+                return False, 0.0
+            contrast = self._contrast(frame, indices, self._window)
+            fractions.append(float(np.mean(contrast >= min_ratio * reference)))
+        fraction = min(fractions)
+        return fraction >= min_fraction, fraction
@@ -0,0 +1,65 @@
+"""
+One-time probe of the optional measurement backends.
+
+Deciding between the real and the mock measurement path used to import
+OpenCV, NumPy and ultralytics (and with it PyTorch) on every call, which
+costs seconds on a cold start before anything is measured. The probe only
+looks the modules up (importlib.util.find_spec) and reads their installed
+versions, without importing them; the heavy modules are imported where they
+are used, on the first measurement. A module that is installed but fails to
+import surfaces as an error of that measurement.
+
+The result is cached for the life of the process and shown on ``/health``.
+"""
+
+import importlib.metadata
+import importlib.util
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Backend name -> (module, distributions that may provide it)
+BACKENDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "opencv": ("cv2", ("opencv-python-headless", "opencv-python", "opencv-contrib-python-headless", "opencv-contrib-python")),
+    "numpy": ("numpy", ("numpy",)),
+    "ultralytics": ("ultralytics", ("ultralytics",)),
+    "torch": ("torch", ("torch",)),
+}
+
+# Needed for the real (non-mock) measurement path
+REQUIRED = ("opencv", "numpy", "ultralytics")
+
+
+def _version(distributions: Tuple[str, ...]) -> Optional[str]:
+    for distribution in distributions:
+        try:
+            return importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=None)
+def probe() -> Dict:
+    """
+    Which backends are installed, e.g.
+    ``{"backends": {"opencv": {"available": True, "version": "4.11.0"}, ...}, "ml_available": True, "probe_ms": 1.2}``.
+    """
+    start = time.perf_counter()
+    backends = {}
+    for name, (module, distributions) in BACKENDS.items():
+        try:
+            available = importlib.util.find_spec(module) is not None
+        except (ImportError, ValueError):
+            available = False
+        backends[name] = {"available": available, "version": _version(distributions) if available else None}
+    return {
+        "backends": backends,
+        "ml_available": all(backends[name]["available"] for name in REQUIRED),
+        "probe_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def ml_dependencies_available() -> bool:
+    """True when OpenCV, NumPy and ultralytics are installed."""
+    return probe()["ml_available"]
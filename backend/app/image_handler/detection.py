@@ -0,0 +1,384 @@
+"""
+YOLO detection for the in-memory measurement engine.
+
+The measurement scripts load their YOLO weights on every run; here each model
+is loaded once per process and reused. Model selection and confidence
+thresholds match the scripts:
+- "bottom" (Main2Bottom.py / Main4High.py): runs/detect/train2, conf 0.25
+- "side" (Main7BottomWidthBETTER.py): runs/detect/train5, conf 0.20
+
+Unlike the scripts, which analyse every returned box, detections are gated
+before any per-box work: optional class filter, a minimum area in cm² of the
+calibrated grid and a top-k cut by area or confidence (DETECTION_* settings).
+
+The models were trained at 640 px, so a large warped image is shrunk a lot
+before inference and small pieces get lost. With DETECTION_TILE_SIZE set,
+the image is cut into overlapping tiles of that size which go through the
+model in batches (so the forward passes use all cores), and the boxes of
+all tiles are merged back: overlapping boxes of the same class become one
+enclosing box, which also joins the halves of a piece cut by a tile edge.
+
+Run on an original (not unwarped) frame, the boxes are mapped through the
+homography and then refit: the enclosing box of a mapped detection takes in
+background wedges, so the detector runs again on each box's unwarped crop.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from ..config import Config
+
+SCRIPT_DIR = Path(__file__).parent.parent / "scripts "
+
+MODEL_PATHS = {
+    "bottom": os.getenv("YOLO_BOTTOM_MODEL", str(SCRIPT_DIR / "runs" / "detect" / "train2" / "weights" / "best.pt")),
+    "side": os.getenv("YOLO_SIDE_MODEL", str(SCRIPT_DIR / "runs" / "detect" / "train5" / "weights" / "best.pt")),
+}
+MODEL_CONFIDENCE = {"bottom": 0.25, "side": 0.20}
+
+# Context around a mapped box for its refit: this fraction of the box size plus a margin in pixels
+REFIT_PADDING = 0.1
+REFIT_MARGIN = 8
+
+_models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+# An ultralytics model keeps its predictor (args, source, batch) on the instance: one call at a time per view
+_inference_locks: Dict[str, threading.Lock] = {view: threading.Lock() for view in MODEL_PATHS}
+
+
+class Box(NamedTuple):
+    """One detection in pixel coordinates of the image it was run on."""
+
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    confidence: float
+    class_id: int
+
+    @property
+    def area(self) -> int:
+        return (self.x2 - self.x1) * (self.y2 - self.y1)
+
+
+@dataclass(frozen=True)
+class DetectionGate:
+    """
+    Which detections are worth measuring.
+
+    Args:
+        classes: Class ids to keep (None keeps all)
+        min_area_cm2: Smallest plausible piece footprint in cm² (0 disables)
+        top_k: Keep at most this many boxes (0 keeps all)
+        rank_by: "area" or "confidence", the criterion for the top-k cut
+    """
+
+    classes: Optional[FrozenSet[int]] = None
+    min_area_cm2: float = 0.0
+    top_k: int = 0
+    rank_by: str = "area"
+
+    @classmethod
+    def from_config(cls, config=Config) -> "DetectionGate":
+        classes = config.DETECTION_CLASSES
+        return cls(
+            classes=frozenset(classes) if classes else None,
+            min_area_cm2=config.DETECTION_MIN_AREA_CM2,
+            top_k=config.DETECTION_TOP_K,
+            rank_by=config.DETECTION_RANK_BY,
+        )
+
+
+@dataclass(frozen=True)
+class Tiling:
+    """
+    Tiled inference settings.
+
+    Args:
+        size: Tile edge in pixels (0 runs the model on the whole image)
+        overlap: Fraction of a tile shared with its neighbour
+        batch: Tiles per forward pass
+        merge_threshold: Share of the smaller box that must overlap another
+            box of the same class for the two to be merged
+    """
+
+    size: int = 0
+    overlap: float = 0.2
+    batch: int = 8
+    merge_threshold: float = 0.5
+
+    @classmethod
+    def from_config(cls, config=Config) -> "Tiling":
+        return cls(
+            size=config.DETECTION_TILE_SIZE,
+            overlap=config.DETECTION_TILE_OVERLAP,
+            batch=config.DETECTION_TILE_BATCH,
+            merge_threshold=config.DETECTION_TILE_MERGE_THRESHOLD,
+        )
+
+    def applies_to(self, width: int, height: int) -> bool:
+        """Whether an image of this size is split at all."""
+        return self.size > 0 and (width > self.size or height > self.size)
+
+
+def tile_windows(width: int, height: int, size: int, overlap: float) -> List[Tuple[int, int]]:
+    """Top-left corners of *size* x *size* tiles covering the image, row by row."""
+
+    def starts(length: int) -> List[int]:
+        if length <= size:
+            return [0]
+        stride = max(1, int(size * (1 - overlap)))
+        # The last tile is aligned with the image edge instead of sticking out
+        return list(range(0, length - size, stride)) + [length - size]
+
+    return [(x, y) for y in starts(height) for x in starts(width)]
+
+
+def merge_tiled_boxes(xyxy, confidence, class_ids, threshold: float):
+    """
+    Greedily merge the detections of overlapping tiles.
+
+    Going from the most confident box down, every remaining box of the same
+    class whose intersection with it covers at least *threshold* of the
+    smaller of the two is folded into it (enclosing box, the higher
+    confidence). Intersection over the smaller box rather than IoU, so that
+    a piece cut in two by a tile edge is joined rather than kept twice.
+
+    Returns:
+        (xyxy, confidence, class_ids) of the merged boxes
+    """
+    import numpy as np
+
+    order = np.argsort(-np.asarray(confidence, dtype=np.float64), kind="stable")
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)[order]
+    confidence = np.asarray(confidence, dtype=np.float64)[order]
+    class_ids = np.asarray(class_ids).reshape(-1)[order]
+    areas = np.maximum((xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1]), 1e-9)
+
+    pending = np.ones(len(xyxy), dtype=bool)
+    kept, boxes = [], []
+    for i in range(len(xyxy)):
+        if not pending[i]:
+            continue
+        pending[i] = False
+        box = xyxy[i].copy()
+        # Repeat against the grown box: a piece spanning several tiles comes in several parts
+        while True:
+            others = np.flatnonzero(pending & (class_ids == class_ids[i]))
+            if not len(others):
+                break
+            width = np.minimum(xyxy[others, 2], box[2]) - np.maximum(xyxy[others, 0], box[0])
+            height = np.minimum(xyxy[others, 3], box[3]) - np.maximum(xyxy[others, 1], box[1])
+            box_area = (box[2] - box[0]) * (box[3] - box[1])
+            overlap = np.clip(width, 0, None) * np.clip(height, 0, None) / np.minimum(areas[others], box_area)
+            merged = others[overlap >= threshold]
+            if not len(merged):
+                break
+            pending[merged] = False
+            box[:2] = np.minimum(box[:2], xyxy[merged, :2].min(axis=0))
+            box[2:] = np.maximum(box[2:], xyxy[merged, 2:].max(axis=0))
+        kept.append(i)
+        boxes.append(box)
+    return np.array(boxes).reshape(-1, 4), confidence[kept], class_ids[kept]
+
+
+def gate_boxes(xyxy, confidence, class_ids, gate: DetectionGate, px_per_cm: Optional[float] = None) -> List[Box]:
+    """
+    Apply *gate* to arrays of detections in one vectorized pass.
+
+    Args:
+        xyxy: (N, 4) box corners in pixels
+        confidence: (N,) confidences
+        class_ids: (N,) class ids
+        gate: Gating rules
+        px_per_cm: Grid scale; required for the minimum area, ignored without it
+
+    Returns:
+        The kept boxes sorted by area, largest first
+    """
+    import numpy as np
+
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4).astype(np.int64)
+    confidence = np.asarray(confidence, dtype=np.float64).reshape(-1)
+    class_ids = np.asarray(class_ids).reshape(-1).astype(np.int64)
+    areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+
+    keep = areas > 0
+    if gate.classes is not None:
+        keep &= np.isin(class_ids, list(gate.classes))
+    if gate.min_area_cm2 and px_per_cm:
+        keep &= areas >= gate.min_area_cm2 * px_per_cm ** 2
+    indices = np.flatnonzero(keep)
+
+    if gate.top_k and len(indices) > gate.top_k:
+        score = confidence if gate.rank_by == "confidence" else areas
+        indices = indices[np.argsort(-score[indices], kind="stable")[: gate.top_k]]
+    # Measure in the scripts' order: largest first
+    indices = indices[np.argsort(-areas[indices], kind="stable")]
+    return [
+        Box(int(x1), int(y1), int(x2), int(y2), float(confidence[i]), int(class_ids[i]))
+        for i, (x1, y1, x2, y2) in zip(indices, xyxy[indices])
+    ]
+
+
+def refit_mapped_boxes(view: str, image, homography, xyxy, confidence, class_ids, size: Tuple[int, int], **kwargs):
+    """
+    Tighten boxes mapped from an original frame by detecting again on their unwarped crops.
+
+    Each box is padded, its region unwarped (calibration.warp_region) and the
+    detection on the crop overlapping it most (IoU) replaces it, which is the
+    box a detection on the fully unwarped frame finds. Boxes whose crop has
+    no overlapping detection stay as mapped; boxes refit to the same
+    detection are kept once.
+
+    Args:
+        view: "bottom" or "side"
+        image: Original BGR frame
+        homography: Its unwarping transform
+        xyxy, confidence, class_ids: Mapped detections
+        size: (width, height) of the unwarped image
+        kwargs: Detector arguments
+
+    Returns:
+        (xyxy, confidence, class_ids) in unwarped image coordinates
+    """
+    import numpy as np
+
+    from .calibration import warp_region
+
+    xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4).copy()
+    confidence = np.asarray(confidence, dtype=np.float64).reshape(-1).copy()
+    class_ids = np.asarray(class_ids).reshape(-1).copy()
+    width, height = size
+    for i, box in enumerate(xyxy):
+        pad_x = (box[2] - box[0]) * REFIT_PADDING + REFIT_MARGIN
+        pad_y = (box[3] - box[1]) * REFIT_PADDING + REFIT_MARGIN
+        x1, y1 = int(max(0, box[0] - pad_x)), int(max(0, box[1] - pad_y))
+        x2, y2 = int(min(width, np.ceil(box[2] + pad_x))), int(min(height, np.ceil(box[3] + pad_y)))
+        if x2 <= x1 or y2 <= y1:
+            continue
+        result = predict(view, warp_region(image, homography, (x1, y1, x2, y2)), **kwargs)[0]
+        found = result.boxes.xyxy.cpu().numpy().reshape(-1, 4) + (x1, y1, x1, y1)
+        if not len(found):
+            continue
+        overlap_w = np.minimum(found[:, 2], box[2]) - np.maximum(found[:, 0], box[0])
+        overlap_h = np.minimum(found[:, 3], box[3]) - np.maximum(found[:, 1], box[1])
+        intersection = np.clip(overlap_w, 0, None) * np.clip(overlap_h, 0, None)
+        union = (found[:, 2] - found[:, 0]) * (found[:, 3] - found[:, 1]) + (box[2] - box[0]) * (box[3] - box[1])
+        iou = intersection / np.maximum(union - intersection, 1e-9)
+        best = int(np.argmax(iou))
+        if iou[best] <= 0:
+            continue
+        xyxy[i] = found[best]
+        confidence[i] = float(result.boxes.conf.cpu().numpy().reshape(-1)[best])
+        class_ids[i] = result.boxes.cls.cpu().numpy().reshape(-1)[best]
+    _, first = np.unique(xyxy, axis=0, return_index=True)
+    kept = np.sort(first)
+    return xyxy[kept], confidence[kept], class_ids[kept]
+
+
+def get_model(view: str):
+    """
+    Return the cached YOLO model for *view* ("bottom" or "side"), loading it on first use.
+
+    Raises:
+        FileNotFoundError: If the weights file does not exist
+    """
+    model = _models.get(view)
+    if model is not None:
+        return model
+    with _models_lock:
+        if view not in _models:
+            model_path = MODEL_PATHS[view]
+            if not os.path.isfile(model_path):
+                raise FileNotFoundError(f"Modell nicht gefunden: {model_path}")
+            from ultralytics import YOLO
+
+            _models[view] = YOLO(model_path)
+        return _models[view]
+
+
+def predict(view: str, source, **kwargs):
+    """
+    Run the cached model of *view* on *source* (image or list of images).
+
+    The model is shared by every thread of the process (capture routes,
+    measurement jobs, conveyor station) but its predictor is not thread-safe,
+    so calls are serialized per view.
+    """
+    model = get_model(view)
+    with _inference_locks[view]:
+        return model(source, **kwargs)
+
+
+def detect(
+    image,
+    view: str,
+    gate: Optional[DetectionGate] = None,
+    px_per_cm: Optional[float] = None,
+    tiling: Optional[Tiling] = None,
+    homography=None,
+    warped_size: Optional[Tuple[int, int]] = None,
+) -> List[Box]:
+    """
+    Run the view's detector on *image* (whole or in tiles) and gate the detections.
+
+    Args:
+        image: Warped BGR image
+        view: "bottom" or "side"
+        gate: Gating rules (default: keep everything)
+        px_per_cm: Grid scale of *image*, used for the minimum area
+        tiling: Tiled inference settings (default: whole image)
+        homography: For an original (not unwarped) frame: its unwarping
+            transform; boxes are mapped through it and refit on their
+            unwarped crops (refit_mapped_boxes) before gating
+        warped_size: (width, height) of the unwarped image, to clip mapped boxes
+
+    Returns:
+        Boxes sorted by area, largest first (the order the scripts measure in),
+        in unwarped image coordinates
+    """
+    import numpy as np
+
+    gate = gate or DetectionGate()
+    tiling = tiling or Tiling()
+    kwargs = {"conf": MODEL_CONFIDENCE[view], "verbose": False}
+    if gate.classes is not None:
+        # Let NMS drop other classes instead of filtering afterwards
+        kwargs["classes"] = sorted(gate.classes)
+
+    height, width = image.shape[:2]
+    tiled = tiling.applies_to(width, height)
+    if tiled:
+        offsets = tile_windows(width, height, tiling.size, tiling.overlap)
+        tiles = [np.ascontiguousarray(image[y : y + tiling.size, x : x + tiling.size]) for x, y in offsets]
+        results = []
+        for start in range(0, len(tiles), max(1, tiling.batch)):
+            results.extend(predict(view, tiles[start : start + max(1, tiling.batch)], imgsz=tiling.size, **kwargs))
+    else:
+        offsets = [(0, 0)]
+        results = predict(view, image, **kwargs)
+
+    xyxy, confidence, class_ids = [], [], []
+    for (x, y), result in zip(offsets, results):
+        # One device-to-host copy per result instead of one per box
+        xyxy.append(result.boxes.xyxy.cpu().numpy() + (x, y, x, y))
+        confidence.append(result.boxes.conf.cpu().numpy())
+        class_ids.append(result.boxes.cls.cpu().numpy())
+    if not xyxy:
+        return []
+    xyxy, confidence, class_ids = np.concatenate(xyxy), np.concatenate(confidence), np.concatenate(class_ids)
+    if tiled:
+        xyxy, confidence, class_ids = merge_tiled_boxes(xyxy, confidence, class_ids, tiling.merge_threshold)
+    if homography is not None:
+        from .calibration import map_boxes
+
+        warped_size = warped_size or (width, height)
+        xyxy = map_boxes(xyxy, homography, warped_size)
+        xyxy, confidence, class_ids = refit_mapped_boxes(
+            view, image, homography, xyxy, confidence, class_ids, warped_size, **kwargs
+        )
+    return gate_boxes(xyxy, confidence, class_ids, gate, px_per_cm)
@@ -0,0 +1,296 @@
+"""
+In-memory measurement engine.
+
+Measures a piece from the two camera frames without temp files or script
+subprocesses and returns the same dictionary as process_images():
+- bottom view: grid calibration and detection run once and are shared by the
+  width (Main2Bottom.py) and height (Main4High.py) measurements
+- side view: depth is the bottom-edge width measured by Main7BottomWidthBETTER.py
+
+Every gated detection is measured. Bottom-view pieces (width, height) are
+paired with side-view pieces (depth) by their x position on the calibration
+grid and returned as "objects", largest bottom-view piece first; the
+top-level width/height/depth are those of the first object, which is the
+piece whose values the script output parser picks up. Without the ML
+dependencies the engine returns the same mock values as the script path.
+
+With MEASURE_WARP_REGIONS a frame whose grid calibration is reused is not
+unwarped as a whole: detection runs on the original frame, the boxes are
+mapped through the homography and refit on their unwarped crops, and only the
+boxes being measured are unwarped. A frame that needs a full calibration is
+unwarped for it anyway and is analysed like without the setting.
+
+With CALIBRATION_REUSE every view keeps its last calibration (per process)
+and a new frame reuses it when calibration.GridCalibration verifies the grid
+in place; the full calibration runs when the check fails, the frame size
+changed or the calibration is older than CALIBRATION_REUSE_MAX_AGE.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import Config
+
+from .capabilities import ml_dependencies_available
+from .main import _extract_measurements_from_output, _finalize_measurements, _generate_mock_output
+from .quality import check_image_quality
+
+_DIMENSIONS = ("width", "height", "depth")
+_SCRIPTS = {"width": "Main2Bottom.py", "height": "Main4High.py", "depth": "Main7BottomWidthBETTER.py"}
+_VIEW_DIMENSIONS = {"bottom": ("width", "height"), "side": ("depth",)}
+
+# progress(stage, partial_result), called from the thread running the engine
+Progress = Callable[[str, Dict], None]
+
+# view -> (calibration, time.monotonic() it was made), with CALIBRATION_REUSE
+_grids: Dict[str, Tuple[object, float]] = {}
+_grids_lock = threading.Lock()
+
+
+def _no_progress(stage: str, data: Dict) -> None:
+    pass
+
+
+def _mock_measurements(progress: Progress = _no_progress) -> Dict:
+    measurements = {}
+    for dimension in _DIMENSIONS:
+        output = _generate_mock_output(_SCRIPTS[dimension], "<memory>")
+        value = _extract_measurements_from_output(output, dimension)
+        measurements[f"{dimension}_mm"] = value * 10 if value is not None else None
+        progress("measured", {"dimension": dimension, "value_mm": measurements[f"{dimension}_mm"], "mock": True})
+    measurements = _finalize_measurements(measurements, [])
+    measurements["annotations"] = {}
+    return measurements
+
+
+def _reusable_grid(view: str, image):
+    """The stored calibration of *view* if it is recent and verifies on *image*, else None."""
+    with _grids_lock:
+        calibration, created = _grids.get(view, (None, 0.0))
+    if calibration is None or time.monotonic() - created > Config.CALIBRATION_REUSE_MAX_AGE:
+        return None
+    confirmed, fraction = calibration.verify(image, Config.CALIBRATION_REUSE_MIN_FRACTION)
+    if not confirmed:
+        print(f"Grid of {view} view moved ({fraction:.0%} of line samples confirmed), recalibrating")
+        return None
+    return calibration
+
+
+class ViewAnalysis:
+    """
+    Decoded, unwarped and calibrated camera view plus its detections.
+
+    *progress* receives the "decoded", "calibrated" and "detected" stages of
+    the view with their partial results. With *warp_regions* and a reused
+    grid calibration, ``warped`` stays None and measure() unwarps each box
+    on its own. Boxes and measurements are
+    recorded as drawings in ``annotations`` (see annotate.py), never drawn.
+    """
+
+    def __init__(self, image_bytes: bytes, view: str, progress: Progress = _no_progress,
+                 warp_regions: Optional[bool] = None):
+        import cv2
+
+        from .annotate import primitive
+        from .calibration import GridCalibration, calibrate_grid, compute_homography, decode_image
+        from .detection import DetectionGate, Tiling, detect
+
+        if warp_regions is None:
+            warp_regions = Config.MEASURE_WARP_REGIONS
+        self.view = view
+        image = decode_image(image_bytes)
+        progress("decoded", {"view": view, "width": image.shape[1], "height": image.shape[0]})
+        self.warped = None
+        grid = _reusable_grid(view, image) if Config.CALIBRATION_REUSE else None
+        if grid is not None:
+            self.homography, size = grid.homography, grid.size
+            self.px_per_cm, self.px_per_cm_x, self.px_per_cm_y = grid.px_per_cm, grid.px_per_cm_x, grid.px_per_cm_y
+            self.xs, self.ys = grid.xs, grid.ys
+            if not warp_regions:
+                self.warped = cv2.warpPerspective(image, self.homography, size)
+        else:
+            # Calibrated on the full colour warp: a separately unwarped grayscale copy moves grid lines
+            self.warped, self.homography = compute_homography(image)
+            size = (self.warped.shape[1], self.warped.shape[0])
+            self.px_per_cm, self.px_per_cm_x, self.px_per_cm_y, self.xs, self.ys = calibrate_grid(self.warped)
+            if Config.CALIBRATION_REUSE:
+                calibration = GridCalibration(image, self.homography, size, self.px_per_cm,
+                                              self.px_per_cm_x, self.px_per_cm_y, self.xs, self.ys)
+                with _grids_lock:
+                    _grids[view] = (calibration, time.monotonic())
+        progress("calibrated", {
+            "view": view,
+            "px_per_cm": round(float(self.px_per_cm), 3),
+            "grid_lines": {"x": len(self.xs), "y": len(self.ys)},
+            "reused": grid is not None,
+        })
+        self.size = size
+        self.image = image if self.warped is None else None
+        gate, tiling = DetectionGate.from_config(), Tiling.from_config()
+        if self.warped is None:
+            self.boxes = detect(image, view, gate, self.px_per_cm, tiling, homography=self.homography, warped_size=size)
+        else:
+            self.boxes = detect(self.warped, view, gate, self.px_per_cm, tiling)
+        self.annotations = [primitive("rect", "box", box[:2], box[2:4]) for box in self.boxes]
+        progress("detected", {
+            "view": view,
+            "objects": len(self.boxes),
+            "largest": [round(float(v), 1) for v in self.boxes[0][:4]] if self.boxes else None,
+        })
+
+    def measure(self, dimension: str, index: int = 0) -> Optional[float]:
+        """Measure the *index*-th largest detected object; None when there is no such object."""
+        from .annotate import primitive
+        from .calibration import warp_region
+        from .measure import PROFILES, measure_box
+
+        if index >= len(self.boxes):
+            return None
+        box = self.boxes[index]
+        if self.warped is not None:
+            image, origin = self.warped, (0, 0)
+        else:
+            image, origin = warp_region(self.image, self.homography, box), (box.x1, box.y1)
+        value_cm = measure_box(
+            image, box, self.px_per_cm, self.xs, self.ys, PROFILES[dimension],
+            subpixel=Config.MEASURE_SUBPIXEL_EDGES, origin=origin, annotations=self.annotations,
+        )
+        # One label line per dimension above the box
+        line = _VIEW_DIMENSIONS[self.view].index(dimension)
+        self.annotations.append(primitive("text", "label", (box.x1, box.y1 - 10 - 20 * line),
+                                          text=f"{dimension}: {value_cm:.1f} cm"))
+        return value_cm
+
+    def annotation(self) -> Dict:
+        """The recorded drawings with what is needed to unwarp the source frame for them."""
+        return {
+            "homography": [[float(v) for v in row] for row in self.homography],
+            "size": [int(v) for v in self.size],
+            "primitives": self.annotations,
+        }
+
+    def grid_position(self, index: int) -> Tuple[float, float]:
+        """Centre of the *index*-th box in cm from the first detected grid lines."""
+        box = self.boxes[index]
+        x0 = self.xs[0] if len(self.xs) else 0
+        y0 = self.ys[0] if len(self.ys) else 0
+        return (
+            round(((box.x1 + box.x2) / 2 - x0) / self.px_per_cm, 2),
+            round(((box.y1 + box.y2) / 2 - y0) / self.px_per_cm, 2),
+        )
+
+
+def match_objects(bottom_x: Sequence[float], side_x: Sequence[float], tolerance_cm: float) -> List[Optional[int]]:
+    """
+    Pair bottom-view objects with side-view objects by grid x position.
+
+    Closest pairs are taken first; pairs further apart than *tolerance_cm* stay
+    unmatched. A single object in each view is always paired, which keeps the
+    one-piece case independent of how the two grid origins line up.
+
+    Returns:
+        For every bottom object, the index of its side object or None
+    """
+    if len(bottom_x) == 1 and len(side_x) == 1:
+        return [0]
+    candidates = sorted(
+        (abs(bx - sx), b, s)
+        for b, bx in enumerate(bottom_x)
+        for s, sx in enumerate(side_x)
+        if abs(bx - sx) <= tolerance_cm
+    )
+    matches: List[Optional[int]] = [None] * len(bottom_x)
+    used = set()
+    for _, b, s in candidates:
+        if matches[b] is None and s not in used:
+            matches[b] = s
+            used.add(s)
+    return matches
+
+
+def measure_images(image_bottom: bytes, image_side: bytes, progress: Optional[Progress] = None) -> Dict:
+    """
+    Measure a metal piece from the bottom and side view image bytes.
+
+    Args:
+        image_bottom: Encoded bottom view image (width and height)
+        image_side: Encoded side view image (depth)
+        progress: Optional callback receiving each completed stage
+            ("quality", "decoded", "calibrated", "detected" per view,
+            "measured" per dimension) with its partial result; the bottom view is measured before the side
+            view is analysed, so width and height are reported early
+
+    Returns:
+        Dictionary with the same keys as process_images(), plus "annotations":
+        the drawings of every analysed view (annotate.py)
+    """
+    progress = progress or _no_progress
+    if not ml_dependencies_available():
+        print("Warning: ML dependencies not available, using mock measurements")
+        return _mock_measurements(progress)
+
+    errors = []
+    values: Dict[str, List[Dict]] = {"bottom": [], "side": []}  # per view: one dict per detected object
+    annotations: Dict[str, Dict] = {}
+    for view, data in (("bottom", image_bottom), ("side", image_side)):
+        # Always report the scores (a few ms); reject only when the gate is enforced
+        quality = check_image_quality(data)
+        progress("quality", {"view": view, "enforced": Config.QUALITY_GATE_ENABLED, **quality.to_dict()})
+        if Config.QUALITY_GATE_ENABLED and not quality.ok:
+            errors.append(f"{view.capitalize()} image rejected ({quality.code}): {quality.message}")
+            continue
+        try:
+            analysis = ViewAnalysis(data, view, progress)
+        except Exception as e:
+            errors.append(f"{view.capitalize()} image analysis failed: {str(e)}")
+            continue
+
+        if not analysis.boxes:
+            for dimension in _VIEW_DIMENSIONS[view]:
+                errors.append(f"Failed to extract {dimension} measurement: no object detected in {view} image")
+            continue
+
+        for index in range(len(analysis.boxes)):
+            piece = {"position_cm": analysis.grid_position(index)}
+            for dimension in _VIEW_DIMENSIONS[view]:
+                label = dimension.capitalize() + (f" (object {index + 1})" if index else "")
+                try:
+                    value_cm = analysis.measure(dimension, index)
+                except Exception as e:
+                    errors.append(f"{label} measurement failed: {str(e)}")
+                    value_cm = None
+                piece[f"{dimension}_mm"] = value_cm * 10 if value_cm is not None else None  # Convert cm to mm
+                if value_cm is not None:
+                    print(f"✓ {label} measured: {value_cm} cm")
+                    progress("measured", {"dimension": dimension, "value_mm": piece[f"{dimension}_mm"], "object": index + 1})
+            values[view].append(piece)
+        annotations[view] = analysis.annotation()
+
+    bottom, side = values["bottom"], values["side"]
+    matches = match_objects(
+        [piece["position_cm"][0] for piece in bottom],
+        [piece["position_cm"][0] for piece in side],
+        Config.MULTI_OBJECT_MATCH_TOLERANCE_CM,
+    )
+    objects = []
+    for piece, match in zip(bottom, matches):
+        objects.append({
+            "width_mm": piece["width_mm"],
+            "height_mm": piece["height_mm"],
+            "depth_mm": side[match]["depth_mm"] if match is not None else None,
+            "position_cm": piece["position_cm"],
+        })
+    unmatched = len(side) - sum(match is not None for match in matches)
+    if bottom and side and (unmatched or None in matches):
+        errors.append(
+            f"Could not pair all objects: {len(bottom)} in bottom image, {len(side)} in side image"
+        )
+
+    if objects:
+        measurements = {key: objects[0][key] for key in ("width_mm", "height_mm", "depth_mm")}
+    else:
+        measurements = {"width_mm": None, "height_mm": None, "depth_mm": side[0]["depth_mm"] if side else None}
+    measurements = _finalize_measurements(measurements, errors, objects)
+    measurements["annotations"] = annotations
+    return measurements
@@ -13,7 +13,9 @@ import subprocess
 import re
 import tempfile
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+from .capabilities import ml_dependencies_available
 
 
 SCRIPT_DIR = Path(__file__).parent.parent / "scripts "
@@ -38,29 +40,23 @@ def _run_script(script_name: str, image_path: str) -> str:
     if not script_path.exists():
         raise FileNotFoundError(f"Script not found: {script_path}")
     
-    # Check if ML dependencies are available
-    try:
-        import cv2
-        import numpy as np
-        from ultralytics import YOLO
-        
-        # Dependencies available - run real script
-        result = subprocess.run([
-            "python",
-            str(script_path),
-            image_path,
-        ], cwd=str(SCRIPT_DIR), capture_output=True, text=True, timeout=120)
-        
-        if result.returncode != 0:
-            raise RuntimeError(f"Script {script_name} failed: {result.stderr}")
-        
-        return result.stdout
-        
-    except ImportError:
+    # Probed once per process (capabilities.py); the script imports the ML modules itself
+    if not ml_dependencies_available():
         # ML dependencies not available - return mock output for development
         print(f"Warning: ML dependencies not available, using mock output for {script_name}")
         return _generate_mock_output(script_name, image_path)
 
+    result = subprocess.run([
+        "python",
+        str(script_path),
+        image_path,
+    ], cwd=str(SCRIPT_DIR), capture_output=True, text=True, timeout=120)
+    
+    if result.returncode != 0:
+        raise RuntimeError(f"Script {script_name} failed: {result.stderr}")
+    
+    return result.stdout
+
 
 def _generate_mock_output(script_name: str, image_path: str) -> str:
     """
@@ -259,18 +255,41 @@ def process_images(image_bottom_path: str, image_side_path: str) -> Dict:
         errors.append(f"Depth measurement failed: {str(e)}")
         measurements["depth_mm"] = None
     
-    # Calculate volume and weight if all measurements are available
-    if all(measurements[key] is not None for key in ["width_mm", "height_mm", "depth_mm"]):
-        volume_mm3 = measurements["width_mm"] * measurements["height_mm"] * measurements["depth_mm"]
-        measurements["volume_mm3"] = volume_mm3
+    return _finalize_measurements(measurements, errors)
+
+
+def _add_volume_and_weight(piece: Dict) -> Dict:
+    """Set volume_mm3 and calculated_weight_kg of one piece (None unless all three dimensions are known)."""
+    if all(piece.get(key) is not None for key in ["width_mm", "height_mm", "depth_mm"]):
+        volume_mm3 = piece["width_mm"] * piece["height_mm"] * piece["depth_mm"]
+        piece["volume_mm3"] = volume_mm3
         
         # Assume steel density for weight calculation (7.85 g/cm³)
         volume_cm3 = volume_mm3 / 1000
         weight_g = volume_cm3 * 7.85
-        measurements["calculated_weight_kg"] = weight_g / 1000
+        piece["calculated_weight_kg"] = weight_g / 1000
     else:
-        measurements["volume_mm3"] = None
-        measurements["calculated_weight_kg"] = None
+        piece["volume_mm3"] = None
+        piece["calculated_weight_kg"] = None
+    return piece
+
+
+def _finalize_measurements(measurements: Dict, errors: list, objects: Optional[List[Dict]] = None) -> Dict:
+    """
+    Add volume, weight and status fields to width/height/depth measurements.
+    
+    Args:
+        measurements: Dictionary with width_mm, height_mm and depth_mm (None if missing)
+        errors: Error messages collected while measuring
+        objects: Every measured piece (same keys); defaults to the single piece in *measurements*
+        
+    Returns:
+        The completed measurements dictionary; "objects" lists all pieces
+    """
+    _add_volume_and_weight(measurements)
+    if objects is None:
+        objects = [{key: measurements[key] for key in ["width_mm", "height_mm", "depth_mm"]}]
+    measurements["objects"] = [_add_volume_and_weight(piece) for piece in objects]
     
     # Add metadata
     measurements["errors"] = errors
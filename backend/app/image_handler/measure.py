@@ -0,0 +1,313 @@
+"""
+Per-object edge measurements for the in-memory measurement engine.
+
+The three measurement scripts share one algorithm and differ only in
+constants (reference sizes, angle correction, axis weights, Canny thresholds
+and empirical correction tables). Those constants are captured in one
+MeasureProfile per script so a single implementation reproduces all three:
+- "width":  Main2Bottom.py, bottom view, bottom-edge width
+- "height": Main4High.py, bottom view, object height
+- "depth":  Main7BottomWidthBETTER.py, side view, bottom-edge width
+
+The scripts filter and split the contours of the edge map one by one in
+Python loops, which gets slow on glare-heavy metal with thousands of small
+contours. Here all contour points are handled in one array pass (contour
+areas, lower halves and extremes), with the same result (up to which of the
+points on the row splitting a contour in half are taken, which the scripts'
+unstable argsort leaves arbitrary as well). With subpixel=True
+the extreme edges are refined to fractions of a pixel from the gradient
+profile across them.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .annotate import primitive, shift
+
+KNOWN_GRID_SIZE_CM = 1.0
+
+# (low, high, value): inclusive ranges evaluated in order, first match wins
+Ranges = Tuple[Tuple[float, float, float], ...]
+
+
+@dataclass(frozen=True)
+class MeasureProfile:
+    """Constants of one measurement script."""
+
+    script: str
+    view: str  # "bottom" or "side"
+    kind: str  # "bottom_width" or "height"
+    reference_sizes: Ranges
+    square_aspect: Tuple[float, float]
+    tall_correction: Tuple[float, float]  # (pivot, gain): 1 + (pivot - aspect) * gain
+    wide_correction: Tuple[float, float]  # (pivot, gain): 1 - (aspect - pivot) * gain
+    dominant_axis_weight: float
+    canny_low: Tuple[int, ...]
+    canny_high: Tuple[int, ...]
+    min_contour_area: float
+    corrections: Ranges
+
+
+PROFILES = {
+    "width": MeasureProfile(
+        script="Main2Bottom.py",
+        view="bottom",
+        kind="bottom_width",
+        reference_sizes=((4.8, 5.2, 5.0),),
+        square_aspect=(0.8, 1.2),
+        tall_correction=(1.0, 0.2),
+        wide_correction=(1.0, 0.1),
+        dominant_axis_weight=0.7,
+        canny_low=(20, 40, 60),
+        canny_high=(80, 120, 160),
+        min_contour_area=10,
+        corrections=((0.85, 0.95, 1.04), (1.1, 1.2, 0.98)),
+    ),
+    "height": MeasureProfile(
+        script="Main4High.py",
+        view="bottom",
+        kind="height",
+        reference_sizes=((4.8, 5.2, 5.0), (7.2, 7.8, 7.5)),
+        square_aspect=(0.8, 1.2),
+        tall_correction=(1.0, 0.2),
+        wide_correction=(1.0, 0.1),
+        dominant_axis_weight=0.7,
+        canny_low=(20, 40, 60),
+        canny_high=(80, 120, 160),
+        min_contour_area=20,
+        corrections=((0.85, 0.95, 1.05), (1.1, 1.2, 1.02)),
+    ),
+    "depth": MeasureProfile(
+        script="Main7BottomWidthBETTER.py",
+        view="side",
+        kind="bottom_width",
+        reference_sizes=((2.9, 3.2, 3.0), (4.8, 5.2, 5.0), (5.5, 6.0, 5.8)),
+        square_aspect=(0.85, 1.1),
+        tall_correction=(0.85, 0.25),
+        wide_correction=(1.1, 0.1),
+        dominant_axis_weight=0.65,
+        canny_low=(15, 30, 45),
+        canny_high=(60, 100, 140),
+        min_contour_area=10,
+        corrections=((0.85, 0.95, 1.05), (0.95, 1.05, 1.02), (1.05, 1.2, 0.98)),
+    ),
+}
+
+
+def _first_match(value: float, ranges: Ranges) -> Optional[float]:
+    for low, high, result in ranges:
+        if low <= value <= high:
+            return result
+    return None
+
+
+def reference_size(dim_px: float, px_per_cm: float, profile: MeasureProfile,
+                   min_dim: float = 2.0, max_dim: float = 10.0) -> float:
+    """Snap an object dimension to a plausible reference size in cm."""
+    estimated = dim_px / px_per_cm
+    snapped = _first_match(estimated, profile.reference_sizes)
+    if snapped is not None:
+        return snapped
+    if min_dim <= estimated <= max_dim:
+        return round(estimated * 2) / 2
+    return 5.0
+
+
+def corrected_scale(box: Sequence[int], px_per_cm: float, xs: List[int], ys: List[int],
+                    profile: MeasureProfile) -> Tuple[float, float]:
+    """
+    Per-object px/cm from the reference size, angle correction and grid line counts.
+
+    Returns:
+        (corrected px/cm, box aspect ratio)
+    """
+    x1, y1, x2, y2 = box[:4]
+    width_px = x2 - x1
+    height_px = y2 - y1
+    grid_lines_x = len([x for x in xs if x1 < x < x2])
+    grid_lines_y = len([y for y in ys if y1 < y < y2])
+
+    aspect_ratio = width_px / height_px
+    square_low, square_high = profile.square_aspect
+    if square_low <= aspect_ratio <= square_high:
+        angle_correction = 1.0
+    elif aspect_ratio < square_low:
+        pivot, gain = profile.tall_correction
+        angle_correction = 1.0 + (pivot - aspect_ratio) * gain
+    else:
+        pivot, gain = profile.wide_correction
+        angle_correction = 1.0 - (aspect_ratio - pivot) * gain
+
+    scale_x = (width_px / reference_size(width_px, px_per_cm, profile)) * angle_correction
+    scale_y = (height_px / reference_size(height_px, px_per_cm, profile)) * angle_correction
+    weight = profile.dominant_axis_weight
+    weight_x, weight_y = (weight, 1 - weight) if grid_lines_x > grid_lines_y else (1 - weight, weight)
+    return scale_x * weight_x + scale_y * weight_y, aspect_ratio
+
+
+def _edge_map(roi: np.ndarray, profile: MeasureProfile, kernel: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (filtered gray ROI, closed multi-threshold Canny edges)."""
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+    enhanced = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(gray)
+    filtered = cv2.bilateralFilter(enhanced, 9, 75, 75)
+    edges = np.zeros_like(filtered)
+    for low in profile.canny_low:
+        for high in profile.canny_high:
+            edges = cv2.bitwise_or(edges, cv2.Canny(filtered, low, high))
+    return filtered, cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+
+
+def _contour_points(edges: np.ndarray, min_area: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Points of the significant external contours of *edges*, in one array.
+
+    Contour areas come from the shoelace formula over all points at once
+    (what cv2.contourArea computes per contour); contours of at most
+    *min_area* are dropped unless none is larger, as in the scripts.
+
+    Returns:
+        (points, contour, starts): (N, 2) x/y points, the index of the
+        contour each point belongs to, and the first point of every contour
+    """
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    if not contours:
+        empty = np.zeros(0, dtype=np.intp)
+        return np.zeros((0, 2), dtype=np.int32), empty, empty
+    lengths = np.fromiter((len(cnt) for cnt in contours), dtype=np.intp, count=len(contours))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    points = np.concatenate(contours).reshape(-1, 2)
+    contour = np.repeat(np.arange(len(contours)), lengths)
+
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts  # close every contour
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    areas = np.abs(np.add.reduceat(x * y[following] - x[following] * y, starts)) / 2
+    significant = areas > min_area
+    if not significant.any():
+        return points, contour, starts
+    keep = significant[contour]
+    # Renumber the remaining contours 0..k-1
+    lengths = lengths[significant]
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return points[keep], np.repeat(np.arange(len(lengths)), lengths), starts
+
+
+def _lower_halves(points: np.ndarray, contour: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """The lower half (by y) of every contour's points, as the scripts select them."""
+    # Sorted by (contour, y), a point's rank within its contour is its offset from the contour start
+    order = np.lexsort((points[:, 1], contour))
+    rank = np.arange(len(order)) - starts[contour[order]]
+    lengths = np.diff(np.append(starts, len(points)))
+    return points[order[rank >= lengths[contour[order]] // 2]]
+
+
+def _subpixel_peak(gradient: np.ndarray, index: int) -> float:
+    """
+    Position of the gradient maximum next to pixel *index*, to a fraction of a pixel.
+
+    The strongest of *index* and its neighbours is refined by fitting a
+    parabola through it and its two neighbours; *index* is kept unchanged
+    at the profile ends or without a clear maximum.
+    """
+    low, high = max(index - 1, 1), min(index + 1, len(gradient) - 2)
+    if low > high:
+        return float(index)
+    peak_index = low + int(np.argmax(gradient[low : high + 1]))
+    before, peak, after = (float(v) for v in gradient[peak_index - 1 : peak_index + 2])
+    curvature = before - 2 * peak + after
+    if peak < before or peak < after or curvature >= 0:
+        return float(index)
+    return peak_index + 0.5 * (before - after) / curvature
+
+
+def bottom_edge_width_px(image: np.ndarray, box: Sequence[int], profile: MeasureProfile, subpixel: bool = False,
+                         marks: Optional[list] = None) -> float:
+    """Width in px of the lowest edge within the bottom 25 % of the box (drawings appended to *marks*)."""
+    x1, y1, x2, y2 = box[:4]
+    bottom_y1 = y2 - int((y2 - y1) * 0.25)
+    if marks is not None:
+        marks.append(primitive("rect", "roi", (x1, bottom_y1), (x2, y2)))
+    roi = image[bottom_y1:y2, x1:x2]
+    if roi.size == 0:
+        return float(x2 - x1)
+
+    filtered, edges = _edge_map(roi, profile, np.ones((1, 5), np.uint8))
+    points, contour, starts = _contour_points(edges, profile.min_contour_area)
+    if not len(points):
+        return float(x2 - x1)
+    bottom = _lower_halves(points, contour, starts)
+    left, right = int(bottom[:, 0].min()), int(bottom[:, 0].max())
+    if marks is not None:
+        ends = [bottom[bottom[:, 0].argmin()] + (x1, bottom_y1), bottom[bottom[:, 0].argmax()] + (x1, bottom_y1)]
+        marks.extend(primitive("circle", "edge", end) for end in ends)
+        marks.append(primitive("line", "edge", *ends))
+    if not subpixel:
+        return float(right - left)
+
+    band = filtered[bottom[:, 1].min() : bottom[:, 1].max() + 1].astype(np.float32)
+    gradient = np.abs(cv2.Sobel(band, cv2.CV_32F, 1, 0, ksize=3)).sum(axis=0)
+    return _subpixel_peak(gradient, right) - _subpixel_peak(gradient, left)
+
+
+def object_height_px(image: np.ndarray, box: Sequence[int], profile: MeasureProfile, subpixel: bool = False,
+                     marks: Optional[list] = None) -> float:
+    """Height in px between the top- and bottommost edge points inside the box (drawings appended to *marks*)."""
+    x1, y1, x2, y2 = box[:4]
+    roi = image[y1:y2, x1:x2]
+    if roi.size == 0:
+        return float(y2 - y1)
+
+    filtered, edges = _edge_map(roi, profile, np.ones((5, 1), np.uint8))
+    points, _, _ = _contour_points(edges, profile.min_contour_area)
+    if not len(points):
+        return float(y2 - y1)
+    top, bottom = int(points[:, 1].min()), int(points[:, 1].max())
+    if marks is not None:
+        ends = [points[points[:, 1].argmin()] + (x1, y1), points[points[:, 1].argmax()] + (x1, y1)]
+        marks.extend(primitive("circle", "edge", end) for end in ends)
+        marks.append(primitive("line", "edge", *ends))
+    if not subpixel:
+        return float(bottom - top)
+
+    gradient = np.abs(cv2.Sobel(filtered.astype(np.float32), cv2.CV_32F, 0, 1, ksize=3)).sum(axis=1)
+    return _subpixel_peak(gradient, bottom) - _subpixel_peak(gradient, top)
+
+
+def measure_box(image: np.ndarray, box: Sequence[int], px_per_cm: float, xs: List[int], ys: List[int],
+                profile: MeasureProfile, subpixel: bool = False, origin: Tuple[int, int] = (0, 0),
+                annotations: Optional[list] = None) -> float:
+    """
+    Measure one detected object the way the profile's script does.
+
+    Args:
+        image: Warped (grid-aligned) BGR image
+        box: (x1, y1, x2, y2, ...) in image pixels
+        px_per_cm, xs, ys: Grid calibration from calibration.calibrate_grid()
+        profile: One of PROFILES
+        subpixel: Refine the edge positions to fractions of a pixel
+        origin: Position of *image* in the warped image when it is only a
+            region of it (box, xs and ys stay in warped image coordinates)
+        annotations: If given, the measured ROI and edge points are appended
+            as annotate.primitive() drawings in warped image coordinates
+
+    Returns:
+        Final value in cm, rounded to 0.1 as printed by the script
+    """
+    scale, aspect_ratio = corrected_scale(box, px_per_cm, xs, ys, profile)
+    x1, y1, x2, y2 = box[:4]
+    roi_box = (x1 - origin[0], y1 - origin[1], x2 - origin[0], y2 - origin[1])
+    marks = [] if annotations is not None else None
+    if profile.kind == "height":
+        raw_px = object_height_px(image, roi_box, profile, subpixel, marks)
+    else:
+        raw_px = bottom_edge_width_px(image, roi_box, profile, subpixel, marks)
+    if annotations is not None:
+        annotations.extend(shift(marks, *origin))
+    value_cm = raw_px / scale
+    factor = _first_match(aspect_ratio, profile.corrections)
+    if factor is not None:
+        value_cm *= factor
+    return round(value_cm * 10) / 10
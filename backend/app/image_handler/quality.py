@@ -0,0 +1,181 @@
+"""
+Fast image quality gate run before calibration and detection.
+
+Blurry, badly exposed or grid-less photos otherwise go through unwarping,
+Hough line search and YOLO before calibrate_grid() gives up with
+"Unzureichende Linienabstände". This check decodes a small copy of the image
+(JPEG draft mode, about 400 px) and rejects it in a few milliseconds with one
+of these codes:
+
+- "undecodable":  not a JPEG/PNG image
+- "blurry":       low variance of the Laplacian (sharpness)
+- "overexposed" / "underexposed": too many clipped pixels
+- "no_grid":      no periodic line pattern along both image axes
+
+Decoding, sharpness and exposure need only Pillow; the grid check uses NumPy
+and is skipped without it.
+
+The thresholds (QUALITY_*) were tuned on synthetic frames, so the engine only
+rejects images with QUALITY_GATE_ENABLED; otherwise its "quality" stage event
+and /api/quality/check report the scores as warnings, to set the thresholds
+from real camera frames.
+"""
+
+import io
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from PIL import Image, ImageFilter, ImageStat
+
+from ..config import Config
+
+_MAX_SIZE = 400
+
+_MESSAGES = {
+    "undecodable": "The image could not be decoded; upload a JPEG or PNG photo.",
+    "blurry": "The image is blurry; hold the camera still and check the focus.",
+    "overexposed": "The image is overexposed; reduce the lighting or avoid glare on the sheet.",
+    "underexposed": "The image is too dark; add light to the measuring area.",
+    "no_grid": "No calibration grid found; make sure the grid sheet is in view and not covered.",
+}
+
+# Laplacian with an offset, so negative responses survive the 8-bit image
+_LAPLACIAN = ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], scale=1, offset=128)
+
+
+@dataclass
+class QualityReport:
+    """Outcome of the quality gate for one image."""
+
+    ok: bool
+    code: Optional[str] = None
+    message: Optional[str] = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "code": self.code,
+            "message": self.message,
+            "metrics": self.metrics,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+def _small_gray(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data), formats=["JPEG", "PNG"])
+    # JPEG only: let the decoder scale by 1/2, 1/4 or 1/8 during the DCT
+    scale = _MAX_SIZE / max(image.size)
+    image.draft("L", (int(image.width * scale), int(image.height * scale)))
+    image = image.convert("L")
+    image.thumbnail((_MAX_SIZE, _MAX_SIZE))
+    return image
+
+
+def periodicity(profiles, min_period: int = 3, max_period: int = 48):
+    """
+    Strength of the strongest repetition in each row of *profiles*, from 0 (none) to 1.
+
+    Every profile is detrended with a moving average and autocorrelated. A
+    period P between *min_period* and *max_period* (at most a sixth of the
+    profile length) scores the lower of the normalized correlations at lags
+    P and 2P, less the correlation at P/2: a pattern has to repeat (not one
+    chance peak of a noisy profile) and to alternate in between (not just
+    vary slowly, like the edges of a piece on a plain background).
+    """
+    import numpy as np
+
+    profiles = np.atleast_2d(np.asarray(profiles, dtype=np.float64))
+    n = profiles.shape[1]
+    max_period = min(max_period, n // 6)
+    if max_period < min_period:
+        return np.zeros(len(profiles))
+    window = max_period | 1
+    padded = np.pad(profiles, ((0, 0), (window // 2, window // 2)), mode="edge")
+    prefix = np.cumsum(np.pad(padded, ((0, 0), (1, 0))), axis=1)
+    residual = profiles - (prefix[:, window:] - prefix[:, :-window]) / window
+
+    max_lag = 2 * max_period
+    spectrum = np.fft.rfft(residual, 2 * n, axis=1)
+    correlation = np.fft.irfft(spectrum * spectrum.conj(), 2 * n, axis=1)[:, : max_lag + 1]
+    energy = correlation[:, :1]
+    correlation = np.where(energy > 1e-9, correlation / np.maximum(energy, 1e-9), 0.0)
+    correlation *= n / (n - np.arange(max_lag + 1))
+    periods = np.arange(min_period, max_period + 1)
+    repeats = np.minimum(correlation[:, periods], correlation[:, 2 * periods])
+    return (repeats - correlation[:, periods // 2]).max(axis=1).clip(0.0, 1.0)
+
+
+def grid_score(gray: Image.Image, strips: int = 8) -> Optional[float]:
+    """
+    How clearly a line grid shows along both image axes (0 to 1); None without NumPy.
+
+    The profiles are the mean brightness gradient across each column / row,
+    where grid lines are evenly spaced spikes and the edges of a piece are
+    isolated ones. They are averaged over *strips* bands each, so lines that
+    are tilted by the camera perspective still line up within a band; the
+    grid only has to be visible in one band per axis (the piece may cover
+    the rest).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    pixels = np.asarray(gray, dtype=np.float64)
+    across_columns = np.abs(np.diff(pixels, axis=1))
+    across_rows = np.abs(np.diff(pixels, axis=0))
+    columns = np.stack([band.mean(axis=0) for band in np.array_split(across_columns, strips, axis=0)])
+    rows = np.stack([band.mean(axis=1) for band in np.array_split(across_rows, strips, axis=1)])
+    return float(min(periodicity(columns).max(), periodicity(rows).max()))
+
+
+def check_image_quality(data: bytes, config=Config) -> QualityReport:
+    """
+    Judge whether an image is worth measuring.
+
+    Thresholds: QUALITY_MIN_SHARPNESS, QUALITY_MAX_CLIPPED and
+    QUALITY_MIN_GRID_SCORE.
+    """
+    start = time.perf_counter()
+
+    def report(code: Optional[str], metrics: Dict[str, float]) -> QualityReport:
+        return QualityReport(
+            ok=code is None,
+            code=code,
+            message=_MESSAGES.get(code),
+            metrics=metrics,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+
+    try:
+        gray = _small_gray(data)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return report("undecodable", {})
+
+    histogram = gray.histogram()
+    pixels = gray.width * gray.height
+    bright = sum(histogram[250:]) / pixels
+    dark = sum(histogram[:6]) / pixels
+    sharpness = ImageStat.Stat(gray.filter(_LAPLACIAN)).var[0]
+    grid = grid_score(gray)
+    metrics = {
+        "width": gray.width,
+        "height": gray.height,
+        "sharpness": round(sharpness, 1),
+        "overexposed_fraction": round(bright, 4),
+        "underexposed_fraction": round(dark, 4),
+        "grid_score": round(grid, 3) if grid is not None else None,
+    }
+
+    if bright > config.QUALITY_MAX_CLIPPED:
+        return report("overexposed", metrics)
+    if dark > config.QUALITY_MAX_CLIPPED:
+        return report("underexposed", metrics)
+    if sharpness < config.QUALITY_MIN_SHARPNESS:
+        return report("blurry", metrics)
+    if grid is not None and grid < config.QUALITY_MIN_GRID_SCORE:
+        return report("no_grid", metrics)
+    return report(None, metrics)
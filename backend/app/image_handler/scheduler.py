@@ -0,0 +1,262 @@
+"""
+CPU scheduler for measurements.
+
+OpenCV and PyTorch each start a thread pool as large as the machine. When
+several measurements run in parallel threads of one process (camera routes,
+measurement jobs, conveyor station), these pools oversubscribe the CPU and
+tail latency explodes. With MEASURE_SCHEDULER_MODE set, measurements instead
+run in a pool of worker processes that share the cores between them:
+
+- "latency":    few workers (one below 4 cores, else two) with all their
+                cores' threads each: a single measurement finishes fastest
+- "throughput": one worker per core with one thread each: the most
+                measurements per second under load
+
+MEASURE_WORKERS and MEASURE_THREADS_PER_WORKER override the mode's split.
+Every worker limits cv2.setNumThreads / torch.set_num_threads (and the
+OpenMP/BLAS pools) to its share and, with MEASURE_CPU_AFFINITY, is pinned to
+its cores. Each worker loads its own YOLO models, so memory grows with the
+number of workers. Without a mode, measurements run in a thread as before.
+
+Progress events are relayed from the workers to the caller's callback by a
+thread in this process.
+"""
+
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..config import Config
+
+MODES = ("latency", "throughput")
+
+_THREAD_POOL_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Set in each worker process by _init_worker()
+_worker_events = None
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(cores: Sequence[int], mode: str, workers: int = 0, threads: int = 0) -> List[Tuple[int, ...]]:
+    """
+    Split *cores* into one core set per worker.
+
+    Args:
+        cores: CPU ids to share
+        mode: "latency" or "throughput"
+        workers, threads: Override the mode's number of workers / threads
+            per worker (0 = derived from the mode and the core count)
+
+    Returns:
+        One tuple of CPU ids per worker; its length is the worker's thread
+        count. Sets wrap around (and share cores) when workers * threads
+        exceeds the cores.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown scheduler mode {mode!r}, expected one of {MODES}")
+    count = len(cores)
+    if mode == "latency":
+        workers = workers or (1 if count < 4 else 2)
+        threads = threads or max(1, count // workers)
+    else:
+        threads = threads or 1
+        workers = workers or max(1, count // threads)
+    ring = itertools.cycle(cores)
+    return [tuple(next(ring) for _ in range(threads)) for _ in range(workers)]
+
+
+def limit_threads(threads: int, cores: Optional[Sequence[int]] = None) -> None:
+    """Limit the OpenCV, PyTorch and OpenMP/BLAS pools of this process to *threads*, optionally pinned to *cores*."""
+    for variable in _THREAD_POOL_VARIABLES:
+        os.environ[variable] = str(threads)
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    try:
+        import cv2
+
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(core_sets, events, affinity: bool) -> None:
+    global _worker_events
+    cores = core_sets.get()
+    limit_threads(len(cores), cores if affinity else None)
+    _worker_events = events
+
+
+def _warm_up() -> int:
+    """Import the engine and load the detection models of one worker."""
+    from .capabilities import ml_dependencies_available
+
+    if ml_dependencies_available():
+        from .detection import get_model
+
+        for view in ("bottom", "side"):
+            get_model(view)
+    return os.getpid()
+
+
+def _call(fn: Callable, args: tuple, token: Optional[int]):
+    if token is None:
+        return fn(*args)
+
+    def progress(stage: str, data: Dict) -> None:
+        _worker_events.put((token, stage, data))
+
+    try:
+        return fn(*args, progress)
+    finally:
+        # Queued after every event of this call: the caller waits for it before returning
+        _worker_events.put((token, None, None))
+
+
+class MeasurementScheduler:
+    """
+    Runs measurement functions on a core-partitioned process pool.
+
+    Args:
+        mode: "latency", "throughput" or "" (run in a thread of this process)
+        workers, threads: Override the mode's split (0 = derived)
+        affinity: Pin every worker to its cores
+        cores: CPU ids to share (default: all available)
+    """
+
+    def __init__(self, mode: str = "", workers: int = 0, threads: int = 0, affinity: bool = False,
+                 cores: Optional[Sequence[int]] = None):
+        self.mode = mode
+        self.affinity = affinity
+        self.core_sets = partition_cores(cores or available_cores(), mode, workers, threads) if mode else []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._events = None
+        self._relay: Optional[threading.Thread] = None
+        self._callbacks: Dict[int, Tuple[Callable[[str, Dict], None], threading.Event]] = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config=Config) -> "MeasurementScheduler":
+        return cls(
+            mode=config.MEASURE_SCHEDULER_MODE,
+            workers=config.MEASURE_WORKERS,
+            threads=config.MEASURE_THREADS_PER_WORKER,
+            affinity=config.MEASURE_CPU_AFFINITY,
+        )
+
+    def start(self) -> None:
+        """Start the workers (and load their models); a no-op without a mode."""
+        with self._lock:
+            if not self.mode or self._executor is not None:
+                return
+            # spawn: the server process has running threads, which fork would copy in an arbitrary state
+            context = multiprocessing.get_context("spawn")
+            core_sets = context.Queue()
+            for cores in self.core_sets:
+                core_sets.put(cores)
+            self._events = context.Queue()
+            self._relay = threading.Thread(target=self._relay_events, name="measurement-progress", daemon=True)
+            self._relay.start()
+            self._executor = ProcessPoolExecutor(
+                max_workers=len(self.core_sets),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(core_sets, self._events, self.affinity),
+            )
+            workers = [self._executor.submit(_warm_up) for _ in self.core_sets]
+        for future in workers:
+            future.result()
+        print(f"✓ Measurement scheduler ({self.mode}): {len(self.core_sets)} workers, "
+              f"cores {', '.join('/'.join(map(str, cores)) for cores in self.core_sets)}")
+
+    def _relay_events(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            token, stage, data = event
+            callback, finished = self._callbacks.get(token, (None, None))
+            if stage is None and finished is not None:
+                finished.set()
+            elif callback is not None:
+                callback(stage, data)
+
+    async def run(self, fn: Callable, *args, progress: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Await ``fn(*args)``, or ``fn(*args, progress)`` when *progress* is given.
+
+        With a mode, *fn* and its arguments must be picklable (module-level
+        function) and *progress* is called from the relay thread.
+        """
+        if not self.mode:
+            return await asyncio.to_thread(fn, *args, *((progress,) if progress else ()))
+        if self._executor is None:
+            await asyncio.to_thread(self.start)
+        token = None
+        if progress is not None:
+            token = next(self._tokens)
+            finished = threading.Event()
+            self._callbacks[token] = (progress, finished)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(_call, fn, args, token))
+        finally:
+            if token is not None:
+                # The result can overtake the last progress events; wait for the call's end marker
+                await asyncio.to_thread(finished.wait, 5.0)
+                del self._callbacks[token]
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                return
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._events.put(None)
+            self._relay.join()
+            self._executor = None
+
+
+_scheduler: Optional[MeasurementScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> MeasurementScheduler:
+    """The process-wide scheduler, created from Config on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = MeasurementScheduler.from_config()
+        return _scheduler
+
+
+def stop_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop()
+
+
+async def schedule_measurement(image_bottom: bytes, image_side: bytes,
+                               progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """engine.measure_images() on the scheduler's workers (in a thread without MEASURE_SCHEDULER_MODE)."""
+    from .engine import measure_images
+
+    return await get_scheduler().run(measure_images, image_bottom, image_side, progress=progress)
@@ -0,0 +1,149 @@
+"""
+Background measurement jobs with a replayable stage event log.
+
+``POST /api/measurement_jobs`` starts a job and returns immediately; the
+client follows ``/api/measurement_jobs/<id>/events`` (server-sent events)
+and receives one event per completed stage with its partial result:
+
+    uploaded -> quality -> decoded -> calibrated -> detected -> measured -> saved -> done
+
+("quality", "decoded", "calibrated" and "detected" once per view, "measured" once per
+dimension of every object; "error" replaces the rest when the job fails).
+Events are kept with the job, so a client that connects late or reconnects
+gets the full history first. Finished jobs are forgotten after a TTL.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from .config import Config
+from .database.measurements import save_measurements
+from .image_handler.scheduler import schedule_measurement
+
+TERMINAL_STAGES = ("done", "error")
+
+
+class MeasurementJob:
+    """Event log of one measurement; emit() may be called from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.id = uuid.uuid4().hex
+        self.events: List[Dict] = []
+        self.finished_at: Optional[float] = None  # time.monotonic()
+        self._loop = loop
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def stage(self) -> Optional[str]:
+        return self.events[-1]["stage"] if self.events else None
+
+    def emit(self, stage: str, data: Optional[Dict] = None) -> None:
+        """Append a stage event (thread-safe)."""
+        event = {"stage": stage, "time": time.time(), **(data or {})}
+        self._loop.call_soon_threadsafe(self._append, event)
+
+    def _append(self, event: Dict) -> None:
+        if self.finished:
+            return
+        self.events.append(event)
+        if event["stage"] in TERMINAL_STAGES:
+            self.finished_at = time.monotonic()
+        # Wake every follower; new waiters get a fresh event
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def follow(self, start: int = 0, heartbeat: float = 15.0) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+        """
+        Yield (index, event) from *start* on, live, until the job finished.
+
+        Yields (index, None) after *heartbeat* seconds without events so the
+        caller can keep the connection alive.
+        """
+        index = start
+        while True:
+            while index < len(self.events):
+                yield index, self.events[index]
+                index += 1
+            if self.finished:
+                return
+            updated = self._updated
+            try:
+                await asyncio.wait_for(updated.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield index, None
+
+    def to_dict(self) -> Dict:
+        return {"job_id": self.id, "stage": self.stage, "finished": self.finished, "events": self.events}
+
+
+class MeasurementJobs:
+    """
+    Running and recently finished jobs.
+
+    Args:
+        ttl: Seconds a finished job stays retrievable
+    """
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self._jobs: Dict[str, MeasurementJob] = {}
+        self._tasks = set()
+
+    @classmethod
+    def from_config(cls, config=Config) -> "MeasurementJobs":
+        return cls(ttl=config.MEASUREMENT_JOB_TTL)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for job_id in [key for key, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[MeasurementJob]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def start(self, image_bottom: bytes, image_side: bytes, session_factory=None) -> MeasurementJob:
+        """Create a job and run it in the background."""
+        self._expire()
+        job = MeasurementJob(asyncio.get_running_loop())
+        self._jobs[job.id] = job
+        task = asyncio.create_task(run_measurement_job(job, image_bottom, image_side, session_factory))
+        # Keep a reference so the task is not garbage collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_measurement_job(job: MeasurementJob, image_bottom: bytes, image_side: bytes, session_factory=None) -> None:
+    """Measure the images, save the result and report every stage to *job*."""
+    job.emit("uploaded", {"bottom_bytes": len(image_bottom), "side_bytes": len(image_side)})
+    try:
+        measurements = await schedule_measurement(image_bottom, image_side, job.emit)
+        inventory_item_ids = []
+        if session_factory is not None:
+            async with session_factory() as db:
+                inventory_item_ids = await save_measurements(db, measurements)
+            job.emit("saved", {"inventory_item_ids": inventory_item_ids})
+        job.emit("done", {"data": measurements, "inventory_item_ids": inventory_item_ids})
+    except Exception as e:
+        print(f"Error processing measurement job {job.id}: {e}")
+        job.emit("error", {"error": "Failed to process images", "details": str(e)})
+
+
+def get_measurement_jobs(request: Request) -> MeasurementJobs:
+    """FastAPI dependency returning the job registry created in the app lifespan."""
+    return request.app.state.measurement_jobs
@@ -2,7 +2,6 @@ import os
 import argparse
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from ultralytics import YOLO
 from metal_utils import (
     load_and_scale_image,
@@ -0,0 +1,51 @@
+"""
+Fast JSON serialization for large API responses.
+
+Uses orjson when it is installed (native datetime support, output as bytes)
+and falls back to the standard library otherwise. Endpoints that return big
+listings should build plain dicts/tuples and return a FastJSONResponse
+directly, which skips FastAPI's recursive ``jsonable_encoder`` pass.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Serialize the types neither encoder handles on its own."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize *content* to UTF-8 encoded JSON.
+
+    Args:
+        content: JSON-compatible structure; Decimal and datetime values are allowed
+
+    Returns:
+        The encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders through dumps() instead of json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,92 @@
+"""
+Benchmark: cold start of the API process.
+
+Starts fresh interpreters and reports the median of
+- the import time of every heavy module on its own (not installed ones are listed)
+- import: ``import app.fastapi_app`` (what uvicorn does before serving)
+- probe:  the ML capability probe of app/image_handler/capabilities.py
+- first measurement: import plus the first measure_images() call on a
+  synthetic pair, including the lazy imports of the engine (mock values
+  without the ML dependencies; the first YOLO load otherwise)
+- first view: import plus the first calibrated, detected and measured view
+  with the colour detector of benchmarks/check_equivalence.py (needs OpenCV and
+  NumPy only, so the engine's own import cost shows without ultralytics)
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ("numpy", "cv2", "PIL.Image", "torch", "ultralytics", "matplotlib.pyplot", "flask", "fastapi", "sqlalchemy")
+
+_TIMER = "import time; _start = time.perf_counter()\n"
+_REPORT = "\nprint((time.perf_counter() - _start) * 1000)\n"
+
+STAGES = {
+    "import": "import app.fastapi_app",
+    "probe": "import app.fastapi_app; _start = time.perf_counter(); app.fastapi_app.probe_capabilities()",
+    "first measurement": (
+        "import app.fastapi_app\n"
+        "from app.image_handler.engine import measure_images\n"
+        "pair = [open(path, 'rb').read() for path in {images!r}]\n"
+        "measure_images(*pair)"
+    ),
+    "first view": (
+        "import app.fastapi_app\n"
+        "from benchmarks.bench_scheduler import analyse\n"
+        "analyse(open({images!r}[0], 'rb').read(), 'bottom', 'synthetic')"
+    ),
+}
+
+
+def _run(code: str) -> float:
+    """Milliseconds the timed code took in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMER + code + _REPORT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=600,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    from benchmarks.check_equivalence import synthetic_corpus
+
+    directory = tempfile.mkdtemp(prefix="bench_cold_start_")
+    images = [os.path.join(directory, entry["image"]) for entry in synthetic_corpus(directory, 2)]
+
+    print(f"Fresh interpreters per value: {runs}")
+    print("Module imports:")
+    for module in MODULES:
+        try:
+            times = [_run(f"import {module}") for _ in range(runs)]
+        except RuntimeError:
+            print(f"  {module:>18}: not installed")
+            continue
+        print(f"  {module:>18}: median {statistics.median(times):7.1f} ms")
+    print("API process:")
+    for name, code in STAGES.items():
+        try:
+            times = [_run(code.format(images=images)) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"  {name:>18}: failed ({e})")
+            continue
+        print(f"  {name:>18}: median {statistics.median(times):7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    sys.path.insert(0, BACKEND_DIR)
+    main(args.runs)
@@ -0,0 +1,133 @@
+"""
+Benchmark: edge extent extraction, contour loop vs. array pass.
+
+Renders synthetic metal pieces with glare speckles, builds the same edge map
+as app/image_handler/measure.py and compares
+- legacy: findContours(CHAIN_APPROX_NONE) + per-contour argsort / extend
+  (detect_metal_bottom_edge / detect_metal_height in the scripts)
+- array:  findContours + one vectorized pass over all contour points
+and reports the timings of the extraction stage alone and the difference of
+the measured extents in pixels.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_edge_extraction --images 50 --size 900 --glare 4000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _render(rng: np.random.Generator, size: int, glare: int):
+    """A bright piece on a dark background with glare speckles; returns (image, box)."""
+    margin = 15
+    image = rng.normal(60, 8, (size, size, 3)).clip(0, 255).astype(np.uint8)
+    width, height = (int(v) for v in rng.integers(size // 4, size * 3 // 4, 2))
+    x1, y1 = (int(v) for v in rng.integers(margin, size - max(width, height) - margin, 2))
+    cv2.rectangle(image, (x1, y1), (x1 + width, y1 + height), (170, 175, 180), -1)
+    ys = rng.integers(y1, y1 + height, glare)
+    xs = rng.integers(x1, x1 + width, glare)
+    image[ys, xs] = 255
+    image = cv2.GaussianBlur(image, (3, 3), 0)
+    return image, (x1 - margin, y1 - margin, x1 + width + margin, y1 + height + margin)
+
+
+def _legacy_bottom_width(edges: np.ndarray, min_area: float):
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    significant = [cnt for cnt in contours if cv2.contourArea(cnt) > min_area] or list(contours)
+    bottom_points = []
+    for cnt in significant:
+        points = cnt.reshape(-1, 2)
+        sorted_by_y = points[points[:, 1].argsort()]
+        bottom_points.extend(sorted_by_y[len(sorted_by_y) // 2:])
+    if not bottom_points:
+        return None
+    bottom_points = np.array(bottom_points)
+    return float(bottom_points[:, 0].max() - bottom_points[:, 0].min())
+
+
+def _legacy_height(edges: np.ndarray, min_area: float):
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    significant = [cnt for cnt in contours if cv2.contourArea(cnt) > min_area] or list(contours)
+    side_points = []
+    for cnt in significant:
+        side_points.extend(cnt.reshape(-1, 2))
+    if not side_points:
+        return None
+    side_points = np.array(side_points)
+    return float(side_points[:, 1].max() - side_points[:, 1].min())
+
+
+def _array_bottom_width(edges: np.ndarray, min_area: float):
+    from app.image_handler.measure import _contour_points, _lower_halves
+
+    points, contour, starts = _contour_points(edges, min_area)
+    if not len(points):
+        return None
+    bottom = _lower_halves(points, contour, starts)
+    return float(bottom[:, 0].max() - bottom[:, 0].min())
+
+
+def _array_height(edges: np.ndarray, min_area: float):
+    from app.image_handler.measure import _contour_points
+
+    points, _, _ = _contour_points(edges, min_area)
+    return float(points[:, 1].max() - points[:, 1].min()) if len(points) else None
+
+
+def _time(fn, edges, min_area: float, repeat: int):
+    result = fn(edges, min_area)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(edges, min_area)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(images: int, size: int, glare: int, repeat: int) -> None:
+    from app.image_handler.measure import PROFILES, _edge_map
+
+    rng = np.random.default_rng(3)
+    stages = {
+        "bottom width": (PROFILES["width"], np.ones((1, 5), np.uint8), _legacy_bottom_width, _array_bottom_width),
+        "height": (PROFILES["height"], np.ones((5, 1), np.uint8), _legacy_height, _array_height),
+    }
+    samples = [_render(rng, size, glare) for _ in range(images)]
+    print(f"Images: {images} ({size}x{size}, {glare} glare speckles), repeats: {repeat}")
+    for name, (profile, kernel, legacy, array) in stages.items():
+        timings = {"legacy": [], "array": []}
+        deltas, points = [], []
+        for image, (x1, y1, x2, y2) in samples:
+            if name == "bottom width":
+                y1 = y2 - int((y2 - y1) * 0.25)
+            _, edges = _edge_map(image[y1:y2, x1:x2], profile, kernel)
+            points.append(int(np.count_nonzero(edges)))
+            legacy_time, legacy_px = _time(legacy, edges, profile.min_contour_area, repeat)
+            array_time, array_px = _time(array, edges, profile.min_contour_area, repeat)
+            timings["legacy"].append(legacy_time)
+            timings["array"].append(array_time)
+            if legacy_px is not None and array_px is not None:
+                deltas.append(abs(legacy_px - array_px))
+        legacy_median = statistics.median(timings["legacy"])
+        array_median = statistics.median(timings["array"])
+        print(f"{name} (median {statistics.median(points):.0f} edge pixels per ROI):")
+        print(f"  legacy: median {legacy_median * 1000:7.3f} ms")
+        print(f"   array: median {array_median * 1000:7.3f} ms")
+        print(f"  speed-up {legacy_median / array_median:.1f}x, "
+              f"|legacy - array| median {statistics.median(deltas):.1f} px, max {max(deltas):.1f} px")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--size", type=int, default=900)
+    parser.add_argument("--glare", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.images, args.size, args.glare, args.repeat)
@@ -0,0 +1,87 @@
+"""
+Benchmark: fit search latency on a large inventory.
+
+Seeds a throw-away SQLite database with N random pieces and times
+GET /api/inventory/fit style queries for a mix of small (many matches) and
+large (few matches) requests.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_fit_search --rows 100000 --queries 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _seed(rows: int) -> None:
+    from sqlalchemy import insert
+    from app.database.models import InventoryItem, Material, sorted_dimensions
+    from app.database.session import async_sessionmaker, create_tables
+
+    await create_tables()
+    random.seed(7)
+    async with async_sessionmaker() as db:
+        material = Material(name="Steel", material_type="steel")
+        db.add(material)
+        await db.flush()
+        batch = []
+        for _ in range(rows):
+            w, h, d = (round(random.uniform(5, 500), 1) for _ in range(3))
+            dim_min, dim_mid, dim_max, bounding_volume = sorted_dimensions(w, h, d)
+            batch.append({
+                "material_id": material.id, "width": w, "height": h, "depth": d,
+                "dim_min": dim_min, "dim_mid": dim_mid, "dim_max": dim_max,
+                "bounding_volume": bounding_volume, "quantity": 1,
+                "is_available": random.random() < 0.9,
+            })
+            if len(batch) == 10000:
+                await db.execute(insert(InventoryItem.__table__), batch)
+                batch = []
+        if batch:
+            await db.execute(insert(InventoryItem.__table__), batch)
+        await db.commit()
+
+
+async def main(rows: int, queries: int) -> None:
+    from sqlalchemy import text
+    from app.database.fit_search import fit_search_query
+    from app.database.session import async_sessionmaker, close_db_engine
+
+    await _seed(rows)
+    async with async_sessionmaker() as db:
+        await db.execute(text("ANALYZE"))
+        requests = [
+            ("small", lambda: [random.uniform(5, 60) for _ in range(3)]),
+            ("medium", lambda: [random.uniform(100, 250) for _ in range(3)]),
+            ("large", lambda: [random.uniform(350, 480) for _ in range(3)]),
+        ]
+        print(f"Rows: {rows}, queries per size: {queries}")
+        for name, make_request in requests:
+            timings = []
+            for _ in range(queries):
+                width, height, depth = make_request()
+                start = time.perf_counter()
+                (await db.execute(fit_search_query(width, height, depth, limit=20))).all()
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{name:>7}: median {statistics.median(timings) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms")
+    await close_db_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_fit_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    asyncio.run(main(args.rows, args.queries))
@@ -0,0 +1,97 @@
+"""
+Benchmark: grid calibration reuse across frames of a fixed station.
+
+Renders a sequence of frames of one grid sheet under a fixed camera with
+different pieces on top (and, to check the fallback, the camera moved by a
+few pixels), and compares per frame
+- full:   find the homography, unwarp and calibrate_grid() (Canny + Hough)
+- verify: GridCalibration.verify() against the first frame's calibration
+reporting the timings and whether every frame was judged correctly.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_grid_reuse --frames 20 --shifts 0,1,2,3,5,10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CELL = 40
+PIECE_BGR = (90, 90, 100)
+CORNERS = np.float32([[220, 60], [1060, 80], [1080, 900], [200, 880]])
+
+
+def render(rng: np.random.Generator, pieces: int, shift=(0.0, 0.0), light: float = 1.0) -> np.ndarray:
+    """A 20x20 cm grid sheet under perspective with *pieces* pieces, camera moved by *shift* px."""
+    sheet = np.full((20 * CELL, 20 * CELL, 3), 235, np.uint8)
+    for position in range(0, sheet.shape[0], CELL):
+        cv2.line(sheet, (position, 0), (position, sheet.shape[0] - 1), (40, 40, 40), 2)
+        cv2.line(sheet, (0, position), (sheet.shape[1] - 1, position), (40, 40, 40), 2)
+    for piece in range(pieces):
+        w, h = (int(v) * CELL // 2 for v in rng.integers(4, 11, 2))
+        x = int(rng.integers(CELL, 8 * CELL)) + piece * 9 * CELL
+        y = int(rng.integers(CELL, sheet.shape[0] - h - CELL))
+        cv2.rectangle(sheet, (x, y), (x + w, y + h), PIECE_BGR, -1)
+    size = sheet.shape[0] - 1
+    source = np.float32([[0, 0], [size, 0], [size, size], [0, size]])
+    matrix = cv2.getPerspectiveTransform(source, CORNERS + np.float32(shift))
+    frame = cv2.warpPerspective(sheet, matrix, (1280, 960), borderValue=(25, 25, 25))
+    frame = np.clip(frame * light + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+    return cv2.imdecode(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 92])[1], cv2.IMREAD_COLOR)
+
+
+def full_calibration(frame: np.ndarray):
+    from app.image_handler.calibration import calibrate_grid, compute_homography
+
+    warped, homography = compute_homography(frame)
+    return warped, homography, calibrate_grid(warped)
+
+
+def main(frames: int, shifts, min_fraction: float, repeat: int) -> None:
+    from app.image_handler.calibration import GridCalibration
+
+    rng = np.random.default_rng(5)
+    reference = render(rng, 1)
+    warped, homography, calibration = full_calibration(reference)
+    grid = GridCalibration(reference, homography, (warped.shape[1], warped.shape[0]), *calibration)
+    print(f"Reference: {len(calibration[3])}x{len(calibration[4])} grid lines, "
+          f"{calibration[0]:.2f} px/cm, {grid.samples} line samples")
+
+    full_times, verify_times = [], []
+    print(f"{'shift px':>8} {'frames':>6} {'confirmed':>9} {'min fraction':>12}")
+    for shift in shifts:
+        confirmed, fractions = 0, []
+        for index in range(frames):
+            frame = render(rng, 1 + index % 2, (shift, shift / 2), light=rng.uniform(0.8, 1.1))
+            start = time.perf_counter()
+            for _ in range(repeat):
+                ok, fraction = grid.verify(frame, min_fraction)
+            verify_times.append((time.perf_counter() - start) / repeat)
+            if index < 3:
+                start = time.perf_counter()
+                full_calibration(frame)
+                full_times.append(time.perf_counter() - start)
+            confirmed += ok
+            fractions.append(fraction)
+        print(f"{shift:>8} {frames:>6} {confirmed:>9} {min(fractions):>12.2f}")
+    full_median = statistics.median(full_times)
+    verify_median = statistics.median(verify_times)
+    print(f"full calibration: median {full_median * 1000:8.2f} ms")
+    print(f"          verify: median {verify_median * 1000:8.3f} ms ({full_median / verify_median:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--shifts", default="0,1,2,3,5,10")
+    parser.add_argument("--min-fraction", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.frames, [float(s) for s in args.shifts.split(",")], args.min_fraction, args.repeat)
@@ -0,0 +1,132 @@
+"""
+Benchmark: inventory listing serialization, legacy path vs. fast path.
+
+Seeds a throw-away SQLite database with N inventory items and compares
+- legacy: ORM objects + selectinload, Decimal→float loop, isoformat(),
+  FastAPI jsonable_encoder and JSONResponse
+- fast:   tuple rows (Numeric cast to float in SQL) + FastJSONResponse
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_inventory_json --rows 10000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _configure_database() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_inventory_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    return path
+
+
+async def _seed(rows: int) -> None:
+    from app.database.models import InventoryItem, Material
+    from app.database.session import async_sessionmaker, create_tables
+
+    await create_tables()
+    random.seed(42)
+    async with async_sessionmaker() as db:
+        material = Material(name="Steel", material_type="steel", density=7850)
+        db.add(material)
+        await db.flush()
+        for _ in range(rows):
+            w, h, d = (round(random.uniform(5, 300), 3) for _ in range(3))
+            db.add(InventoryItem(
+                material_id=material.id, width=w, height=h, depth=d,
+                volume=w * h * d, weight=w * h * d * 0.00785, quantity=1,
+                location=random.choice(["A1", "B2", "C3"]), quality_grade="AUTO",
+                notes="Automatically measured using computer vision", is_available=True,
+            ))
+        await db.commit()
+
+
+async def _legacy() -> int:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app.database.models import InventoryItem
+    from app.database.session import async_sessionmaker
+
+    async with async_sessionmaker() as db:
+        result = await db.execute(
+            select(InventoryItem)
+            .options(selectinload(InventoryItem.material))
+            .order_by(InventoryItem.created_at.desc())
+        )
+        items = []
+        for item in result.scalars().all():
+            items.append({
+                "id": item.id,
+                "material_id": item.material_id,
+                "material_name": item.material.name if item.material else "Unknown",
+                "material_type": item.material.material_type if item.material else "unknown",
+                "width_mm": float(item.width) if item.width is not None else None,
+                "height_mm": float(item.height) if item.height is not None else None,
+                "depth_mm": float(item.depth) if item.depth is not None else None,
+                "volume_mm3": float(item.volume) if item.volume is not None else None,
+                "weight_g": float(item.weight) if item.weight is not None else None,
+                "quantity": item.quantity,
+                "location": item.location,
+                "quality_grade": item.quality_grade,
+                "notes": item.notes,
+                "is_available": item.is_available,
+                "created_at": item.created_at.isoformat() if item.created_at is not None else None,
+            })
+    content = {"inventory": items, "total_count": len(items), "status": "success"}
+    return len(JSONResponse(jsonable_encoder(content)).body)
+
+
+async def _fast() -> int:
+    from app.database.inventory import INVENTORY_LIST_COLUMNS, inventory_list_query
+    from app.database.session import async_sessionmaker
+    from app.serialization import FastJSONResponse
+
+    async with async_sessionmaker() as db:
+        result = await db.execute(inventory_list_query({}))
+        items = [dict(zip(INVENTORY_LIST_COLUMNS, row)) for row in result.all()]
+    content = {"inventory": items, "total_count": len(items), "status": "success"}
+    return len(FastJSONResponse(content).body)
+
+
+async def _time(fn, repeat: int) -> list:
+    await fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(rows: int, repeat: int) -> None:
+    from app.database.session import close_db_engine
+    from app.serialization import orjson
+
+    await _seed(rows)
+    print(f"Rows: {rows}, repeats: {repeat}, orjson: {'yes' if orjson else 'no (stdlib fallback)'}")
+    results = {}
+    for name, fn in (("legacy", _legacy), ("fast", _fast)):
+        timings = await _time(fn, repeat)
+        results[name] = statistics.median(timings)
+        print(f"{name:>7}: median {results[name] * 1000:8.1f} ms  ->  {rows / results[name]:10.0f} rows/s")
+    print(f"Speed-up: {results['legacy'] / results['fast']:.1f}x")
+    await close_db_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    _configure_database()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,106 @@
+"""
+Benchmark: measurement scheduling, threads vs. latency vs. throughput mode.
+
+Runs the engine's view analysis (calibration, unwarp, detection, edge
+measurements) on synthetic grid images under a constant number of
+concurrent requests, with
+- thread:     asyncio.to_thread in this process (OpenCV/Torch pools at
+              machine size), as without MEASURE_SCHEDULER_MODE
+- latency:    app/image_handler/scheduler.py, few workers with many threads
+- throughput: app/image_handler/scheduler.py, one single-threaded worker per core
+and reports the latency percentiles and the throughput of each.
+
+The detector is the colour detector of benchmarks/check_equivalence.py unless
+--detector yolo is given (needs ultralytics and the model weights).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scheduler --requests 60 --concurrency 8
+    python -m benchmarks.bench_scheduler --modes latency,throughput --affinity
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.image_handler.scheduler import MeasurementScheduler, available_cores  # noqa: E402
+from benchmarks.check_equivalence import SyntheticDetector, synthetic_corpus  # noqa: E402
+
+
+def analyse(image_bytes: bytes, view: str, detector: str) -> float:
+    """Calibrate, detect and measure one view like measure_images(); returns the elapsed seconds."""
+    from app.image_handler import detection
+    from app.image_handler.engine import _VIEW_DIMENSIONS, ViewAnalysis
+
+    if detector == "synthetic":
+        detection._models[view] = SyntheticDetector()
+    start = time.perf_counter()
+    analysis = ViewAnalysis(image_bytes, view)
+    for index in range(len(analysis.boxes)):
+        for dimension in _VIEW_DIMENSIONS[view]:
+            analysis.measure(dimension, index)
+    return time.perf_counter() - start
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+async def _load(scheduler: MeasurementScheduler, images, requests: int, concurrency: int, detector: str):
+    """Keep *concurrency* requests in flight until *requests* completed; returns (latencies, seconds)."""
+    latencies = []
+    pending = iter(range(requests))
+
+    async def client():
+        for index in pending:
+            image_bytes, view = images[index % len(images)]
+            start = time.perf_counter()
+            await scheduler.run(analyse, image_bytes, view, detector)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def main(modes, requests: int, concurrency: int, cores, affinity: bool, detector: str) -> None:
+    directory = tempfile.mkdtemp(prefix="bench_scheduler_")
+    images = []
+    for entry in synthetic_corpus(directory, 8):
+        with open(os.path.join(directory, entry["image"]), "rb") as f:
+            images.append((f.read(), entry["view"]))
+
+    print(f"Cores: {len(cores)}, requests: {requests}, concurrency: {concurrency}, detector: {detector}")
+    for mode in modes:
+        scheduler = MeasurementScheduler("" if mode == "thread" else mode, affinity=affinity, cores=cores)
+        scheduler.start()
+        split = f"{len(scheduler.core_sets)} workers x {len(scheduler.core_sets[0])} threads" if scheduler.core_sets else "1 process"
+        # One pass over the images first: imports, models and OpenCV pools are warm for every worker
+        asyncio.run(_load(scheduler, images, max(len(images), len(scheduler.core_sets)), concurrency, detector))
+        single, _ = asyncio.run(_load(scheduler, images, len(images), 1, detector))
+        latencies, elapsed = asyncio.run(_load(scheduler, images, requests, concurrency, detector))
+        scheduler.stop()
+        print(f"{mode:>10} ({split}):")
+        print(f"  alone:  median {statistics.median(single) * 1000:7.1f} ms")
+        print(f"  loaded: p50 {_percentile(latencies, 0.5) * 1000:7.1f} ms, "
+              f"p99 {_percentile(latencies, 0.99) * 1000:7.1f} ms, "
+              f"{requests / elapsed:5.1f} views/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", default="thread,latency,throughput")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cores", type=int, default=0, help="Use only the first N available cores")
+    parser.add_argument("--affinity", action="store_true", help="Pin workers to their cores")
+    parser.add_argument("--detector", choices=("synthetic", "yolo"), default="synthetic")
+    args = parser.parse_args()
+    cores = available_cores()[: args.cores or None]
+    main(args.modes.split(","), args.requests, args.concurrency, cores, args.affinity, args.detector)
@@ -0,0 +1,439 @@
+"""
+Equivalence check: measurement scripts vs. in-memory engine.
+
+Runs every image of a corpus through the legacy scripts (Main2Bottom.py and
+Main4High.py for bottom views, Main7BottomWidthBETTER.py for side views) and
+through app/image_handler/engine.ViewAnalysis, and diffs every intermediate:
+homography, px/cm x and y, grid lines xs/ys, detected boxes and the final
+width, height and depth in mm. Exits non-zero when any difference exceeds
+its tolerance.
+
+The scripts run in-process with their own code; only two top-level
+statements are replaced: the ultralytics import and the model file check. Both pipelines get the same detector:
+- yolo:      the engine's YOLO weights (needs ultralytics)
+- replay:    boxes recorded in the corpus manifest (warped image coordinates)
+- synthetic: finds the pieces of --synthetic images by their colour
+
+Corpus: a directory of JPEG/PNG images, optionally with corpus.json,
+    [{"image": "a.jpg", "view": "bottom", "boxes": [[x1, y1, x2, y2, conf, cls], ...]}, ...]
+Without a manifest every image is checked as a bottom and as a side view.
+The engine runs with detection gating and tiling off, as the scripts have
+neither; --set KEY=VALUE overrides engine settings to check an optimization
+(e.g. --set MEASURE_SUBPIXEL_EDGES=1 --tolerance-mm 2). With
+--set CALIBRATION_REUSE=1 every view is analysed twice and the second
+analysis, which reuses the first one's grid calibration (and with
+MEASURE_WARP_REGIONS=1 unwarps only the measured regions), is compared.
+
+Usage (from the backend directory):
+    python -m benchmarks.check_equivalence --synthetic 10
+    python -m benchmarks.check_equivalence --corpus path/to/images --json report.json
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config  # noqa: E402
+from app.image_handler import detection  # noqa: E402
+from app.image_handler.main import SCRIPT_DIR, _parse_measurement_value  # noqa: E402
+
+# Script, dimension and the line of its output holding the final value
+VIEW_SCRIPTS = {
+    "bottom": (
+        ("Main2Bottom.py", "width", r"Finale Unterseiten-Breite:\s*([0-9.]+)"),
+        ("Main4High.py", "height", r"Finale Höhe:\s*([0-9.]+)"),
+    ),
+    "side": (("Main7BottomWidthBETTER.py", "depth", r"Finale Unterseiten-Breite:\s*([0-9.]+)"),),
+}
+
+# The scripts have no gating or tiling; the engine is compared on equal terms
+REFERENCE_SETTINGS = {
+    "DETECTION_CLASSES": [],
+    "DETECTION_MIN_AREA_CM2": 0.0,
+    "DETECTION_TOP_K": 0,
+    "DETECTION_TILE_SIZE": 0,
+    "MEASURE_SUBPIXEL_EDGES": False,
+    "MEASURE_WARP_REGIONS": False,
+    "CALIBRATION_REUSE": False,
+}
+
+PIECE_BGR = (90, 90, 100)
+
+
+@dataclass
+class Tolerances:
+    homography: float = 1e-6
+    px_per_cm: float = 1e-6
+    grid_px: float = 0.0
+    box_px: float = 0.0
+    mm: float = 0.0
+
+
+# ---------------------------------------------------------------------------
+# Detectors shared by both pipelines (the subset of the ultralytics API they use)
+# ---------------------------------------------------------------------------
+
+
+class _Tensor(np.ndarray):
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+class _Boxes:
+    def __init__(self, rows: np.ndarray):
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        self.xyxy = rows[:, :4].view(_Tensor)
+        self.conf = rows[:, 4].view(_Tensor)
+        self.cls = rows[:, 5].view(_Tensor)
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return _Boxes(self._rows[index : index + 1])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class _Result:
+    def __init__(self, rows):
+        self.boxes = _Boxes(rows)
+
+
+class ReplayDetector:
+    """Returns recorded boxes, whatever the image."""
+
+    def __init__(self, boxes: List[List[float]]):
+        rows = [list(box[:4]) + list(box[4:6]) + [1.0, 0.0][len(box[4:6]):] for box in boxes]
+        self.rows = np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+    def __call__(self, image, **kwargs):
+        return [_Result(self.rows)]
+
+
+class SyntheticDetector:
+    """Finds the pieces rendered by synthetic_corpus() by their colour."""
+
+    def __call__(self, image, **kwargs):
+        mask = (np.abs(image.astype(np.int16) - PIECE_BGR).max(axis=2) < 30).astype(np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        rows = [
+            [x, y, x + w, y + h, 0.9, 0.0]
+            for x, y, w, h, area in stats[1:count]
+            if area > 400
+        ]
+        return [_Result(np.array(rows, dtype=np.float64))]
+
+
+def yolo_detector(view: str):
+    return detection.get_model(view)
+
+
+# ---------------------------------------------------------------------------
+# Pipelines
+# ---------------------------------------------------------------------------
+
+
+def _script_code(name: str):
+    """The script's code with the imports/checks the harness replaces removed."""
+    path = SCRIPT_DIR / name
+    tree = ast.parse(path.read_text(encoding="utf-8"), str(path))
+    body = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == "ultralytics":
+            continue
+        if isinstance(node, ast.If) and "model_path" in ast.unparse(node.test):
+            continue
+        body.append(node)
+    return compile(ast.Module(body, []), str(path), "exec")
+
+
+def _boxes_by_area(xyxy) -> List[List[int]]:
+    boxes = [[int(v) for v in box] for box in np.asarray(xyxy).reshape(-1, 4)]
+    return sorted(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+
+
+def run_script(name: str, pattern: str, image_path: str, detector, workdir: str) -> Dict:
+    """Run one measurement script in-process and collect its intermediates."""
+    namespace = {"__name__": "__main__", "__file__": str(SCRIPT_DIR / name), "YOLO": lambda path: detector}
+    output = io.StringIO()
+    argv, cwd = sys.argv, os.getcwd()
+    sys.path.insert(0, str(SCRIPT_DIR))
+    try:
+        sys.argv = [name, image_path]
+        os.chdir(workdir)  # debug images are written to the working directory
+        with contextlib.redirect_stdout(output):
+            exec(_script_code(name), namespace)
+    finally:
+        sys.argv = argv
+        os.chdir(cwd)
+        sys.path.remove(str(SCRIPT_DIR))
+    xyxy = [result.boxes.xyxy.cpu().numpy() for result in namespace["results"]]
+    return {
+        "homography": np.asarray(namespace["homography_matrix"], dtype=np.float64),
+        "px_per_cm_x": namespace["px_per_cm_x"],
+        "px_per_cm_y": namespace["px_per_cm_y"],
+        "xs": list(namespace["xs"]),
+        "ys": list(namespace["ys"]),
+        "boxes": _boxes_by_area(np.concatenate(xyxy) if xyxy else []),
+        "value_mm": _mm(_parse_measurement_value(pattern, output.getvalue())),
+    }
+
+
+def run_engine(image_bytes: bytes, view: str, dimension: str, analysis=None) -> Dict:
+    """
+    Run the engine's view analysis (reused across dimensions of a view) and measure *dimension*.
+    With CALIBRATION_REUSE the analysis follows a first one that stores the calibration.
+    """
+    from app.image_handler.engine import ViewAnalysis
+
+    stages = {}
+    if analysis is None:
+        if Config.CALIBRATION_REUSE:
+            ViewAnalysis(image_bytes, view)
+        analysis = ViewAnalysis(image_bytes, view, lambda stage, data: stages.setdefault(stage, data))
+    value_cm = analysis.measure(dimension, 0)
+    return {
+        "analysis": analysis,
+        "calibration_reused": stages["calibrated"]["reused"] if stages else None,
+        "homography": np.asarray(analysis.homography, dtype=np.float64),
+        "px_per_cm_x": analysis.px_per_cm_x,
+        "px_per_cm_y": analysis.px_per_cm_y,
+        "xs": list(analysis.xs),
+        "ys": list(analysis.ys),
+        "boxes": _boxes_by_area([box[:4] for box in analysis.boxes]),
+        "value_mm": _mm(value_cm),
+    }
+
+
+def _mm(value_cm: Optional[float]) -> Optional[float]:
+    return round(value_cm * 10, 3) if value_cm is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+
+def _max_difference(a, b) -> Optional[float]:
+    """Largest element difference, None when the shapes differ."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if a.shape != b.shape:
+        return None
+    return float(np.abs(a - b).max()) if a.size else 0.0
+
+
+def compare(legacy: Dict, engine: Dict, tolerances: Tolerances) -> List[Dict]:
+    checks = [
+        ("homography", legacy["homography"], engine["homography"], tolerances.homography),
+        ("px_per_cm_x", legacy["px_per_cm_x"], engine["px_per_cm_x"], tolerances.px_per_cm),
+        ("px_per_cm_y", legacy["px_per_cm_y"], engine["px_per_cm_y"], tolerances.px_per_cm),
+        ("xs", legacy["xs"], engine["xs"], tolerances.grid_px),
+        ("ys", legacy["ys"], engine["ys"], tolerances.grid_px),
+        ("boxes", legacy["boxes"], engine["boxes"], tolerances.box_px),
+    ]
+    results = []
+    for name, expected, actual, tolerance in checks:
+        difference = _max_difference(expected, actual)
+        results.append({
+            "check": name,
+            "passed": difference is not None and difference <= tolerance,
+            "difference": difference,
+            "legacy": expected if not isinstance(expected, np.ndarray) else expected.round(6).tolist(),
+            "engine": actual if not isinstance(actual, np.ndarray) else actual.round(6).tolist(),
+        })
+    expected, actual = legacy["value_mm"], engine["value_mm"]
+    difference = abs(expected - actual) if expected is not None and actual is not None else None
+    results.append({
+        "check": "value_mm",
+        "passed": difference <= tolerances.mm if difference is not None else expected == actual,
+        "difference": difference,
+        "legacy": expected,
+        "engine": actual,
+    })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+
+def synthetic_corpus(directory: str, count: int, seed: int = 0) -> List[Dict]:
+    """Render *count* grid sheets with one or two pieces, under perspective, as JPEGs."""
+    rng = np.random.default_rng(seed)
+    entries = []
+    for index in range(count):
+        cell = int(rng.integers(36, 48))
+        sheet = np.full((20 * cell, 20 * cell, 3), 235, np.uint8)
+        for position in range(0, sheet.shape[0], cell):
+            cv2.line(sheet, (position, 0), (position, sheet.shape[0] - 1), (40, 40, 40), 2)
+            cv2.line(sheet, (0, position), (sheet.shape[1] - 1, position), (40, 40, 40), 2)
+        for piece in range(int(rng.integers(1, 3))):
+            w, h = (int(v) * cell // 2 for v in rng.integers(4, 11, 2))
+            x, y = int(rng.integers(cell, 9 * cell)) + piece * 9 * cell, int(rng.integers(cell, sheet.shape[0] - h - cell))
+            cv2.rectangle(sheet, (x, y), (min(x + w, sheet.shape[1] - cell), y + h), PIECE_BGR, -1)
+
+        frame_w, frame_h = 1280, 960
+        size = sheet.shape[0] - 1
+        jitter = rng.uniform(-40, 40, (4, 2))
+        target = np.float32([[220, 60], [1060, 60], [1060, 900], [220, 900]]) + jitter.astype(np.float32)
+        matrix = cv2.getPerspectiveTransform(np.float32([[0, 0], [size, 0], [size, size], [0, size]]), target)
+        frame = cv2.warpPerspective(sheet, matrix, (frame_w, frame_h), borderValue=(25, 25, 25))
+        frame = np.clip(frame + rng.normal(0, 3, frame.shape), 0, 255).astype(np.uint8)
+
+        name = f"synthetic_{index:03d}.jpg"
+        cv2.imwrite(os.path.join(directory, name), frame, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        entries.append({"image": name, "view": "bottom" if index % 2 == 0 else "side"})
+    return entries
+
+
+def load_corpus(directory: str) -> List[Dict]:
+    manifest = os.path.join(directory, "corpus.json")
+    if os.path.isfile(manifest):
+        with open(manifest, encoding="utf-8") as f:
+            return json.load(f)
+    images = sorted(name for name in os.listdir(directory) if name.lower().endswith((".jpg", ".jpeg", ".png")))
+    return [{"image": name, "view": view} for name in images for view in ("bottom", "side")]
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def _detector_for(entry: Dict, kind: str, view: str):
+    if kind == "replay":
+        if "boxes" not in entry:
+            raise ValueError(f"{entry['image']}: no recorded boxes for the replay detector")
+        return ReplayDetector(entry["boxes"])
+    if kind == "synthetic":
+        return SyntheticDetector()
+    return yolo_detector(view)
+
+
+def check_corpus(directory: str, entries: List[Dict], detector: str, tolerances: Tolerances) -> List[Dict]:
+    report = []
+    workdir = tempfile.mkdtemp(prefix="equivalence_")
+    for entry in entries:
+        path = os.path.join(directory, entry["image"])
+        view = entry["view"]
+        with open(path, "rb") as f:
+            image_bytes = f.read()
+        model = _detector_for(entry, detector, view)
+        previous = detection._models.get(view)
+        detection._models[view] = model
+        analysis, reused = None, None
+        try:
+            for script, dimension, pattern in VIEW_SCRIPTS[view]:
+                record = {"image": entry["image"], "view": view, "script": script, "dimension": dimension}
+                try:
+                    legacy = run_script(script, pattern, path, model, workdir)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        engine = run_engine(image_bytes, view, dimension, analysis)
+                    analysis = engine["analysis"]
+                    reused = engine["calibration_reused"] if engine["calibration_reused"] is not None else reused
+                    record["calibration_reused"] = reused
+                    record["checks"] = compare(legacy, engine, tolerances)
+                    record["passed"] = all(check["passed"] for check in record["checks"])
+                except Exception as e:
+                    record.update(checks=[], passed=False, error=f"{type(e).__name__}: {e}")
+                report.append(record)
+        finally:
+            if previous is None:
+                detection._models.pop(view, None)
+            else:
+                detection._models[view] = previous
+    return report
+
+
+def _apply_settings(overrides: List[str]) -> None:
+    settings = dict(REFERENCE_SETTINGS)
+    for override in overrides:
+        key, _, value = override.partition("=")
+        if not hasattr(Config, key):
+            raise SystemExit(f"Unknown setting: {key}")
+        current = getattr(Config, key)
+        if isinstance(current, bool):
+            settings[key] = value.lower() in ("1", "true", "yes")
+        elif isinstance(current, list):
+            settings[key] = [int(v) for v in value.split(",") if v.strip()]
+        else:
+            settings[key] = type(current)(value)
+    for key, value in settings.items():
+        setattr(Config, key, value)
+
+
+def _print_report(report: List[Dict]) -> None:
+    for record in report:
+        status = "PASS" if record["passed"] else "FAIL"
+        reused = " (calibration reused)" if record.get("calibration_reused") else ""
+        print(f"{status} {record['image']} [{record['view']}] {record['script']} ({record['dimension']}){reused}")
+        if "error" in record:
+            print(f"     error: {record['error']}")
+        for check in record["checks"]:
+            if not check["passed"]:
+                print(f"     {check['check']}: difference {check['difference']}  "
+                      f"legacy {check['legacy']}  engine {check['engine']}")
+    passed = sum(record["passed"] for record in report)
+    print(f"\n{passed}/{len(report)} script runs equivalent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="Directory of recorded images (optionally with corpus.json)")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Render N synthetic images")
+    parser.add_argument("--detector", choices=("yolo", "replay", "synthetic"),
+                        help="Default: synthetic for --synthetic, replay with recorded boxes, else yolo")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override an engine setting")
+    parser.add_argument("--tolerance-homography", type=float, default=Tolerances.homography)
+    parser.add_argument("--tolerance-px-per-cm", type=float, default=Tolerances.px_per_cm)
+    parser.add_argument("--tolerance-grid-px", type=float, default=Tolerances.grid_px)
+    parser.add_argument("--tolerance-box-px", type=float, default=Tolerances.box_px)
+    parser.add_argument("--tolerance-mm", type=float, default=Tolerances.mm)
+    parser.add_argument("--json", help="Write the full report to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        corpus_dir = tempfile.mkdtemp(prefix="equivalence_corpus_")
+        corpus = synthetic_corpus(corpus_dir, args.synthetic)
+        detector_kind = args.detector or "synthetic"
+    else:
+        corpus_dir = args.corpus
+        corpus = load_corpus(corpus_dir)
+        detector_kind = args.detector or ("replay" if all("boxes" in entry for entry in corpus) else "yolo")
+    _apply_settings(args.set)
+    tolerances = Tolerances(
+        homography=args.tolerance_homography,
+        px_per_cm=args.tolerance_px_per_cm,
+        grid_px=args.tolerance_grid_px,
+        box_px=args.tolerance_box_px,
+        mm=args.tolerance_mm,
+    )
+
+    print(f"Corpus: {corpus_dir} ({len(corpus)} images), detector: {detector_kind}")
+    results = check_corpus(corpus_dir, corpus, detector_kind, tolerances)
+    _print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=float)
+    sys.exit(0 if all(record["passed"] for record in results) else 1)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import the app package as "app" when pytest runs from the backend directory or the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,129 @@
+"""CameraClient against the fake ESP32 (app/cameras/fake_esp32.py)."""
+
+import asyncio
+
+import pytest
+
+from app.cameras.client import CameraClient, CameraError
+from app.cameras.fake_esp32 import FakeEsp32
+from app.cameras.health import CameraHealth
+
+
+def _client(url: str, **kwargs) -> CameraClient:
+    kwargs.setdefault("backoff", 0.01)
+    kwargs.setdefault("health", CameraHealth("cam1", failure_threshold=3, reset_timeout=15.0))
+    return CameraClient("cam1", url, **kwargs)
+
+
+def test_operation_timeouts():
+    async def scenario():
+        async with FakeEsp32(latency=0.3) as camera:
+            client = _client(camera.url, timeouts={"ping": 0.1, "capture": 2.0}, retries=0)
+            try:
+                with pytest.raises(CameraError):
+                    await client.ping()
+                assert await client.capture() == camera.image
+            finally:
+                await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_retries_are_bounded():
+    async def scenario():
+        async with FakeEsp32() as camera:
+            client = _client(camera.url, retries=2)
+            try:
+                camera.fail_next = 2
+                assert await client.capture() == camera.image
+                assert camera.requests == 3
+
+                camera.fail_next, camera.requests = 10, 0
+                with pytest.raises(CameraError, match="503"):
+                    await client.capture()
+                assert camera.requests == 3
+            finally:
+                await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_trigger_not_retried_after_reaching_camera():
+    async def scenario():
+        async with FakeEsp32() as camera:
+            client = _client(camera.url, retries=2)
+            try:
+                camera.fail_next = 1
+                with pytest.raises(CameraError):
+                    await client.trigger()
+                assert camera.requests == 1
+            finally:
+                await client.aclose()
+
+        async with FakeEsp32(latency=0.3) as camera:
+            client = _client(camera.url, timeouts={"trigger": 0.1}, retries=2)
+            try:
+                with pytest.raises(CameraError):
+                    await client.trigger()
+                await asyncio.sleep(0.05)
+                assert camera.requests == 1
+            finally:
+                await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_trigger_retried_on_connect_errors():
+    async def scenario():
+        camera = await FakeEsp32().start()
+        url = camera.url
+        await camera.stop()  # nothing listens on the port any more
+        client = _client(url, retries=2)
+        sleeps = []
+
+        async def count_sleep(attempt: int) -> None:
+            sleeps.append(attempt)
+
+        client._sleep_before_retry = count_sleep
+        try:
+            with pytest.raises(CameraError):
+                await client.trigger()
+            assert sleeps == [0, 1]
+        finally:
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_one_breaker_failure_per_request():
+    async def scenario():
+        async with FakeEsp32() as camera:
+            client = _client(camera.url, retries=2)
+            try:
+                camera.fail_next = 10
+                with pytest.raises(CameraError):
+                    await client.capture()
+                assert camera.requests == 3
+                assert client.health.breaker.failures == 1
+                assert client.health.breaker.state == client.health.breaker.CLOSED
+            finally:
+                await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_connection_reuse():
+    async def scenario():
+        async with FakeEsp32() as camera:
+            client = _client(camera.url)
+            try:
+                for _ in range(5):
+                    await client.capture()
+                await client.trigger()
+                await client.fetch_captured()
+                assert camera.requests == 7
+                assert camera.connections == 1
+            finally:
+                await client.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+"""Detection with a shared per-view model (app/image_handler/detection.py)."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.image_handler import detection
+
+
+class _Array(np.ndarray):
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+class _Boxes:
+    def __init__(self):
+        self.xyxy = np.array([[10.0, 10.0, 50.0, 40.0]]).view(_Array)
+        self.conf = np.array([0.9]).view(_Array)
+        self.cls = np.array([0.0]).view(_Array)
+
+
+class _Result:
+    boxes = _Boxes()
+
+
+class RecordingModel:
+    """Fake model that records how many calls overlap, like a shared ultralytics predictor would."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, source, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        return [_Result() for _ in source] if isinstance(source, list) else [_Result()]
+
+
+def test_model_calls_are_serialized_per_view(monkeypatch):
+    model = RecordingModel()
+    monkeypatch.setitem(detection._models, "bottom", model)
+    image = np.zeros((120, 160, 3), np.uint8)
+    tiling = detection.Tiling(size=64, batch=2)
+
+    def run(index):
+        return detection.detect(image, "bottom", tiling=tiling if index % 2 else None)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(run, range(16)))
+
+    assert all(boxes for boxes in results)
+    assert model.calls > 16
+    assert model.max_active == 1
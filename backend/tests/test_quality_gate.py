@@ -0,0 +1,43 @@
+"""Quality gate of the measurement engine (app/image_handler/engine.py)."""
+
+import pytest
+
+from app.cameras.fake_esp32 import blurred_frame, synthetic_frame
+from app.config import Config
+from app.image_handler import engine
+
+
+@pytest.fixture
+def analysed(monkeypatch):
+    """Views that reached the analysis; the analysis itself fails right away."""
+    views = []
+
+    def analysis(data, view, progress):
+        views.append(view)
+        raise ValueError("not analysed in this test")
+
+    monkeypatch.setattr(engine, "ml_dependencies_available", lambda: True)
+    monkeypatch.setattr(engine, "ViewAnalysis", analysis)
+    return views
+
+
+def _measure(monkeypatch, enforced):
+    monkeypatch.setattr(Config, "QUALITY_GATE_ENABLED", enforced)
+    events = []
+    engine.measure_images(
+        synthetic_frame(), blurred_frame(synthetic_frame(), radius=12), lambda stage, data: events.append((stage, data))
+    )
+    return {data["view"]: data for stage, data in events if stage == "quality"}
+
+
+def test_failing_image_only_warns_when_gate_is_off(monkeypatch, analysed):
+    reports = _measure(monkeypatch, enforced=False)
+    assert reports["bottom"]["ok"] and not reports["side"]["ok"]
+    assert not reports["side"]["enforced"]
+    assert analysed == ["bottom", "side"]
+
+
+def test_failing_image_is_rejected_when_gate_is_enforced(monkeypatch, analysed):
+    reports = _measure(monkeypatch, enforced=True)
+    assert reports["side"]["code"] == "blurry" and reports["side"]["enforced"]
+    assert analysed == ["bottom"]
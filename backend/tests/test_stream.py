@@ -0,0 +1,113 @@
+"""MJPEG stream ingestion (app/cameras/stream.py) against the fake ESP32."""
+
+import asyncio
+import time
+
+from app.cameras.fake_esp32 import FakeEsp32, synthetic_frame
+from app.cameras.stream import CameraStream, CameraStreams, Frame, iter_mjpeg_frames, sharpest_pair
+
+BOUNDARY = b"--123456789000000000000987654321"
+
+
+def _multipart(frames, content_length: bool) -> bytes:
+    parts = []
+    for data in frames:
+        headers = b"Content-Type: image/jpeg\r\n"
+        if content_length:
+            headers += b"Content-Length: %d\r\n" % len(data)
+        parts.append(BOUNDARY + b"\r\n" + headers + b"\r\n" + data + b"\r\n")
+    return b"".join(parts)
+
+
+async def _chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _parse(stream: bytes, chunk_size: int):
+    async def collect():
+        return [frame async for frame in iter_mjpeg_frames(_chunked(stream, chunk_size))]
+
+    return asyncio.run(collect())
+
+
+def _jpegs():
+    return [synthetic_frame(160, 120, 20, piece=True, piece_offset=offset) for offset in (0, 20, 40)]
+
+
+def test_mjpeg_with_content_length():
+    frames = _jpegs()
+    for chunk_size in (7, 1000, 1 << 20):
+        assert _parse(_multipart(frames, content_length=True), chunk_size) == frames
+
+
+def test_mjpeg_without_content_length():
+    frames = _jpegs()
+    for chunk_size in (7, 1000, 1 << 20):
+        assert _parse(_multipart(frames, content_length=False), chunk_size) == frames
+
+
+def test_ring_buffer_keeps_the_newest_frames():
+    async def scenario():
+        async with FakeEsp32(fps=50) as camera:
+            stream = CameraStream("cam1", camera.url + "/stream", buffer_size=4)
+            stream.start()
+            try:
+                deadline = time.monotonic() + 5
+                while camera.frames_streamed < 12 and time.monotonic() < deadline:
+                    await asyncio.sleep(0.02)
+                await asyncio.sleep(0.05)
+            finally:
+                await stream.stop()
+            assert camera.frames_streamed >= 12
+            assert len(stream.frames) == 4
+            seqs = [frame.seq for frame in stream.frames]
+            assert seqs == list(range(seqs[0], seqs[0] + 4))
+            assert seqs[-1] >= 10
+
+    asyncio.run(scenario())
+
+
+def _frame(timestamp: float, sharpness: float, seq: int = 0) -> Frame:
+    return Frame(b"", timestamp, seq, _sharpness=sharpness)
+
+
+def test_pairing_respects_max_skew():
+    front = [_frame(0.00, 10.0, 1), _frame(0.10, 100.0, 2), _frame(0.20, 20.0, 3)]
+    side = [_frame(0.01, 10.0, 1), _frame(0.25, 30.0, 3)]
+
+    # The sharpest front frame has no side frame within 20 ms
+    front_frame, side_frame = sharpest_pair(front, side, max_skew=0.02)
+    assert (front_frame.seq, side_frame.seq) == (1, 1)
+    # With a looser limit it pairs with its nearest side frame
+    front_frame, side_frame = sharpest_pair(front, side, max_skew=0.2)
+    assert (front_frame.seq, side_frame.seq) == (2, 1)
+    assert sharpest_pair(front, [_frame(1.0, 50.0)], max_skew=0.1) is None
+    assert sharpest_pair(front, [], max_skew=0.1) is None
+
+
+def test_blurred_frames_are_skipped():
+    async def scenario():
+        async with FakeEsp32(fps=30, blur_ratio=0.5, seed=1) as front, FakeEsp32(fps=30, blur_ratio=0.5, seed=2) as side:
+            streams = CameraStreams(
+                {
+                    "cam1": CameraStream("cam1", front.url + "/stream", buffer_size=16),
+                    "cam2": CameraStream("cam2", side.url + "/stream", buffer_size=16),
+                },
+                max_age=5.0,
+                max_skew=0.1,
+            )
+            streams.start()
+            try:
+                deadline = time.monotonic() + 5
+                while min(len(streams["cam1"].frames), len(streams["cam2"].frames)) < 12 and time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                buffered = [frame.data for name in ("cam1", "cam2") for frame in streams[name].frames]
+                pair = await streams.capture_pair()
+            finally:
+                await streams.stop()
+            # The buffers hold blurred frames, but the chosen pair is sharp
+            assert any(data != front.image for data in buffered)
+            assert pair == (front.image, side.image)
+
+    asyncio.run(scenario())
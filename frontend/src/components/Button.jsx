@@ -1,11 +1,16 @@
 import React from 'react'
 
-const Button = ({text, onClick, wFull=false}) => {
+const Button = ({text, onClick, wFull=false, disabled=false, title}) => {
   return (
-    <button onClick={onClick} className={`bg-cyan-600 text-white text-2xl rounded-full px-10 py-3 cursor-pointer hover:-translate-y-1 hover:shadow-md hover:bg-cyan-700 active:bg-cyan-500 transition-all duration-200 ${wFull ? "w-full" : ""}`}>
+    <button
+      onClick={onClick}
+      disabled={disabled}
+      title={title}
+      className={`text-white text-2xl rounded-full px-10 py-3 transition-all duration-200 ${disabled ? "bg-gray-400 cursor-not-allowed" : "bg-cyan-600 cursor-pointer hover:-translate-y-1 hover:shadow-md hover:bg-cyan-700 active:bg-cyan-500"} ${wFull ? "w-full" : ""}`}
+    >
         {text}
     </button>
   )
 }
 
-export default Button
\ No newline at end of file
+export default Button
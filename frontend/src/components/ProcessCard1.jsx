@@ -3,12 +3,15 @@ import Button from './Button'
 import { useMeasurementsStore } from '../stores/useMeasurementsStore'
 import { useProcessStore } from '../stores/useProcessStore'
 import { useDualEsp32Store } from '../stores/useDualEsp32Store'
+import { useCameraHealthStore, usePollCameraHealth } from '../stores/useCameraHealthStore'
 import { compressImage, formatFileSize, isValidImageFile } from '../utils/imageCompression'
 
 const ProcessCard1 = () => {
   const { getMeasurements, updateMeasurements } = useMeasurementsStore();
   const { nextStep } = useProcessStore();
-  const { capture } = useDualEsp32Store();
+  const { capture, loading } = useDualEsp32Store();
+  const { available: camerasAvailable } = useCameraHealthStore();
+  usePollCameraHealth();
   const [image1, setImage1] = React.useState(null);
   const [image2, setImage2] = React.useState(null);
   const [preview1, setPreview1] = React.useState(null);
@@ -28,11 +31,15 @@ const ProcessCard1 = () => {
   const handleDualClick = async () => {
     const result = await capture();
     if (result && result.images) {
-      const download = (b64, name) => {
+      const download = async (url, name) => {
+        // The images are served by the API origin, so fetch them to honour the file name
+        const response = await fetch(url);
+        const objectUrl = URL.createObjectURL(await response.blob());
         const link = document.createElement('a');
-        link.href = `data:image/jpeg;base64,${b64}`;
+        link.href = objectUrl;
         link.download = name;
         link.click();
+        setTimeout(() => URL.revokeObjectURL(objectUrl), 1000);
       };
       if (result.images.front) download(result.images.front, 'front.jpg');
       if (result.images.side) download(result.images.side, 'side.jpg');
@@ -147,7 +154,13 @@ const ProcessCard1 = () => {
             </div>
             <div className="justify-center w-full items-center flex flex-col gap-4 my-20">
               <Button onClick={handleClick} text="Take Measurements"/>
-              <Button onClick={handleDualClick} text="Koordinierte Messung starten"/>
+              <Button
+                onClick={handleDualClick}
+                text="Koordinierte Messung starten"
+                disabled={!camerasAvailable || loading}
+                title={camerasAvailable ? undefined : 'A camera is unreachable'}
+              />
+              {!camerasAvailable && <p className="text-red-600 text-sm">A camera is unreachable. Coordinated capture is disabled until it is back online.</p>}
             </div>
         </div>
     </div>
@@ -1,10 +1,42 @@
 import React, { useEffect } from 'react'
-import { LoaderCircle } from 'lucide-react'
+import { Check, LoaderCircle } from 'lucide-react'
 import { useMeasurementsStore } from '../stores/useMeasurementsStore'
 import { useProcessStore } from '../stores/useProcessStore'
 
+const STAGES = [
+  ['uploaded', 'Images uploaded'],
+  ['quality', 'Image quality checked'],
+  ['decoded', 'Images decoded'],
+  ['calibrated', 'Grid calibrated'],
+  ['detected', 'Piece detected'],
+  ['measured', 'Dimensions measured'],
+  ['saved', 'Saved to inventory'],
+];
+
+// One line of partial result per stage event, e.g. "bottom: 41.2 px/cm"
+const describe = (event) => {
+  switch (event.stage) {
+    case 'quality':
+      return `${event.view}: ${event.ok ? 'ok' : event.message}`;
+    case 'decoded':
+      return `${event.view}: ${event.width}×${event.height} px`;
+    case 'calibrated':
+      return `${event.view}: ${event.px_per_cm} px/cm${event.reused ? ' (reused)' : ''}`;
+    case 'detected':
+      return `${event.view}: ${event.objects} object(s)`;
+    case 'measured':
+      return `${event.object > 1 ? `object ${event.object} ` : ''}${event.dimension}: ${event.value_mm} mm`;
+    case 'saved':
+      return event.inventory_item_ids.length
+        ? `item${event.inventory_item_ids.length > 1 ? 's' : ''} ${event.inventory_item_ids.map((id) => `#${id}`).join(', ')}`
+        : 'not saved';
+    default:
+      return null;
+  }
+};
+
 const ProcessCard2 = () => {
-  const { loading, measurements } = useMeasurementsStore();
+  const { loading, measurements, events } = useMeasurementsStore();
   const { nextStep } = useProcessStore();
 
   useEffect(() => {
@@ -27,9 +59,24 @@ const ProcessCard2 = () => {
               </div> 
             )}
             {loading && !measurements && (
-              <div className="justify-center w-full items-center flex my-20">
-                <LoaderCircle className='animate-spin size-20 text-gray-800'/>
-              </div> 
+              <div className="w-full flex flex-col gap-2 my-10 px-10">
+                {STAGES.map(([stage, label]) => {
+                  const stageEvents = events.filter((event) => event.stage === stage);
+                  return (
+                    <div key={stage} className="flex flex-row items-start gap-3">
+                      {stageEvents.length
+                        ? <Check className="size-6 text-cyan-600 shrink-0"/>
+                        : <LoaderCircle className="animate-spin size-6 text-gray-300 shrink-0"/>}
+                      <div className="flex flex-col">
+                        <p className={stageEvents.length ? 'text-gray-800' : 'text-gray-400'}>{label}</p>
+                        {stageEvents.map(describe).filter(Boolean).map((text, index) => (
+                          <p key={index} className="text-sm text-gray-500">{text}</p>
+                        ))}
+                      </div>
+                    </div>
+                  );
+                })}
+              </div>
             )}
             {measurements && (
               <div className="justify-center w-full items-center flex flex-col text-center my-20 gap-3">
@@ -1,10 +1,13 @@
 import React from 'react';
 import Button from '../components/Button';
 import { useEsp32ImageStore } from '../stores/useEsp32ImageStore';
+import { useCameraHealthStore, usePollCameraHealth } from '../stores/useCameraHealthStore';
 import { LoaderCircle } from 'lucide-react';
 
 const Capture = () => {
     const { images, loading, capture } = useEsp32ImageStore();
+    const { available } = useCameraHealthStore();
+    usePollCameraHealth();
 
     const handleCapture = () => {
         capture();
@@ -12,17 +15,23 @@ const Capture = () => {
 
     return (
         <div className="flex flex-col items-center my-10 gap-5">
-            <Button text="Capture Images" onClick={handleCapture} />
+            <Button
+                text="Capture Images"
+                onClick={handleCapture}
+                disabled={!available || loading}
+                title={available ? undefined : 'A camera is unreachable'}
+            />
+            {!available && <p className="text-red-600">A camera is unreachable. Capturing is disabled until it is back online.</p>}
             {loading && <LoaderCircle className="animate-spin size-20 text-gray-800" />}
             {images && !loading && (
                 <div className="flex gap-5 mt-5 flex-wrap justify-center">
                     <img
-                        src={`data:image/jpeg;base64,${images.front}`}
+                        src={images.front}
                         alt="Front"
                         className="w-60 h-60 object-contain border"
                     />
                     <img
-                        src={`data:image/jpeg;base64,${images.side}`}
+                        src={images.side}
                         alt="Side"
                         className="w-60 h-60 object-contain border"
                     />
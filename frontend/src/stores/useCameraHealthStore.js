@@ -0,0 +1,30 @@
+import React from 'react';
+import { create } from 'zustand';
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5001';
+
+export const useCameraHealthStore = create((set) => ({
+    // Assume the cameras are reachable until the backend says otherwise
+    available: true,
+    cameras: {},
+    fetchHealth: async () => {
+        try {
+            const response = await fetch(`${API_BASE_URL}/api/cameras/health`);
+            if (!response.ok) return;
+            const json = await response.json();
+            set({ available: json.available, cameras: json.cameras });
+        } catch (error) {
+            console.error(error);
+        }
+    },
+}));
+
+// Poll the camera health while a component using it is mounted
+export const usePollCameraHealth = (intervalMs = 5000) => {
+    const fetchHealth = useCameraHealthStore((state) => state.fetchHealth);
+    React.useEffect(() => {
+        fetchHealth();
+        const id = setInterval(fetchHealth, intervalMs);
+        return () => clearInterval(id);
+    }, [fetchHealth, intervalMs]);
+};
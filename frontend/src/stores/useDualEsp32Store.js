@@ -14,7 +14,9 @@ export const useDualEsp32Store = create((set) => ({
                 method: 'POST',
             });
             const json = await response.json();
-            const images = json.front_image && json.side_image ? { front: json.front_image, side: json.side_image } : null;
+            const images = json.front_image_url && json.side_image_url
+                ? { front: `${API_BASE_URL}${json.front_image_url}`, side: `${API_BASE_URL}${json.side_image_url}` }
+                : null;
             if (!response.ok) {
                 set({ data: null, images });
                 toast.error(json.error || `Server error ${response.status}`);
@@ -17,7 +17,7 @@ export const useEsp32ImageStore = create((set) => ({
                 throw new Error(`Server error ${response.status}: ${text}`);
             }
             const data = await response.json();
-            set({ images: { front: data.front_image, side: data.side_image } });
+            set({ images: { front: `${API_BASE_URL}${data.front_image_url}`, side: `${API_BASE_URL}${data.side_image_url}` } });
             toast.success('Images captured successfully!');
         } catch (error) {
             console.error(error);
@@ -6,15 +6,17 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5001
 export const useMeasurementsStore = create((set) => ({
     measurements: null,
     loading: false,
+    // Stage events of the running measurement job: [{ stage, ...partial result }]
+    events: [],
     updateMeasurements: (newData) =>
         set((state) => ({ measurements: { ...state.measurements, ...newData } })),
     getMeasurements: async (image1, image2) => {
         try {
-            set({ loading: true });
+            set({ loading: true, events: [] });
             const formData = new FormData();
-            formData.append('image1', image1);
-            formData.append('image2', image2);
-            const response = await fetch(`${API_BASE_URL}/api/measurements/`, {
+            formData.append('image_bottom', image1);
+            formData.append('image_side', image2);
+            const response = await fetch(`${API_BASE_URL}/api/measurement_jobs`, {
                 method: 'POST',
                 body: formData,
             });
@@ -25,13 +27,37 @@ export const useMeasurementsStore = create((set) => ({
                 const text = await response.text();
                 throw new Error(`Server error ${response.status}: ${text}`);
             }
-            const { data } = await response.json();
-            set({ measurements: data });
-            toast.success('Measurements done successfully!');
+            const { events_url } = await response.json();
+            // Follow the job's stage events instead of holding a blocking request
+            const source = new EventSource(`${API_BASE_URL}${events_url}`);
+            source.onmessage = (message) => {
+                const event = JSON.parse(message.data);
+                set((state) => ({ events: [...state.events, event] }));
+                // The job checks image quality first; it only rejects failing images when
+                // the gate is enforced (reported by its error event), otherwise warn and go on
+                if (event.stage === 'quality' && !event.ok && !event.enforced) {
+                    toast(`${event.view} image: ${event.message}`, { icon: '⚠️' });
+                }
+                if (event.stage === 'done') {
+                    source.close();
+                    set({ measurements: event.data, loading: false });
+                    toast.success('Measurements done successfully!');
+                } else if (event.stage === 'error') {
+                    source.close();
+                    set({ loading: false });
+                    toast.error(event.details || event.error);
+                }
+            };
+            source.onerror = () => {
+                // EventSource reconnects on its own while the job is known; give up once it is closed
+                if (source.readyState === EventSource.CLOSED) {
+                    set({ loading: false });
+                    toast.error('Lost connection to the measurement job');
+                }
+            };
         } catch (error) {
             console.log(error);
             toast.error(error.message || 'An error occurred');
-        } finally {
             set({ loading: false });
         }
     },
@@ -59,12 +59,16 @@ export const useStockStore = create((set, get) => ({
             const minHeight = Number(measurements?.height) || 0;
             const minDepth = Number(measurements?.depth) || 0;
 
-            const filtered = get().stock.filter(item => {
-                if (item.width < minWidth) return false;
-                if (item.height < minHeight) return false;
-                if (item.depth < minDepth) return false;
-                return true;
-            });
+            // A piece fits in some orientation when its sorted dimensions dominate the
+            // sorted request (the rule of /api/inventory/fit); smallest piece first
+            const sortedDims = (...dims) => dims.map(Number).sort((a, b) => a - b);
+            const required = sortedDims(minWidth, minHeight, minDepth);
+            const filtered = get().stock
+                .filter(item => {
+                    const dims = sortedDims(item.width, item.height, item.depth);
+                    return dims.every((dim, axis) => dim >= required[axis]);
+                })
+                .sort((a, b) => a.width * a.height * a.depth - b.width * b.height * b.depth);
             set({ filteredStock: filtered });
             toast.success("Stock filtered successfully!");
             console.log(filtered);